@@ -1,9 +1,35 @@
-"""Import relevant modules """
+"""Import relevant modules
+
+The classes are imported on first access, so importing a single submodule (e.g. for a cli or a worker)
+doesn't import flopy.
+"""
+
+from importlib import import_module
 
-from flopyAdapter.datamodel.modflowdatamodel import ModflowDataModel
-from flopyAdapter.flopymodel.flopymodelmanager import FlopyModelManager
 from flopyAdapter import modflow_package_adapter
 
-# Currently those two adapters are used
-from flopyAdapter.flopy_adapter.flopy_calculationadapter import FlopyCalculationAdapter
-from flopyAdapter.flopy_adapter.flopy_fitnessadapter import FlopyFitnessAdapter
+_LAZY_IMPORTS = {
+    "ModflowDataModel": "flopyAdapter.datamodel.modflowdatamodel",
+    "FlopyModelManager": "flopyAdapter.flopymodel.flopymodelmanager",
+    # Currently those two adapters are used
+    "FlopyCalculationAdapter": "flopyAdapter.flopy_adapter.flopy_calculationadapter",
+    "FlopyFitnessAdapter": "flopyAdapter.flopy_adapter.flopy_fitnessadapter"
+}
+
+__all__ = ["modflow_package_adapter", *_LAZY_IMPORTS]
+
+
+def __getattr__(name):
+    try:
+        module = _LAZY_IMPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module 'flopyAdapter' has no attribute '{name}'")
+
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+
+    return value
+
+
+def __dir__():
+    return sorted([*globals(), *_LAZY_IMPORTS])
@@ -9,14 +9,24 @@ EMail: ralf.junghanns@gmail.com
 from typing import Optional, List, Union
 from pathlib import Path
 import json
+from copy import deepcopy
 from jsonschema import Draft7Validator, RefResolver, ValidationError, RefResolutionError
 from hashlib import md5
 
 from flopyAdapter.mapping.flopy_package_to_adapter_mapping import FLOPY_PACKAGE_TO_ADAPTER_MAPPER
+from flopyAdapter.datamodel.outputcontrol import minimal_output_control
 
 
 SUPPORTED_OBJECTTYPES_FOR_ADDING = ["wel"]
 
+# Modules whose data a module's simulation depends on (mt and mp are based on the results of mf)
+MODULE_DEPENDENCIES = {
+    "mf": ["mf"],
+    "mt": ["mf", "mt"],
+    "mp": ["mf", "mp"],
+    "swt": ["mf", "mt", "swt"]
+}
+
 
 def sort_dictionary(dictionary: dict,
                     recursive: bool):
@@ -173,6 +183,32 @@ class ModflowDataModel:
 
         return md5(json.dumps(ordered_model_data).encode("utf-8")).hexdigest()
 
+    def module_hash(self, mf_module: str) -> str:
+        """ Function to create a md5-hash of the data a single module depends on, which is used to reuse
+        simulation outputs per module e.g. the mf outputs if only mt data changed. The working folder is
+        not part of the hash, so outputs can be reused in other workspaces
+
+        Args:
+            mf_module (str) - one of 'mf', 'mt', 'mp', 'swt'
+
+        Returns:
+            md5-hash - a string to identify the data of the module and the modules it depends on
+
+        """
+        if mf_module not in MODULE_DEPENDENCIES:
+            raise KeyError(f"module {mf_module} is not one of {', '.join(MODULE_DEPENDENCIES)}.")
+
+        module_data = {}
+        for module in MODULE_DEPENDENCIES[mf_module]:
+            if module in self.data:
+                module_data[module] = deepcopy(self.data[module])
+                if module in module_data[module]:
+                    module_data[module][module].pop("model_ws", None)
+
+        ordered_module_data = sort_dictionary(module_data, recursive=True)
+
+        return md5(json.dumps(ordered_module_data).encode("utf-8")).hexdigest()
+
     # Attributes accessor
     @property
     def nlay(self):
@@ -190,6 +226,22 @@ class ModflowDataModel:
     def nper(self):
         return self.get_package("mf", "dis")["nper"]
 
+    def minimize_output(self,
+                        optimization_data: dict) -> None:
+        """ Replaces the output control of the model by the output needed for the objectives and constraints
+        of an optimization (see outputcontrol.minimal_output_control), so only heads and concentrations of
+        the requested time steps are saved
+
+        Args:
+            self - the model class holding the model data as dictionary
+            optimization_data (dict) - the objectives and constraints of the optimization
+
+        Returns:
+            None - changes the output control of the model data
+
+        """
+        minimal_output_control(self._data, optimization_data)
+
     def add_objects(self,
                     objects: list) -> None:
         """ Merges well objects into a modflow model, adding stress periods on existing ones or
@@ -0,0 +1,139 @@
+"""This module derives the output control of a model from the objectives and constraints of an optimization,
+so MODFLOW only saves the heads and MT3D only the concentrations of the time steps the fitness is calculated
+from. Drawdowns and budgets are not saved at all.
+
+"""
+
+from typing import List, Union
+
+import numpy as np
+
+# Objective/constraint types and the output they are read from
+HEAD_TYPES = ["head"]
+CONCENTRATION_TYPES = ["concentration"]
+
+
+def as_period_list(value, nper: int) -> list:
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return list(value)
+
+    return [value] * nper
+
+
+def timestep_end_times(perlen: Union[list, float],
+                       nstp: Union[list, int],
+                       tsmult: Union[list, float]) -> np.ndarray:
+    """ Function to calculate the simulation time at the end of every time step like MODFLOW does
+
+    Args:
+        perlen (list) - length of the stress periods
+        nstp (list) - number of time steps per stress period
+        tsmult (list) - time step multiplier per stress period
+
+    Returns:
+        times (np.ndarray) - the end times of all time steps in a flat array
+
+    """
+    nper = len(perlen) if isinstance(perlen, (list, tuple, np.ndarray)) else \
+        len(nstp) if isinstance(nstp, (list, tuple, np.ndarray)) else 1
+
+    times = []
+    totim = 0.0
+
+    for period_length, steps, multiplier in zip(as_period_list(perlen, nper), as_period_list(nstp, nper),
+                                                as_period_list(tsmult, nper)):
+        steps = int(steps)
+
+        if multiplier == 1:
+            step_lengths = [period_length / steps] * steps
+        else:
+            first_step = period_length * (multiplier - 1) / (multiplier ** steps - 1)
+            step_lengths = [first_step * multiplier ** step for step in range(steps)]
+
+        for step_length in step_lengths:
+            totim += step_length
+            times.append(totim)
+
+    return np.array(times)
+
+
+def requested_timesteps(location: dict,
+                        nstp_flat: int) -> range:
+    """ Function to return the flat time steps a location refers to, the same way
+    FlopyFitnessAdapter.make_mask selects them
+
+    """
+    if location.get("type") != "bbox":
+        return range(nstp_flat)
+
+    ts_min = location.get("ts", {}).get("min", 0)
+    ts_max = location.get("ts", {}).get("max", nstp_flat)
+
+    if ts_min == ts_max:
+        ts_max += 1
+
+    return range(max(ts_min, 0), min(ts_max, nstp_flat))
+
+
+def output_timesteps(optimization_data: dict,
+                     nstp_flat: int,
+                     types: List[str]) -> List[int]:
+    """ Function to collect the time steps of the objectives and constraints of the given types
+
+    """
+    timesteps = set()
+
+    for item in [*optimization_data.get("objectives", []), *optimization_data.get("constraints", [])]:
+        if item["type"] in types:
+            timesteps.update(requested_timesteps(item["location"], nstp_flat))
+
+    return sorted(timesteps)
+
+
+def minimal_output_control(data: dict,
+                           optimization_data: dict) -> dict:
+    """ Function to replace the output control of the model data by the output the optimization needs.
+    The mf output control saves the heads of the time steps of head objectives/constraints and prints the
+    budget at the end of every stress period, the mt basic transport package saves the concentrations at the
+    end of the time steps of concentration objectives/constraints. The saved records are matched to their
+    time steps by their simulation time when the fitness is read (see FlopyFitnessAdapter)
+
+    Args:
+        data (dict) - the modflow model data, which is changed in place
+        optimization_data (dict) - the objectives and constraints of the optimization
+
+    Returns:
+        data (dict) - the changed model data
+
+    """
+    dis = data["mf"]["dis"]
+    nper = dis["nper"]
+
+    nstp = [int(steps) for steps in as_period_list(dis.get("nstp", 1), nper)]
+    nstp_flat = sum(nstp)
+
+    # Flat time step to stress period and time step
+    kstpkper = [(period, step) for period in range(nper) for step in range(nstp[period])]
+
+    head_timesteps = output_timesteps(optimization_data, nstp_flat, HEAD_TYPES)
+
+    if "oc" in data["mf"]:
+        actions = {kstpkper[timestep]: ["save head"] for timestep in head_timesteps}
+
+        # The budget is still printed at the end of every stress period, so the list file holds the budgets
+        # the SolverMonitor checks the percent discrepancy of
+        for period in range(nper):
+            actions.setdefault((period, nstp[period] - 1), []).append("print budget")
+
+        data["mf"]["oc"]["stress_period_data"] = [[list(key), actions[key]] for key in sorted(actions)]
+
+    if "mt" in data and "btn" in data["mt"]:
+        concentration_timesteps = output_timesteps(optimization_data, nstp_flat, CONCENTRATION_TYPES)
+        times = timestep_end_times(dis.get("perlen", 1.0), nstp, dis.get("tsmult", 1.0))
+
+        btn = data["mt"]["btn"]
+        btn["savucn"] = bool(concentration_timesteps)
+        btn["nprs"] = len(concentration_timesteps)
+        btn["timprs"] = [float(times[timestep]) for timestep in concentration_timesteps] or None
+
+    return data
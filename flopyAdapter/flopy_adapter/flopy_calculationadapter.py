@@ -6,32 +6,135 @@ Author: Ralf Junghanns
 EMail: ralf.junghanns@gmail.com
 """
 
-from flopy.modflow.mf import Modflow
+import asyncio
+import os
+import platform
+import queue
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Optional, List, Union
+
+from flopyAdapter.flopy_adapter.reportcapture import ReportCapture, REPORT_EXTENSION
+
+if TYPE_CHECKING:
+    from flopy.modflow.mf import Modflow
+    from flopyAdapter.flopy_adapter.modelcheck import ModelCheckCache
+
+NORMAL_MSG = 'Normal termination'
+
+# Seconds between two checks of the monitors while a model runs
+MONITOR_INTERVAL = 0.5
+
+# Executables are started in their own process group on posix, so aborting a run also stops the
+# processes they started
+NEW_SESSION = os.name == 'posix'
+
+# Sets the cpu time and memory limits and replaces itself with the executable. The limits are set in a process
+# of its own, as a preexec_fn isn't safe in the forked child of a process with threads
+LIMIT_RESOURCES = (
+    "import os, resource, sys\n"
+    "max_cpu_time, max_memory = sys.argv[1:3]\n"
+    "if max_cpu_time:\n"
+    "    resource.setrlimit(resource.RLIMIT_CPU, (int(max_cpu_time), int(max_cpu_time) + 1))\n"
+    "if max_memory:\n"
+    "    resource.setrlimit(resource.RLIMIT_AS, (int(max_memory), int(max_memory)))\n"
+    "os.execv(sys.argv[3], sys.argv[3:])\n"
+)
+
+# Status of a finished calculation
+STATUS_SUCCESS = 'success'
+STATUS_FAILED = 'failed'
+STATUS_ABORTED = 'aborted'
+STATUS_TIMEOUT = 'timeout'
+STATUS_KILLED = 'killed'
+
+# Runs that were stopped before the executable finished, following models are not run then
+STOPPED_STATUSES = [STATUS_ABORTED, STATUS_TIMEOUT, STATUS_KILLED]
 
 
 class FlopyCalculationAdapter:
-    """The Flopy Class"""
+    """The Flopy Class
+
+    Args:
+        model - the flopy model (Modflow/Mt3dms/Modpath/Seawat) to run
+        monitors (list) - objects with start(model), feed_line(line) and check() methods (e.g. SolverMonitor)
+        that follow the run and may abort it by returning a reason from check()
+        timeout (float) - wall clock seconds after which the executable is killed
+        max_cpu_time (int) - cpu seconds the executable may use (posix only)
+        max_memory (int) - bytes of address space the executable may use (posix only)
+
+    """
 
     def __init__(self,
-                 model):
+                 model,
+                 monitors: Optional[List] = None,
+                 timeout: Optional[float] = None,
+                 max_cpu_time: Optional[int] = None,
+                 max_memory: Optional[int] = None):
 
         self._model = model
+        self._monitors = list(monitors or [])
+
+        self._timeout = timeout
+        self._max_cpu_time = max_cpu_time
+        self._max_memory = max_memory
+
+        if (max_cpu_time is not None or max_memory is not None) and os.name != 'posix':
+            print('Resource limits are only supported on posix, the executable runs without limits.')
+
+        self._process = None
+        self._cancelled = threading.Event()
+        self._start_time = None
+        self._stop_status = None
+        self._elapsed = None
+        self._peak_memory = None
+        self._last_sample = 0
 
         self._report = None
         self._success = None
+        self._returncode = None
+        self._status = None
+        self._abort_reason = None
+
+        # Stdout of the run, streamed to a file with the last lines kept as report
+        self._capture = None
+        self._last_check = 0
+
+        # Packages whose check results were cached or fresh, if the adapter was created by from_flopymodel
+        self.check_report = None
 
     @staticmethod
-    def from_flopymodel(model: Modflow):
+    def from_flopymodel(model: 'Modflow',
+                        monitors: Optional[List] = None,
+                        check_cache: Union['ModelCheckCache', None, bool] = True,
+                        **run_limits):
+        """ Function to create the calculation adapter after checking the model consistency. The check
+        results of unchanged packages are taken from check_cache (see modelcheck), which defaults to the
+        cache shared by the process (False to check all packages)
+
+        """
+        from flopyAdapter.flopy_adapter.modelcheck import check_model, MODEL_CHECK_CACHE
+
+        if check_cache is True:
+            check_cache = MODEL_CHECK_CACHE
+
         try:
             # Check model consistency
-            model.check(verbose=False)
+            _, check_report = check_model(model, check_cache or None)
         except AttributeError:
             raise AttributeError(f"Error: model expected to have attributes 'name' and 'model_ws' and 'check' method \n"
                                  f"model is of type {type(model)}, expected Modflow/Modpath/Mt3dms.")
         except Exception:
             raise Exception("The model check must have detected some problems. Check your model.")
 
-        return FlopyCalculationAdapter(model)
+        calculation_adapter = FlopyCalculationAdapter(model, monitors, **run_limits)
+        calculation_adapter.check_report = check_report
+
+        return calculation_adapter
 
     # def check_model(self):
     #     if self._model:
@@ -41,19 +144,383 @@ class FlopyCalculationAdapter:
         print('Write input files.')
         self._model.write_input()
 
-    def run_calculation(self):
-        normal_msg = 'Normal termination'
+    def run_calculation(self,
+                        stdout_callback: Optional[Callable[[str], None]] = None):
+        """ Function to run the model and wait for it. The stdout of the executable is read in a separate
+        thread, so the monitors are also checked while the executable is silent
 
+        Args:
+            stdout_callback (callable) - called with every line the executable writes to stdout
+
+        """
         print('Run datamodel.')
         print(f'Model nam-file: {self._model.namefile}.')
         print(f'Model executable: {self._model.exe_name}.')
-        self._success, report = self._model.run_model(report=True, silent=True, normal_msg=normal_msg)
 
-        self._report = ' \n'.join(str(e) for e in report)
+        exe = self.prepare_run()
+
+        if self._cancelled.is_set():
+            self.stop(STATUS_KILLED, 'cancelled')
+            self.finish_run(None)
+            return
+
+        process = subprocess.Popen(self.command(exe),
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT, cwd=self._model.model_ws,
+                                   start_new_session=NEW_SESSION)
+        self._process = process
+
+        self.start_monitors()
+
+        lines = queue.Queue()
+        reader = threading.Thread(target=self.read_stdout, args=(process.stdout, lines), daemon=True)
+        reader.start()
+
+        try:
+            while True:
+                try:
+                    line = lines.get(timeout=MONITOR_INTERVAL)
+                except queue.Empty:
+                    line = b''
+
+                if line is None:
+                    break
+
+                if line:
+                    self.handle_line(line, stdout_callback)
+
+                if self.check_run():
+                    self.kill_process(process)
+                    break
+        except BaseException:
+            self.kill_process(process)
+            self._capture.close()
+            raise
+        finally:
+            returncode = process.wait()
+            self._process = None
+
+        reader.join()
+        process.stdout.close()
+
+        self.finish_run(returncode)
+
+    async def run_calculation_async(self,
+                                    stdout_callback: Optional[Callable[[str], None]] = None):
+        """ Function to run the model as asyncio subprocess, so several runs (or other work) can be
+        in flight at the same time
+
+        Args:
+            stdout_callback (callable) - called with every line the executable writes to stdout
+
+        Returns:
+            (success, report) - same as get_success_and_report after the run
+
+        """
+        print('Run datamodel asynchronously.')
+        print(f'Model nam-file: {self._model.namefile}.')
+        print(f'Model executable: {self._model.exe_name}.')
+
+        exe = self.prepare_run()
+
+        if self._cancelled.is_set():
+            self.stop(STATUS_KILLED, 'cancelled')
+            self.finish_run(None)
+            return self.get_success_and_report()
+
+        process = await asyncio.create_subprocess_exec(*self.command(exe),
+                                                       stdout=asyncio.subprocess.PIPE,
+                                                       stderr=asyncio.subprocess.STDOUT,
+                                                       cwd=self._model.model_ws,
+                                                       start_new_session=NEW_SESSION)
+        self._process = process
+
+        self.start_monitors()
+
+        try:
+            while True:
+                try:
+                    line = await asyncio.wait_for(process.stdout.readline(), timeout=MONITOR_INTERVAL)
+
+                    if not line:
+                        break
+
+                    self.handle_line(line, stdout_callback)
+                except asyncio.TimeoutError:
+                    pass
+
+                if self.check_run():
+                    self.kill_process(process)
+                    break
+        except BaseException:
+            # Includes the cancellation of the task
+            self.kill_process(process)
+            self._process = None
+            self._capture.close()
+            raise
+
+        returncode = await process.wait()
+        self._process = None
+
+        self.finish_run(returncode)
+
+        return self.get_success_and_report()
+
+    def prepare_run(self):
+        """ Function to reset the results of a previous run and to check executable and namefile
+
+        Returns:
+            exe (str) - path of the executable
+
+        """
+        self._report = None
+        self._success = False
+        self._returncode = None
+        self._status = None
+        self._abort_reason = None
+        self._stop_status = None
+        self._start_time = time.time()
+        self._elapsed = None
+        self._peak_memory = None
+
+        exe = self.find_executable(self._model.exe_name)
+
+        if not os.path.isfile(os.path.join(self._model.model_ws, self._model.namefile)):
+            raise Exception(f'The namefile for this model does not exists: {self._model.namefile}')
+
+        if self._capture is not None:
+            self._capture.close()
+
+        name = os.path.splitext(self._model.namefile)[0]
+        self._capture = ReportCapture(os.path.join(self._model.model_ws, f'{name}.{REPORT_EXTENSION}'))
+
+        return exe
+
+    def command(self, exe: str) -> List[str]:
+        """ Function to return the command that runs the executable. With cpu time or memory limits (posix
+        only) the executable is started through a python process that sets the limits and then replaces
+        itself with the executable, so the process id stays the same
+
+        """
+        if os.name != 'posix' or (self._max_cpu_time is None and self._max_memory is None):
+            return [exe, self._model.namefile]
+
+        return [sys.executable, "-c", LIMIT_RESOURCES,
+                "" if self._max_cpu_time is None else str(self._max_cpu_time),
+                "" if self._max_memory is None else str(self._max_memory),
+                os.path.abspath(exe), self._model.namefile]
+
+    def cancel(self):
+        """ Function to kill the running executable (may be called from another thread). A run that is
+        started afterwards is not started at all. Both end with status killed and reason 'cancelled'
+
+        """
+        self._cancelled.set()
+
+        process = self._process
+        if process is not None and process.returncode is None:
+            self.stop(STATUS_KILLED, 'cancelled')
+            self.kill_process(process)
+
+    @staticmethod
+    def kill_process(process):
+        """ Function to kill the executable (and the processes it started on posix)
+
+        """
+        if process.returncode is not None:
+            return
+
+        try:
+            if NEW_SESSION:
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except ProcessLookupError:
+            pass
+
+    @staticmethod
+    def read_stdout(stdout, lines: queue.Queue):
+        for line in iter(stdout.readline, b''):
+            lines.put(line)
+
+        lines.put(None)
+
+    def start_monitors(self):
+        self._last_check = time.time()
+
+        for monitor in self._monitors:
+            monitor.start(self._model)
+
+    def handle_line(self,
+                    line: bytes,
+                    stdout_callback: Optional[Callable[[str], None]] = None):
+        line = line.decode('utf-8', errors='replace').rstrip('\r\n')
+
+        if NORMAL_MSG.lower() in line.lower():
+            self._success = True
+
+        self._capture.feed(line)
+
+        for monitor in self._monitors:
+            monitor.feed_line(line)
+
+        if stdout_callback:
+            stdout_callback(line)
+
+    def stop(self,
+             status: str,
+             reason: str):
+        if self._stop_status is None:
+            print(f'Stop run: {reason}')
+            self._stop_status = status
+            self._abort_reason = reason
+
+    def check_run(self) -> bool:
+        """ Function that is called while the executable runs to check for cancellation, timeout and the
+        monitors
+
+        Returns:
+            stop (bool) - True if the executable has to be killed
+
+        """
+        self.sample_memory()
+
+        if self._stop_status is not None:
+            return True
+
+        if self._cancelled.is_set():
+            self.stop(STATUS_KILLED, 'cancelled')
+            return True
+
+        if self._timeout is not None and time.time() - self._start_time > self._timeout:
+            self.stop(STATUS_TIMEOUT, f'wall time exceeded {self._timeout} seconds')
+            return True
+
+        return self.check_monitors()
+
+    def sample_memory(self):
+        """ Function to read the peak resident memory of the executable from /proc at most every
+        MONITOR_INTERVAL seconds (linux only). Runs that end before the first sample have no peak memory
+
+        """
+        process = self._process
+        if process is None or time.time() - self._last_sample < MONITOR_INTERVAL:
+            return
+
+        self._last_sample = time.time()
+
+        try:
+            with open(f'/proc/{process.pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmHWM:'):
+                        peak_memory = int(line.split()[1]) * 1024
+                        self._peak_memory = max(self._peak_memory or 0, peak_memory)
+                        break
+        except (OSError, ValueError, IndexError):
+            pass
+
+    def check_monitors(self) -> bool:
+        """ Function to check the monitors at most every MONITOR_INTERVAL seconds
+
+        Returns:
+            abort (bool) - True if one of the monitors wants the run to be aborted
+
+        """
+        if not self._monitors or time.time() - self._last_check < MONITOR_INTERVAL:
+            return False
+
+        self._last_check = time.time()
+
+        for monitor in self._monitors:
+            reason = monitor.check()
+
+            if reason is not None:
+                self.stop(STATUS_ABORTED, reason)
+                return True
+
+        return False
+
+    def finish_run(self, returncode: Optional[int]):
+        self._returncode = returncode
+        self._elapsed = time.time() - self._start_time
+        self._report = self._capture.tail
+        self._capture.close()
+
+        if self._stop_status is not None:
+            self._success = False
+            self._status = self._stop_status
+        elif self._success:
+            self._status = STATUS_SUCCESS
+        elif returncode is not None and returncode < 0:
+            # Killed by a signal, e.g. at the cpu time limit or by the system when running out of memory
+            self._status = STATUS_KILLED
+            self._abort_reason = f'killed by signal {signal.Signals(-returncode).name}'
+        else:
+            self._status = STATUS_FAILED
+
+    @staticmethod
+    def find_executable(exe_name: str):
+        """ Function to find the model executable the same way flopy does before running a model
+
+        """
+        exe = shutil.which(exe_name)
+
+        if exe is None and platform.system() == 'Windows' and not exe_name.lower().endswith('.exe'):
+            exe = shutil.which(f'{exe_name}.exe')
+
+        if exe is None:
+            raise Exception(f'The program {exe_name} does not exist or is not executable.')
+
+        return exe
+
+    @property
+    def returncode(self):
+        return self._returncode
+
+    @property
+    def status(self):
+        """ Function to return the status of the finished run: success, failed (executable ended without
+        normal termination), aborted (by a monitor), timeout or killed (cancelled or killed by a signal)
+
+        """
+        return self._status
+
+    @property
+    def abort_reason(self):
+        return self._abort_reason
+
+    @property
+    def elapsed(self) -> Optional[float]:
+        return self._elapsed
+
+    @property
+    def peak_memory(self) -> Optional[int]:
+        """ Function to return the peak resident memory of the executable in bytes (linux only)
+
+        """
+        return self._peak_memory
+
+    def summary(self) -> dict:
+        return {
+            "status": self._status,
+            "returncode": self._returncode,
+            "abort_reason": self._abort_reason,
+            "elapsed": self._elapsed,
+            "peak_memory": self._peak_memory,
+            "check": self.check_report,
+            "report": self._capture.summary() if self._capture is not None else None
+        }
 
     def get_success_and_report(self):
+        """ Function to return the success and the last REPORT_TAIL_LINES lines of the stdout of the run, the
+        complete stdout is in report_file
+
+        """
         return self._success, self._report
 
+    @property
+    def report_file(self) -> Optional[str]:
+        return self._capture.summary()["file"] if self._capture is not None else None
+
     # def response(self):
     #     #     key = 'mf'
     #     #     if 'MF' in self._mf_data:
@@ -9,6 +9,8 @@ from pathlib import Path
 import numpy as np
 import flopy
 
+from flopyAdapter.datamodel.outputcontrol import timestep_end_times
+
 
 class FlopyFitnessAdapter:
     """Calculation of objective values of a datamodel
@@ -31,6 +33,15 @@ class FlopyFitnessAdapter:
         self._model_ws = flopy_adapter.model_ws  # _mf.
         self._model_name = flopy_adapter.namefile.split('.')[0]  # _mf.
 
+        # End times of the time steps, to match the saved records to their time steps
+        self._times = timestep_end_times(self._dis_package.perlen.array, self._dis_package.nstp.array,
+                                         self._dis_package.tsmult.array)
+
+        self._constraint_monitor = None
+
+        # Heads used instead of the head file, see set_heads
+        self._heads = None
+
         print(f"model_ws: {self._model_ws}")
         print(f"model_name: {self._model_name}")
 
@@ -86,7 +97,61 @@ class FlopyFitnessAdapter:
 
         return FlopyFitnessAdapter(optimization_data, flopy_adapter)
 
+    def constraint_monitor(self):
+        """Creates a monitor which checks the constraints on the result files while the model runs. It has to
+        be attached to the FlopyModelManager before the run, e.g. with add_monitor. If the monitor stopped
+        the run because of a violated constraint, get_fitness returns the penalty values
+
+        Returns:
+            ConstraintMonitor - watching the head/concentration constraints which can be decided early
+
+        """
+        from flopyAdapter.flopy_adapter.monitoring.constraintmonitor import ConstraintMonitor, is_decidable_early
+
+        watched = []
+
+        for constraint in self._constraints:
+            if constraint["type"] == "head":
+                file_name, kind = f"{self._model_name}.hds", "head"
+            elif constraint["type"] == "concentration":
+                file_name, kind = constraint["conc_file_name"], "ucn"
+            else:
+                continue
+
+            if not is_decidable_early(constraint):
+                continue
+
+            watched.append({
+                "constraint": constraint,
+                "mask": self.make_mask(constraint["location"], self._objects, self._dis_package),
+                "file": file_name,
+                "kind": kind
+            })
+
+        self._constraint_monitor = ConstraintMonitor(watched, self._times, str(self._model_ws))
+
+        return self._constraint_monitor
+
+    def set_heads(self, heads: np.ndarray):
+        """Sets the heads that are used for head objectives and constraints instead of reading the head
+        file, e.g. heads superposed by the ResponseMatrixEngine
+
+        Args:
+            heads (np.ndarray) - heads with nstp_flat, nlay, nrow, ncol dimensions and nan for no data
+
+        """
+        shape = (len(self._times), self._dis_package.nlay, self._dis_package.nrow, self._dis_package.ncol)
+
+        if heads.shape != shape:
+            raise ValueError(f"Error: heads of shape {heads.shape} don't match the time steps and grid {shape}.")
+
+        self._heads = heads
+
     def get_fitness(self):
+        if self._constraint_monitor is not None and self._constraint_monitor.violation is not None:
+            print(f"{self._constraint_monitor.violation} while the model was running, penalty will be assigned")
+            return [obj["penalty_value"] for obj in self._objectives]
+
         objectives_values = self.read_objectives()
         constraints_exceeded = self.check_constraints()
 
@@ -116,13 +181,16 @@ class FlopyFitnessAdapter:
                 mask = self.make_mask(
                     objective["location"], self._objects, self._dis_package
                 )
-                value = self.read_concentration(objective, mask, self._model_ws, self._model_name)
+                value = self.read_concentration(objective, mask, self._model_ws, self._model_name, self._times)
 
             elif objective["type"] == "head":
                 mask = self.make_mask(
                     objective["location"], self._objects, self._dis_package
                 )
-                value = self.read_head(objective, mask, self._model_ws, self._model_name)
+                if self._heads is not None:
+                    value = self._heads[mask]
+                else:
+                    value = self.read_head(objective, mask, self._model_ws, self._model_name, self._times)
 
             elif objective["type"] == "flux":
                 value = self.read_flux(objective, self._objects)
@@ -133,7 +201,7 @@ class FlopyFitnessAdapter:
             else:
                 value = None
 
-            if not value:
+            if value is None:
                 raise ValueError(f"objective type {objective['type']} is unknown")
 
             # if not value:
@@ -163,16 +231,19 @@ class FlopyFitnessAdapter:
                 mask = self.make_mask(
                     constraint["location"], self._objects, self._dis_package
                 )
-                value = self.read_head(
-                    constraint, mask, self._model_ws, self._model_name
-                )
+                if self._heads is not None:
+                    value = self._heads[mask]
+                else:
+                    value = self.read_head(
+                        constraint, mask, self._model_ws, self._model_name, self._times
+                    )
    
             elif constraint["type"] == 'concentration':
                 mask = self.make_mask(
                     constraint["location"], self._objects, self._dis_package
                 )
                 value = self.read_concentration(
-                    constraint, mask, self._model_ws, self._model_name
+                    constraint, mask, self._model_ws, self._model_name, self._times
                 )
             
             elif constraint["type"] == "flux":
@@ -188,7 +259,7 @@ class FlopyFitnessAdapter:
             else:
                 value = None
 
-            if not value:
+            if value is None:
                 raise ValueError(f"constraint type {constraint['type']} is unknown")
             
             value = self.summary(value, constraint["summary_method"])
@@ -236,7 +307,37 @@ class FlopyFitnessAdapter:
         return result
 
     @staticmethod
-    def read_head(data, mask, model_ws, model_name):
+    def timestep_data(file_object, nstp_flat, times=None):
+        """Reads all records of a head/concentration file with one entry per time step. If the output
+        control saved only some time steps, the records are matched to the time steps by their simulation
+        time and the other time steps are nan
+
+        Args:
+            file_object () - flopy HeadFile/UcnFile
+            nstp_flat () - number of time steps
+            times () - end times of the time steps
+
+        Returns:
+            data (np.ndarray) - nstp_flat, nlay, nrow, ncol values with nan for no data
+
+        """
+        data = file_object.get_alldata(nodata=-9999)
+
+        if times is None or len(data) == nstp_flat:
+            return data
+
+        timestep_data = np.full((nstp_flat, *data.shape[1:]), np.nan)
+
+        for record_time, record in zip(file_object.get_times(), data):
+            matches = np.flatnonzero(np.isclose(times, record_time, rtol=1e-5))
+
+            if matches.size:
+                timestep_data[matches[0]] = record
+
+        return timestep_data
+
+    @staticmethod
+    def read_head(data, mask, model_ws, model_name, times=None):
         """Reads head file
 
         Args:
@@ -244,6 +345,7 @@ class FlopyFitnessAdapter:
             mask () -
             model_ws () -
             model_name () -
+            times () - end times of the time steps, see timestep_data
 
         Returns:
 
@@ -260,9 +362,7 @@ class FlopyFitnessAdapter:
 
             print("Read head.")
 
-            head = head_file_object.get_alldata(
-                nodata=-9999
-                )
+            head = FlopyFitnessAdapter.timestep_data(head_file_object, mask.shape[0], times)
             head = head[mask]
 
             head_file_object.close()
@@ -277,7 +377,7 @@ class FlopyFitnessAdapter:
         return
     
     @staticmethod
-    def read_concentration(data, mask, model_ws, model_name):
+    def read_concentration(data, mask, model_ws, model_name, times=None):
         """Reads concentrations file
 
         Args:
@@ -285,6 +385,7 @@ class FlopyFitnessAdapter:
             mask () -
             model_ws () -
             model_name () -
+            times () - end times of the time steps, see timestep_data
 
         Returns:
 
@@ -297,9 +398,7 @@ class FlopyFitnessAdapter:
             print(Path(model_ws, data["conc_file_name"]))
             conc_file_object = flopy.utils.UcnFile(
                 Path(model_ws, data["conc_file_name"]))
-            conc = conc_file_object.get_alldata(
-                nodata=-9999
-                )
+            conc = FlopyFitnessAdapter.timestep_data(conc_file_object, mask.shape[0], times)
             conc = conc[mask]
 
             conc_file_object.close()
@@ -0,0 +1,106 @@
+"""
+Compact encoding of layers and time series. Instead of nested lists of rounded python floats the values are
+returned as raw little-endian float32 bytes, optionally deflate compressed, together with the shape, the
+nodata threshold and the simulation times. Layers of single precision files are encoded straight from the
+memory map of the result file.
+
+"""
+
+import zlib
+from typing import Optional
+
+import numpy as np
+
+from flopyAdapter.flopy_adapter.flopy_read_classes.layerserialization import NODATA_THRESHOLD
+from flopyAdapter.flopy_adapter.flopy_read_classes.recordindex import RecordIndex
+
+FLOAT32 = "float32"
+ENCODINGS = [FLOAT32]
+
+DEFLATE = "deflate"
+COMPRESSIONS = [DEFLATE]
+
+# zlib level used for deflate, higher levels hardly shrink float data further
+COMPRESSION_LEVEL = 6
+
+
+def check_encoding(encoding: str,
+                   compression: Optional[str] = None):
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Error: encoding {encoding} is not one of {', '.join(ENCODINGS)}.")
+
+    if compression is not None and compression not in COMPRESSIONS:
+        raise ValueError(f"Error: compression {compression} is not one of {', '.join(COMPRESSIONS)}.")
+
+
+def encode_buffer(buffer,
+                  compression: Optional[str] = None) -> bytes:
+    if compression == DEFLATE:
+        return zlib.compress(buffer, COMPRESSION_LEVEL)
+
+    return bytes(buffer)
+
+
+def encode_layer(index: RecordIndex,
+                 totim: float,
+                 layer: int,
+                 encoding: str = FLOAT32,
+                 compression: Optional[str] = None) -> dict:
+    """ Function to encode a layer of a result file
+
+    Args:
+        index (RecordIndex) - the index of the result file
+        totim (float) - the simulation time
+        layer (int) - the zero based layer
+        encoding (str) - 'float32'
+        compression (str) - None or 'deflate'
+
+    Returns:
+        data (dict) - the encoded values ('data') and their metadata
+
+    """
+    check_encoding(encoding, compression)
+
+    return dict(
+        encoding=FLOAT32,
+        byteorder="little",
+        compression=compression,
+        shape=list(index.shape),
+        nodata=NODATA_THRESHOLD,
+        totim=float(totim),
+        layer=layer,
+        data=encode_buffer(index.layer_buffer(totim, layer), compression)
+    )
+
+
+def encode_ts(index: RecordIndex,
+              cells: np.ndarray,
+              encoding: str = FLOAT32,
+              compression: Optional[str] = None) -> dict:
+    """ Function to encode the time series of cells of a result file
+
+    Args:
+        index (RecordIndex) - the index of the result file
+        cells (np.ndarray) - ncells x 3 array of zero based layer, row, column
+        encoding (str) - 'float32'
+        compression (str) - None or 'deflate'
+
+    Returns:
+        data (dict) - the encoded ntimes x ncells values ('data') and their metadata
+
+    """
+    check_encoding(encoding, compression)
+
+    ts = index.read_ts(cells)
+    values = np.ascontiguousarray(ts[:, 1:], dtype="<f4")
+
+    return dict(
+        encoding=FLOAT32,
+        byteorder="little",
+        compression=compression,
+        shape=list(values.shape),
+        nodata=NODATA_THRESHOLD,
+        times=ts[:, 0].tolist(),
+        cells=np.asarray(cells).tolist(),
+        data=encode_buffer(memoryview(values.reshape(-1).view(np.uint8)), compression)
+    )
@@ -0,0 +1,136 @@
+"""
+Record layout of the binary head, drawdown and concentration (UCN) files written by MODFLOW/MT3D. Every
+record is a header followed by nrow * ncol values of one layer. The layouts are the same flopy uses in
+flopy.utils.binaryfile, reading them directly allows to follow files that are still written.
+
+"""
+
+import numpy as np
+
+HEADER_DTYPES = {
+    ("head", "single"): np.dtype([("kstp", "<i4"), ("kper", "<i4"), ("pertim", "<f4"), ("totim", "<f4"),
+                                  ("text", "S16"), ("ncol", "<i4"), ("nrow", "<i4"), ("ilay", "<i4")]),
+    ("head", "double"): np.dtype([("kstp", "<i4"), ("kper", "<i4"), ("pertim", "<f8"), ("totim", "<f8"),
+                                  ("text", "S16"), ("ncol", "<i4"), ("nrow", "<i4"), ("ilay", "<i4")]),
+    ("ucn", "single"): np.dtype([("ntrans", "<i4"), ("kstp", "<i4"), ("kper", "<i4"), ("totim", "<f4"),
+                                 ("text", "S16"), ("ncol", "<i4"), ("nrow", "<i4"), ("ilay", "<i4")]),
+    ("ucn", "double"): np.dtype([("ntrans", "<i4"), ("kstp", "<i4"), ("kper", "<i4"), ("totim", "<f8"),
+                                 ("text", "S16"), ("ncol", "<i4"), ("nrow", "<i4"), ("ilay", "<i4")])
+}
+
+DATA_DTYPES = {
+    "single": np.dtype("<f4"),
+    "double": np.dtype("<f8")
+}
+
+
+def detect_precision(f, kind: str):
+    """ Function to detect the precision of a binary file by checking where the header text is found
+
+    Args:
+        f - the file opened in binary mode
+        kind (str) - 'head' (also used for drawdown) or 'ucn'
+
+    Returns:
+        precision (str) - 'single', 'double' or None if the first header is not complete yet
+
+    """
+    for precision in ["single", "double"]:
+        header_dtype = HEADER_DTYPES[(kind, precision)]
+
+        f.seek(0)
+        buffer = f.read(header_dtype.itemsize)
+
+        if len(buffer) < header_dtype.itemsize:
+            return None
+
+        text = np.frombuffer(buffer, dtype=header_dtype)[0]["text"]
+
+        if all(32 <= char < 127 for char in text):
+            return precision
+
+    raise ValueError(f"binary file {f.name} is neither single nor double precision {kind} file.")
+
+
+def read_records(f,
+                 offset: int,
+                 kind: str,
+                 precision: str):
+    """ Function to read all records that are completely written, starting at offset
+
+    Args:
+        f - the file opened in binary mode
+        offset (int) - position of the first record header to read
+        kind (str) - 'head' (also used for drawdown) or 'ucn'
+        precision (str) - 'single' or 'double'
+
+    Returns:
+        generator - yields (header, data, next_offset) with data as nrow x ncol array
+
+    """
+    header_dtype = HEADER_DTYPES[(kind, precision)]
+    data_dtype = DATA_DTYPES[precision]
+
+    f.seek(0, 2)
+    file_size = f.tell()
+
+    while offset + header_dtype.itemsize <= file_size:
+        f.seek(offset)
+        header = np.frombuffer(f.read(header_dtype.itemsize), dtype=header_dtype)[0]
+
+        data_size = int(header["nrow"]) * int(header["ncol"]) * data_dtype.itemsize
+
+        if offset + header_dtype.itemsize + data_size > file_size:
+            break
+
+        data = np.frombuffer(f.read(data_size), dtype=data_dtype).reshape(header["nrow"], header["ncol"])
+
+        offset += header_dtype.itemsize + data_size
+
+        yield header, data, offset
+
+
+def read_period_end_heads(file_name,
+                          kper: int,
+                          shape: tuple):
+    """ Function to read the heads saved at the last time step of a stress period
+
+    Args:
+        file_name (str, Path) - the head file (.hds)
+        kper (int) - the stress period (zero based)
+        shape (tuple) - nlay, nrow, ncol of the model
+
+    Returns:
+        heads (np.ndarray), totim (float) - heads with nan for layers that are not saved and the
+        simulation time, None if no heads are saved in the stress period
+
+    """
+    heads = np.full(shape, np.nan, dtype=np.float32)
+    totim = None
+
+    with open(file_name, "rb") as f:
+        precision = detect_precision(f, "head")
+
+        if precision is None:
+            raise ValueError(f"head file {file_name} is empty.")
+
+        for header, data, _ in read_records(f, 0, "head", precision):
+            if header["kper"] < kper + 1:
+                continue
+            if header["kper"] > kper + 1:
+                break
+
+            if data.shape != shape[1:] or not 1 <= header["ilay"] <= shape[0]:
+                raise ValueError(f"head file {file_name} doesn't match the model grid.")
+
+            if header["totim"] != totim:
+                # Records of a later time step replace the earlier ones
+                heads[:] = np.nan
+                totim = float(header["totim"])
+
+            heads[header["ilay"] - 1] = data
+
+    if totim is None:
+        return None
+
+    return heads, totim
@@ -0,0 +1,208 @@
+"""
+Water budgets of a MODFLOW list file parsed once into arrays. Parsing the list file with flopy's MfListBudget
+takes long for long runs, so the incremental and cumulative budgets of all times are saved as a sidecar file
+next to the list file (<file>.budget.npz) and used as long as size and modification time of the list file
+match. Budgets of a time and budget series are answered from the arrays.
+
+"""
+
+import os
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Union
+
+import numpy as np
+from flopy.utils.mflistfile import MfListBudget
+
+from flopyAdapter.flopy_adapter.flopy_read_classes.resultfilecache import file_signature
+
+BUDGET_SUFFIX = ".budget.npz"
+
+# flopy's get_data returns the names of the budget terms as bytes of this length
+NAME_LENGTH = 25
+
+
+def budget_file_name(file_name: Union[str, Path]) -> str:
+    return str(file_name) + BUDGET_SUFFIX
+
+
+def signed_budget(budget: np.recarray,
+                  names: List[str]) -> np.ndarray:
+    """ Function to convert the budget records of flopy to a ntimes x nterms float32 array with the outflows
+    negative, as flopy's get_data returns them
+
+    """
+    values = np.empty((len(budget), len(names)), dtype=np.float32)
+
+    for column, name in enumerate(names):
+        values[:, column] = (-1. if '_OUT' in name else 1.) * budget[name]
+
+    return values
+
+
+class BudgetTable:
+    """The BudgetTable holds the incremental and cumulative budgets of all times of a list file.
+
+    Args:
+        file_name (str, Path) - the list file
+        names (list) - the budget terms
+        totim (np.ndarray) - the simulation times
+        kstpkper (np.ndarray) - ntimes x 2 array of zero based time step and stress period
+        incremental (np.ndarray) - ntimes x nterms array of the incremental budgets
+        cumulative (np.ndarray) - ntimes x nterms array of the cumulative budgets
+        signature (tuple) - modification time and size of the list file the budgets were read from
+
+    """
+
+    def __init__(self,
+                 file_name: Union[str, Path],
+                 names: List[str],
+                 totim: np.ndarray,
+                 kstpkper: np.ndarray,
+                 incremental: np.ndarray,
+                 cumulative: np.ndarray,
+                 signature: tuple):
+        self._file_name = str(file_name)
+        self._names = list(names)
+        self._totim = totim
+        self._kstpkper = kstpkper
+        self._incremental = incremental
+        self._cumulative = cumulative
+        self._signature = tuple(int(value) for value in signature)
+
+    @staticmethod
+    def build(file_name: Union[str, Path]):
+        signature = file_signature(file_name)
+        mf_list = MfListBudget(str(file_name))
+
+        if not mf_list.get_times():
+            return BudgetTable(file_name, [], np.empty(0, dtype=np.float32), np.empty((0, 2), dtype=np.int32),
+                               np.empty((0, 0), dtype=np.float32), np.empty((0, 0), dtype=np.float32), signature)
+
+        names = list(mf_list.inc.dtype.names[3:])
+
+        return BudgetTable(file_name, names, np.array(mf_list.inc['totim']),
+                           np.column_stack([mf_list.inc['time_step'], mf_list.inc['stress_period']]),
+                           signed_budget(mf_list.inc, names), signed_budget(mf_list.cum, names), signature)
+
+    @staticmethod
+    def load(file_name: Union[str, Path]):
+        """ Function to load the sidecar budgets of a list file
+
+        Returns:
+            table (BudgetTable) - the budgets or None if there are none, they can't be read or the list file
+            changed since they were written
+
+        """
+        try:
+            signature = file_signature(file_name)
+
+            with np.load(budget_file_name(file_name), allow_pickle=False) as sidecar:
+                if tuple(sidecar["signature"]) != signature:
+                    return None
+
+                return BudgetTable(file_name, sidecar["names"].tolist(), sidecar["totim"], sidecar["kstpkper"],
+                                   sidecar["incremental"], sidecar["cumulative"], signature)
+        except (OSError, KeyError, ValueError):
+            return None
+
+    @staticmethod
+    def from_file(file_name: Union[str, Path],
+                  persist: bool = True):
+        """ Function to load the sidecar budgets of a list file or to parse the list file if they are missing or
+        outdated
+
+        Args:
+            file_name (str, Path) - the list file
+            persist (bool) - write parsed budgets as sidecar file
+
+        Returns:
+            table (BudgetTable)
+
+        """
+        table = BudgetTable.load(file_name)
+
+        if table is None:
+            table = BudgetTable.build(file_name)
+
+            if persist:
+                table.save()
+
+        return table
+
+    def save(self) -> bool:
+        budget_file = budget_file_name(self._file_name)
+
+        try:
+            with tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(budget_file)),
+                                             suffix=".tmp", delete=False) as f:
+                np.savez(f, names=np.array(self._names, dtype=str), totim=self._totim, kstpkper=self._kstpkper,
+                         incremental=self._incremental, cumulative=self._cumulative,
+                         signature=np.array(self._signature, dtype=np.int64))
+            os.replace(f.name, budget_file)
+        except OSError:
+            return False
+
+        return True
+
+    @property
+    def names(self) -> List[str]:
+        return self._names
+
+    @property
+    def signature(self) -> tuple:
+        return self._signature
+
+    def times(self) -> list:
+        return self._totim.tolist()
+
+    def values(self,
+               incremental: bool = False) -> np.ndarray:
+        return self._incremental if incremental else self._cumulative
+
+    def read_budget(self,
+                    totim: float,
+                    incremental: bool = False) -> Optional[dict]:
+        """ Function to return the budget terms of a time like the read classes did with flopy's get_data
+
+        Returns:
+            budget (dict) - the budget terms (names cut to 25 characters) and their values as str, None if the
+            time is not in the list file
+
+        """
+        try:
+            row = self.times().index(totim)
+        except ValueError:
+            return None
+
+        values = self.values(incremental)[row]
+
+        return {name[:NAME_LENGTH]: str(value) for name, value in zip(self._names, values)}
+
+    def read_series(self,
+                    incremental: bool = False,
+                    names: Optional[List[str]] = None) -> dict:
+        """ Function to return the budget terms of all times
+
+        Args:
+            incremental (bool) - incremental instead of cumulative budgets
+            names (list) - the budget terms, all if None
+
+        Returns:
+            series (dict) - the times, the zero based time steps and stress periods ('kstpkper') and the values of
+            the budget terms ('budget')
+
+        """
+        names = self._names if names is None else names
+
+        unknown_names = [name for name in names if name not in self._names]
+        if unknown_names:
+            raise ValueError(f"Error: budget terms {', '.join(unknown_names)} are not in the list file.")
+
+        values = self.values(incremental)
+
+        return dict(
+            times=self.times(),
+            kstpkper=self._kstpkper.tolist(),
+            budget={name: values[:, self._names.index(name)].tolist() for name in names}
+        )
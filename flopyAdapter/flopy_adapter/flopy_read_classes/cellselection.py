@@ -0,0 +1,112 @@
+"""
+Selection of the cells of a multi-cell time series request. Cells are given as a list of zero based
+(layer, row, column), as a bbox with the same keys as the bbox locations of the optimization (min inclusive,
+max exclusive, both equal selects one index) or as a zone array in which all non-zero cells are selected.
+
+"""
+
+from typing import List, Optional
+
+import numpy as np
+
+# Largest number of cells of one time series request
+MAX_CELLS = 100000
+
+
+def bbox_cells(bbox: dict,
+               grid: tuple) -> np.ndarray:
+    """ Function to return the cells of a bbox, e.g. {'lay': {'min': 0, 'max': 0}, 'row': {'min': 2, 'max': 5}}.
+    Missing dimensions select all indices
+
+    """
+    ranges = []
+    for key, size in zip(["lay", "row", "col"], grid):
+        index_min = bbox.get(key, {}).get("min", 0)
+        index_max = bbox.get(key, {}).get("max", size)
+
+        if index_min == index_max:
+            index_max += 1
+
+        ranges.append(np.arange(max(index_min, 0), min(index_max, size)))
+
+    return np.stack(np.meshgrid(*ranges, indexing="ij"), axis=-1).reshape(-1, 3)
+
+
+def zone_cells(zone,
+               grid: tuple,
+               layer: Optional[int] = None) -> np.ndarray:
+    """ Function to return the non-zero cells of a zone array, which has the shape of the grid or of a layer.
+    A layer zone is applied to the given layer or to all layers if no layer is given
+
+    """
+    zone = np.asarray(zone)
+
+    if zone.shape == tuple(grid):
+        return np.argwhere(zone != 0)
+
+    if zone.shape != tuple(grid[1:]):
+        raise ValueError(f"Error: zone of shape {zone.shape} doesn't fit the grid {tuple(grid)}.")
+
+    layer_cells = np.argwhere(zone != 0)
+    layers = np.arange(grid[0]) if layer is None else np.array([layer])
+
+    return np.column_stack([np.repeat(layers, len(layer_cells)), np.tile(layer_cells, (len(layers), 1))])
+
+
+def select_cells(grid: tuple,
+                 cells: Optional[List[list]] = None,
+                 bbox: Optional[dict] = None,
+                 zone=None,
+                 layer: Optional[int] = None) -> np.ndarray:
+    """ Function to return the cells of a time series request
+
+    Args:
+        grid (tuple) - nlay, nrow, ncol of the result file
+        cells (list) - zero based (layer, row, column) of the cells
+        bbox (dict) - bbox with 'lay', 'row' and 'col' ranges
+        zone (list, np.ndarray) - zone array of the shape of the grid or of a layer
+        layer (int) - layer of a layer zone, all layers if None
+
+    Returns:
+        cells (np.ndarray) - ncells x 3 array of layer, row, column
+
+    """
+    if sum(selection is not None for selection in [cells, bbox, zone]) != 1:
+        raise ValueError("Error: exactly one of cells, bbox and zone is expected.")
+
+    if cells is not None:
+        selected = np.asarray(cells, dtype=np.int64)
+        if selected.ndim != 2 or selected.shape[1] != 3:
+            raise ValueError("Error: cells is not a list of (layer, row, column).")
+    elif bbox is not None:
+        if not isinstance(bbox, dict):
+            raise TypeError("Error: bbox is not of type dict.")
+        selected = bbox_cells(bbox, grid)
+    else:
+        selected = zone_cells(zone, grid, layer)
+
+    if len(selected) > MAX_CELLS:
+        raise ValueError(f"Error: {len(selected)} cells are selected, at most {MAX_CELLS} are allowed.")
+
+    return selected
+
+
+def ts_response(data: np.ndarray,
+                cells: np.ndarray) -> dict:
+    """ Function to convert the time series of the selected cells to lists, values of cells that are not
+    saved at a time (nan) are None, as nan isn't valid json
+
+    Args:
+        data (np.ndarray) - ntimes x (1 + ncells) array of the times and the values
+        cells (np.ndarray) - ncells x 3 array of layer, row, column
+
+    Returns:
+        data (dict) - the times, cells and ntimes x ncells values
+
+    """
+    values = data[:, 1:].tolist()
+
+    for i, j in zip(*np.nonzero(np.isnan(data[:, 1:]))):
+        values[i][j] = None
+
+    return dict(times=data[:, 0].tolist(), cells=cells.tolist(), values=values)
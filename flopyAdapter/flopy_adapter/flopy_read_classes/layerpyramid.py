@@ -0,0 +1,213 @@
+"""
+Tiled and downsampled access to the layers of binary result files. Level 0 is the layer itself, every
+further level halves the number of rows and columns by averaging blocks of 2 x 2 cells, leaving out nodata
+cells. The levels of a (totim, layer) are computed on the first request and saved next to the result file
+(<file>.pyramid/), they are read as memory maps so a window costs the same for every grid size.
+
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from flopyAdapter.flopy_adapter.flopy_read_classes.layerserialization import NODATA_THRESHOLD, serialize_layer
+from flopyAdapter.flopy_adapter.flopy_read_classes.recordindex import RecordIndex
+
+PYRAMID_SUFFIX = ".pyramid"
+
+# Levels are added until rows and columns of the coarsest level are at most this size
+MIN_LEVEL_SIZE = 64
+
+SIGNATURE_FILE = "signature.npy"
+
+
+def downsample(data: np.ndarray) -> np.ndarray:
+    """ Function to halve rows and columns of a layer by averaging blocks of 2 x 2 cells. Nodata and nan cells
+    are left out, blocks without data are nan
+
+    """
+    nrow, ncol = data.shape
+
+    padded = np.full((nrow + nrow % 2, ncol + ncol % 2), np.nan, dtype=np.float64)
+    padded[:nrow, :ncol] = data
+
+    with np.errstate(invalid="ignore"):
+        padded[padded < NODATA_THRESHOLD] = np.nan
+
+    blocks = padded.reshape(padded.shape[0] // 2, 2, padded.shape[1] // 2, 2)
+    valid = ~np.isnan(blocks)
+
+    sums = np.where(valid, blocks, 0.0).sum(axis=(1, 3))
+    counts = valid.sum(axis=(1, 3))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (sums / counts).astype(np.float32)
+
+
+def level_count(shape: tuple) -> int:
+    """ Function to return the number of levels (including the layer itself) of a grid
+
+    """
+    levels = 1
+    while max(shape) > MIN_LEVEL_SIZE:
+        shape = tuple((size + 1) // 2 for size in shape)
+        levels += 1
+
+    return levels
+
+
+def level_range(index_range: Optional[dict],
+                size: int,
+                level: int) -> tuple:
+    """ Function to convert a row or column range of the layer (min inclusive, max exclusive, both equal selects
+    one index) to the range of a level
+
+    """
+    index_range = index_range or {}
+    index_min = max(index_range.get("min", 0), 0)
+    index_max = min(index_range.get("max", size), size)
+
+    if index_min == index_max:
+        index_max += 1
+
+    if index_min >= index_max:
+        raise ValueError(f"Error: range {index_range} is empty.")
+
+    factor = 2 ** level
+
+    return index_min // factor, -(-index_max // factor)
+
+
+class LayerPyramid:
+    """The LayerPyramid reads windows of the layers of a result file at a given level. The levels are cached
+    in the pyramid folder of the result file, which is cleared once the result file changed. If the folder
+    can't be written, levels are computed for every request.
+
+    Args:
+        index (RecordIndex) - the index of the result file
+
+    """
+
+    def __init__(self,
+                 index: RecordIndex):
+        self._index = index
+        self._folder = Path(index.file_name + PYRAMID_SUFFIX)
+        self._writable = self.prepare_folder()
+
+    @property
+    def folder(self) -> Path:
+        return self._folder
+
+    @property
+    def levels(self) -> int:
+        return level_count(self._index.shape)
+
+    def prepare_folder(self) -> bool:
+        """ Function to create the pyramid folder and to remove the levels of an older result file
+
+        Returns:
+            bool - False if the folder can't be written
+
+        """
+        signature = np.array(self._index.signature, dtype=np.int64)
+        signature_file = self._folder / SIGNATURE_FILE
+
+        try:
+            if signature_file.is_file() and np.array_equal(np.load(signature_file), signature):
+                return True
+
+            if self._folder.is_dir():
+                shutil.rmtree(self._folder)
+
+            self._folder.mkdir()
+            np.save(signature_file, signature)
+        except (OSError, ValueError):
+            return False
+
+        return True
+
+    def level_file(self,
+                   totim: float,
+                   layer: int,
+                   level: int) -> Path:
+        return self._folder / f"{float(totim)!r}_{layer}_{level}.npy"
+
+    def save_level(self,
+                   file: Path,
+                   data: np.ndarray):
+        try:
+            with tempfile.NamedTemporaryFile(dir=self._folder, suffix=".tmp", delete=False) as f:
+                np.save(f, data)
+            os.replace(f.name, file)
+        except OSError:
+            self._writable = False
+
+    def read_level(self,
+                   totim: float,
+                   layer: int,
+                   level: int) -> np.ndarray:
+        """ Function to return a level of a layer, computed from the next finer level if it isn't cached
+
+        Returns:
+            data (np.ndarray) - the level, a memory map if it is cached
+
+        """
+        if not 0 <= level < self.levels:
+            raise ValueError(f"Error: level {level} is not between 0 and {self.levels - 1}.")
+
+        if level == 0:
+            return self._index.read_layer(totim, layer)
+
+        file = self.level_file(totim, layer, level)
+
+        if self._writable and file.is_file():
+            try:
+                return np.load(file, mmap_mode="r")
+            except (OSError, ValueError):
+                pass
+
+        data = downsample(self.read_level(totim, layer, level - 1))
+
+        if self._writable:
+            self.save_level(file, data)
+
+        return data
+
+    def read_window(self,
+                    totim: float,
+                    layer: int,
+                    window: Optional[dict] = None,
+                    level: int = 0) -> dict:
+        """ Function to read a window of a layer at a level
+
+        Args:
+            totim (float) - the simulation time
+            layer (int) - the zero based layer
+            window (dict) - 'row' and 'col' ranges of the layer, e.g. {'row': {'min': 0, 'max': 100}}, the whole
+            layer if not given
+            level (int) - 0 for the layer, every level halves rows and columns
+
+        Returns:
+            data (dict) - the level, the rows and columns of the window in the level and the rounded values
+
+        """
+        window = window or {}
+        nrow, ncol = self._index.shape
+
+        rows = level_range(window.get("row"), nrow, level)
+        columns = level_range(window.get("col"), ncol, level)
+
+        data = self.read_level(totim, layer, level)[rows[0]:rows[1], columns[0]:columns[1]]
+
+        return dict(
+            level=level,
+            levels=self.levels,
+            factor=2 ** level,
+            row=dict(min=rows[0], max=rows[1]),
+            col=dict(min=columns[0], max=columns[1]),
+            data=serialize_layer(np.asarray(data), nan_as_none=True)
+        )
@@ -0,0 +1,77 @@
+"""
+Serialization of the layers returned by the read classes. Values are rounded to two decimals and values
+below the nodata threshold (dry and inactive cells) are returned as None. Rounding and masking are done on
+the whole array, the result is the same as rounding every value with python's round.
+
+"""
+
+import numpy as np
+
+DECIMALS = 2
+
+# Values below are returned as None
+NODATA_THRESHOLD = -999
+
+# Values from which on x * 10 ** decimals isn't exact enough to be rounded with numpy
+LARGE_VALUE = 1e13
+
+
+def round_values(values: np.ndarray,
+                 decimals: int = DECIMALS) -> np.ndarray:
+    """ Function to round an array like python's round(value, decimals) rounds its values. numpy scales,
+    rounds and scales back, which only differs from python for values whose scaled value is close to a
+    half or too large, these values are rounded by python
+
+    Args:
+        values (np.ndarray) - the values
+        decimals (int) - number of decimals
+
+    Returns:
+        rounded (np.ndarray) - float64 array of the rounded values
+
+    """
+    values = np.asarray(values, dtype=np.float64)
+    scale = 10.0 ** decimals
+
+    with np.errstate(invalid="ignore", over="ignore"):
+        scaled = values * scale
+        rounded = np.rint(scaled) / scale
+
+        fraction = np.abs(scaled - np.trunc(scaled))
+        uncertain = (np.abs(fraction - 0.5) < 1e-6) | ~(np.abs(values) < LARGE_VALUE)
+
+    for index in zip(*np.nonzero(uncertain)):
+        rounded[index] = round(float(values[index]), decimals)
+
+    return rounded
+
+
+def serialize_layer(data: np.ndarray,
+                    nan_as_none: bool = False) -> list:
+    """ Function to convert a layer to nested lists of rounded values with None for nodata
+
+    Args:
+        data (np.ndarray) - nrow x ncol array
+        nan_as_none (bool) - return nan values as None as well
+
+    Returns:
+        rows (list) - list of rows
+
+    """
+    rounded = round_values(data)
+
+    with np.errstate(invalid="ignore"):
+        nodata = rounded < NODATA_THRESHOLD
+
+    if nan_as_none:
+        nodata |= np.isnan(rounded)
+
+    rows = rounded.tolist()
+
+    for i in np.flatnonzero(nodata.any(axis=1)):
+        row = rows[i]
+        for j in np.flatnonzero(nodata[i]):
+            row[j] = None
+
+    return rows
+
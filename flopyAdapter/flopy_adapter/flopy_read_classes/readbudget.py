@@ -1,46 +1,52 @@
 import os
-from flopy.utils.mflistfile import MfListBudget
+
+from flopyAdapter.flopy_adapter.flopy_read_classes.budgettable import BudgetTable
+from flopyAdapter.flopy_adapter.flopy_read_classes.resultfilecache import RESULT_FILE_CACHE
+
+
+def open_file(filename):
+    return BudgetTable.from_file(filename)
 
 
 class ReadBudget:
     _filename = None
 
     def __init__(self, workspace):
-        for file in os.listdir(workspace):
+        for file in RESULT_FILE_CACHE.list_workspace(workspace):
             if file.endswith(".list"):
                 self._filename = os.path.join(workspace, file)
         pass
 
     def read_times(self):
         try:
-            mf_list = MfListBudget(self._filename)
-            if mf_list.get_times():
-                return mf_list.get_times()
-            else:
-                return []
+            with RESULT_FILE_CACHE.open(self._filename, 'list', open_file) as budget_table:
+                return budget_table.times()
         except:
             return []
 
     def read_cumulative_budget(self, totim):
         try:
-            mf_list = MfListBudget(self._filename)
-            budget = mf_list.get_data(totim=totim, incremental=False)
-            values = {}
-            for x in budget:
-                param = str(x[2].decode('UTF-8'))
-                values[param] = str(x[1])
-            return values
+            with RESULT_FILE_CACHE.open(self._filename, 'list', open_file) as budget_table:
+                budget = budget_table.read_budget(totim=totim, incremental=False)
+            if budget is None:
+                return []
+            return budget
         except:
             return []
 
     def read_incremental_budget(self, totim):
         try:
-            mf_list = MfListBudget(self._filename)
-            budget = mf_list.get_data(totim=totim, incremental=True)
-            values = {}
-            for x in budget:
-                param = str(x[2].decode('UTF-8'))
-                values[param] = str(x[1])
-            return values
+            with RESULT_FILE_CACHE.open(self._filename, 'list', open_file) as budget_table:
+                budget = budget_table.read_budget(totim=totim, incremental=True)
+            if budget is None:
+                return []
+            return budget
+        except:
+            return []
+
+    def read_budget_series(self, incremental=False, names=None):
+        try:
+            with RESULT_FILE_CACHE.open(self._filename, 'list', open_file) as budget_table:
+                return budget_table.read_series(incremental=incremental, names=names)
         except:
             return []
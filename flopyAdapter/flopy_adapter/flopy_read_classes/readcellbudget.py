@@ -0,0 +1,210 @@
+"""
+Cell-by-cell budget (.cbc) file written through ipakcb, read with flopy's CellBudgetFile. Instead of the
+values of all cells the read class returns the inflows and outflows of the selected budget records summed up
+per zone of a zone array. Face records hold the flows between neighbouring cells, they are summed up for the
+cells at the boundary of a zone only, flows between cells of the same zone are left out.
+
+"""
+
+import os
+from typing import List, Optional
+
+import numpy as np
+import flopy.utils.binaryfile as bf
+
+from flopyAdapter.flopy_adapter.flopy_read_classes.resultfilecache import RESULT_FILE_CACHE
+
+
+# Axis of the nlay x nrow x ncol grid of the face records, a positive value is a flow from a cell to its
+# neighbour with the next higher index along this axis
+FACE_RECORDS = {
+    "FLOW RIGHT FACE": 2,
+    "FLOW FRONT FACE": 1,
+    "FLOW LOWER FACE": 0
+}
+
+
+def open_file(filename):
+    return bf.CellBudgetFile(filename=filename, precision='single')
+
+
+def zone_array(zones,
+               shape: tuple) -> np.ndarray:
+    """ Function to check a zone array of the shape of the grid or of a layer (used for all layers)
+
+    Returns:
+        zones (np.ndarray) - nlay x nrow x ncol array of zone numbers
+
+    """
+    zones = np.asarray(zones)
+
+    if not np.issubdtype(zones.dtype, np.integer):
+        raise TypeError("Error: zones is not an array of int.")
+
+    if zones.shape == tuple(shape[1:]):
+        zones = np.broadcast_to(zones, shape)
+
+    if zones.shape != tuple(shape):
+        raise ValueError(f"Error: zones of shape {zones.shape} doesn't fit the grid {tuple(shape)}.")
+
+    if zones.min() < 0:
+        raise ValueError("Error: zones holds negative zone numbers.")
+
+    return zones
+
+
+def record_values(record,
+                  ncells: int) -> np.ndarray:
+    """ Function to convert a record of CellBudgetFile.get_data to the flat values of all cells, cells that are
+    not part of a list record are 0
+
+    """
+    if getattr(record, "dtype", None) is not None and record.dtype.names is not None:
+        return np.bincount(record["node"] - 1, weights=record["q"], minlength=ncells)
+
+    return np.ma.filled(np.ma.asarray(record, dtype=np.float64), 0.0).reshape(-1)
+
+
+def zone_budget(values: np.ndarray,
+                zones: np.ndarray,
+                nzones: int) -> tuple:
+    """ Function to sum up the positive (in) and negative (out) values of the cells of every zone
+
+    Returns:
+        inflow (np.ndarray), outflow (np.ndarray) - nzones arrays, outflows are positive
+
+    """
+    inflow = np.bincount(zones, weights=np.where(values > 0, values, 0.0), minlength=nzones)
+    outflow = np.bincount(zones, weights=np.where(values < 0, -values, 0.0), minlength=nzones)
+
+    return inflow, outflow
+
+
+def face_budget(values: np.ndarray,
+                zones: np.ndarray,
+                axis: int,
+                nzones: int) -> tuple:
+    """ Function to sum up the flows of a face record across the zone boundaries, a flow from a cell to its
+    neighbour of another zone is an outflow of the zone of the cell and an inflow of the zone of the neighbour
+
+    Args:
+        values (np.ndarray) - nlay x nrow x ncol array of the flows to the next cell along the axis
+        zones (np.ndarray) - nlay x nrow x ncol array of zone numbers
+        axis (int) - axis of the face record (0 lower, 1 front, 2 right face)
+        nzones (int) - number of zones
+
+    Returns:
+        inflow (np.ndarray), outflow (np.ndarray) - nzones arrays, outflows are positive
+
+    """
+    size = values.shape[axis]
+    flows = np.take(values, range(size - 1), axis=axis).reshape(-1)
+    source = np.take(zones, range(size - 1), axis=axis).reshape(-1)
+    target = np.take(zones, range(1, size), axis=axis).reshape(-1)
+
+    boundary = source != target
+    flows, source, target = flows[boundary], source[boundary], target[boundary]
+
+    forward = np.where(flows > 0, flows, 0.0)
+    backward = np.where(flows < 0, -flows, 0.0)
+
+    inflow = np.bincount(target, weights=forward, minlength=nzones) + \
+        np.bincount(source, weights=backward, minlength=nzones)
+    outflow = np.bincount(source, weights=forward, minlength=nzones) + \
+        np.bincount(target, weights=backward, minlength=nzones)
+
+    return inflow, outflow
+
+
+class ReadCellBudget:
+    _filename = None
+
+    def __init__(self, workspace):
+        for file in RESULT_FILE_CACHE.list_workspace(workspace):
+            if file.endswith(".cbc"):
+                self._filename = os.path.join(workspace, file)
+        pass
+
+    def read_times(self):
+        try:
+            with RESULT_FILE_CACHE.open(self._filename, 'cbc', open_file) as cbc:
+                return cbc.get_times()
+        except:
+            return []
+
+    def read_record_names(self):
+        try:
+            with RESULT_FILE_CACHE.open(self._filename, 'cbc', open_file) as cbc:
+                return [name.strip() for name in cbc.get_unique_record_names(decode=True)]
+        except:
+            return []
+
+    def read_zone_budget(self,
+                         zones,
+                         records: Optional[List[str]] = None,
+                         totims: Optional[List[float]] = None):
+        """ Function to sum up the flows of budget records per zone
+
+        Args:
+            zones (list, np.ndarray) - zone numbers (int >= 0) of the grid or of a layer (used for all layers)
+            records (list) - budget record names, e.g. ['WELLS', 'FLOW RIGHT FACE'], all records if None
+            totims (list) - simulation times, all times if None
+
+        Returns:
+            data (dict) - the times, the zone numbers and per record the inflows ('in'), outflows ('out') and
+            their difference ('net') as ntimes x nzones lists, [] if the zones don't fit or records or times
+            are not in the budget file
+
+        """
+        try:
+            with RESULT_FILE_CACHE.open(self._filename, 'cbc', open_file) as cbc:
+                shape = (int(cbc.nlay), int(cbc.nrow), int(cbc.ncol))
+                zones = zone_array(zones, shape)
+                nzones = int(zones.max()) + 1
+                zone_numbers = np.unique(zones)
+
+                record_names = [name.strip() for name in cbc.get_unique_record_names(decode=True)]
+                times = cbc.get_times()
+
+                if records is None:
+                    records = record_names
+                if totims is None:
+                    totims = times
+
+                unknown_records = [record for record in records if record not in record_names]
+                if unknown_records:
+                    raise ValueError(f"Error: records {', '.join(unknown_records)} are not in the budget file.")
+
+                unknown_times = [str(totim) for totim in totims if totim not in times]
+                if unknown_times:
+                    raise ValueError(f"Error: times {', '.join(unknown_times)} are not in the budget file.")
+
+                data = dict(times=[float(totim) for totim in totims], zones=zone_numbers.tolist(), records={})
+
+                for record in records:
+                    inflows = []
+                    outflows = []
+
+                    for totim in totims:
+                        values = np.zeros(zones.size)
+                        # Records of several packages with the same name (e.g. two WEL packages) are added up
+                        for record_data in cbc.get_data(totim=totim, text=record, full3D=True):
+                            values += record_values(record_data, zones.size)
+
+                        if record in FACE_RECORDS:
+                            inflow, outflow = face_budget(values.reshape(shape), zones, FACE_RECORDS[record],
+                                                          nzones)
+                        else:
+                            inflow, outflow = zone_budget(values, zones.reshape(-1), nzones)
+                        inflows.append(inflow[zone_numbers])
+                        outflows.append(outflow[zone_numbers])
+
+                    inflows = np.array(inflows).reshape(len(totims), len(zone_numbers))
+                    outflows = np.array(outflows).reshape(len(totims), len(zone_numbers))
+
+                    data["records"][record] = {"in": inflows.tolist(), "out": outflows.tolist(),
+                                               "net": (inflows - outflows).tolist()}
+
+            return data
+        except:
+            return []
@@ -1,5 +1,16 @@
 import os
 
+from flopyAdapter.flopy_adapter.flopy_read_classes.budgettable import BUDGET_SUFFIX
+from flopyAdapter.flopy_adapter.flopy_read_classes.layerpyramid import PYRAMID_SUFFIX
+from flopyAdapter.flopy_adapter.flopy_read_classes.recordindex import INDEX_SUFFIX
+
+# Cache files the read classes write next to the result files, which are not listed as files of the workspace
+SIDECAR_SUFFIXES = (INDEX_SUFFIX, PYRAMID_SUFFIX, BUDGET_SUFFIX)
+
+
+def is_sidecar(file: str) -> bool:
+    return file.endswith(SIDECAR_SUFFIXES)
+
 
 class ReadFile:
     _filename = None
@@ -13,7 +24,7 @@ class ReadFile:
 
         workspace = self._workspace
         for file in os.listdir(self._workspace):
-            if file.endswith("." + extension):
+            if file.endswith("." + extension) and not is_sidecar(file):
                 self._filename = os.path.join(self._workspace, file)
 
         try:
@@ -25,6 +36,6 @@ class ReadFile:
     def read_file_list(self):
         workspace = self._workspace
         try:
-            return os.listdir(workspace)
+            return [file for file in os.listdir(workspace) if not is_sidecar(file)]
         except:
             return "Error reading files of workspace '" + str(workspace) + "'."
@@ -1,47 +1,85 @@
 import os
-import flopy.utils.binaryfile as bf
+
+from flopyAdapter.flopy_adapter.flopy_read_classes.binaryencoding import FLOAT32, encode_layer, encode_ts
+from flopyAdapter.flopy_adapter.flopy_read_classes.cellselection import select_cells, ts_response
+from flopyAdapter.flopy_adapter.flopy_read_classes.layerpyramid import LayerPyramid
+from flopyAdapter.flopy_adapter.flopy_read_classes.layerserialization import serialize_layer
+from flopyAdapter.flopy_adapter.flopy_read_classes.recordindex import RecordIndex
+from flopyAdapter.flopy_adapter.flopy_read_classes.resultfilecache import RESULT_FILE_CACHE
+
+
+def open_file(filename):
+    return RecordIndex.from_file(filename, kind='head')
 
 
 class ReadHead:
     _filename = None
 
     def __init__(self, workspace):
-        for file in os.listdir(workspace):
+        for file in RESULT_FILE_CACHE.list_workspace(workspace):
             if file.endswith(".hds"):
                 self._filename = os.path.join(workspace, file)
         pass
 
     def read_times(self):
         try:
-            heads = bf.HeadFile(filename=self._filename, precision='single')
-            return heads.get_times()
+            with RESULT_FILE_CACHE.open(self._filename, 'head', open_file) as heads:
+                return heads.times()
         except:
             return []
 
     def read_number_of_layers(self):
         try:
-            heads = bf.HeadFile(filename=self._filename, precision='single')
-            number_of_layers = heads.get_data().shape[0]
-            return number_of_layers
+            with RESULT_FILE_CACHE.open(self._filename, 'head', open_file) as heads:
+                number_of_layers = heads.nlay
+                return number_of_layers
         except:
             return 0
 
     def read_layer(self, totim, layer):
         try:
-            heads = bf.HeadFile(filename=self._filename, precision='single')
-            data = heads.get_data(totim=totim, mflay=layer).tolist()
-            for i in range(len(data)):
-                for j in range(len(data[i])):
-                    data[i][j] = round(data[i][j], 2)
-                    if data[i][j] < -999:
-                        data[i][j] = None
-            return data
+            with RESULT_FILE_CACHE.open(self._filename, 'head', open_file) as heads:
+                data = heads.read_layer(totim=totim, layer=layer)
+            return serialize_layer(data)
         except:
             return []
 
     def read_ts(self, layer, row, column):
         try:
-            heads = bf.HeadFile(filename=self._filename, precision='single')
-            return heads.get_ts(idx=(layer, row, column)).tolist()
+            with RESULT_FILE_CACHE.open(self._filename, 'head', open_file) as heads:
+                return heads.read_ts((layer, row, column)).tolist()
+        except:
+            return []
+
+    def read_ts_cells(self, cells=None, bbox=None, zone=None, layer=None):
+        try:
+            with RESULT_FILE_CACHE.open(self._filename, 'head', open_file) as heads:
+                selected = select_cells((heads.nlay, *heads.shape), cells=cells, bbox=bbox, zone=zone,
+                                        layer=layer)
+                data = heads.read_ts(selected)
+            return ts_response(data, selected)
+        except:
+            return []
+
+    def read_layer_encoded(self, totim, layer, encoding=FLOAT32, compression=None):
+        try:
+            with RESULT_FILE_CACHE.open(self._filename, 'head', open_file) as heads:
+                return encode_layer(heads, totim=totim, layer=layer, encoding=encoding, compression=compression)
+        except:
+            return []
+
+    def read_ts_encoded(self, cells=None, bbox=None, zone=None, layer=None, encoding=FLOAT32, compression=None):
+        try:
+            with RESULT_FILE_CACHE.open(self._filename, 'head', open_file) as heads:
+                selected = select_cells((heads.nlay, *heads.shape), cells=cells, bbox=bbox, zone=zone,
+                                        layer=layer)
+                return encode_ts(heads, selected, encoding=encoding, compression=compression)
+        except:
+            return []
+
+    def read_layer_window(self, totim, layer, window=None, level=0):
+        try:
+            with RESULT_FILE_CACHE.open(self._filename, 'head', open_file) as heads:
+                return LayerPyramid(heads).read_window(totim=totim, layer=layer, window=window, level=level)
         except:
             return []
@@ -0,0 +1,438 @@
+"""
+Record offset index of the binary head, drawdown and concentration (UCN) files. flopy's HeadFile/UcnFile scan
+all record headers every time a file is opened, which takes seconds for long transient runs. The index maps
+totim, kstp, kper and layer of every record to the byte offset of its data. It is saved as a sidecar file
+next to the result file (<file>.index.npz), used as long as size and modification time of the result file
+match, and layers and time series are read from a memory map of the result file.
+
+"""
+
+import os
+import tempfile
+from pathlib import Path
+from typing import List, Union
+
+import numpy as np
+
+from flopyAdapter.flopy_adapter.flopy_read_classes.binaryrecords import HEADER_DTYPES, DATA_DTYPES, \
+    detect_precision
+from flopyAdapter.flopy_adapter.flopy_read_classes.resultfilecache import file_signature
+
+INDEX_SUFFIX = ".index.npz"
+
+# Extensions of the indexed result files and the header kind of their records
+INDEXED_EXTENSIONS = {".hds": "head", ".ddn": "head", ".ucn": "ucn"}
+
+# Number of values read from the memory map at once by read_ts
+READ_CHUNK_VALUES = 1 << 18
+
+
+def index_file_name(file_name: Union[str, Path]) -> str:
+    return str(file_name) + INDEX_SUFFIX
+
+
+def record_dtype(precision: str) -> np.dtype:
+    # totim keeps the precision of the file, so totim values compare like in flopy
+    return np.dtype([("totim", HEADER_DTYPES[("head", precision)]["totim"]), ("kstp", "<i4"),
+                     ("kper", "<i4"), ("ilay", "<i4"), ("offset", "<i8")])
+
+
+def scan_records(file_name: Union[str, Path],
+                 kind: str) -> tuple:
+    """ Function to read the headers of all complete records of a binary result file. If all records have the
+    same grid (the usual case), the headers are read from a memory map at once instead of record by record
+
+    Args:
+        file_name (str, Path) - the result file
+        kind (str) - 'head' (also used for drawdown) or 'ucn'
+
+    Returns:
+        records (np.ndarray), precision (str), shape (tuple) - the index records, the precision of the file and
+        nrow, ncol of the first record
+
+    """
+    with open(file_name, "rb") as f:
+        precision = detect_precision(f, kind)
+
+        if precision is None:
+            raise ValueError(f"binary file {file_name} is empty.")
+
+        header_dtype = HEADER_DTYPES[(kind, precision)]
+        data_dtype = DATA_DTYPES[precision]
+
+        f.seek(0, 2)
+        file_size = f.tell()
+
+        f.seek(0)
+        first_header = np.frombuffer(f.read(header_dtype.itemsize), dtype=header_dtype)[0]
+        shape = (int(first_header["nrow"]), int(first_header["ncol"]))
+
+        if shape[0] < 0 or shape[1] < 0:
+            raise ValueError(f"binary file {file_name} has a negative nrow or ncol.")
+
+        record_size = header_dtype.itemsize + shape[0] * shape[1] * data_dtype.itemsize
+        count = file_size // record_size
+
+        if count > 0:
+            record = np.dtype([("header", header_dtype), ("data", f"V{record_size - header_dtype.itemsize}")])
+            headers = np.array(np.memmap(f, dtype=record, mode="r", shape=(count,))["header"])
+        else:
+            headers = np.empty(0, dtype=header_dtype)
+        offsets = np.arange(count, dtype=np.int64) * record_size + header_dtype.itemsize
+
+        if count == 0 or not (np.all(headers["nrow"] == shape[0]) and np.all(headers["ncol"] == shape[1])):
+            headers, offsets = scan_record_by_record(f, file_size, header_dtype, data_dtype)
+
+        records = np.empty(len(headers), dtype=record_dtype(precision))
+        for field in ["totim", "kstp", "kper", "ilay"]:
+            records[field] = headers[field]
+        records["offset"] = offsets
+
+    return records, precision, shape
+
+
+def scan_record_by_record(f,
+                          file_size: int,
+                          header_dtype: np.dtype,
+                          data_dtype: np.dtype) -> tuple:
+    headers = []
+    offsets = []
+
+    offset = 0
+    while offset + header_dtype.itemsize <= file_size:
+        f.seek(offset)
+        header = np.frombuffer(f.read(header_dtype.itemsize), dtype=header_dtype)[0]
+
+        data_size = int(header["nrow"]) * int(header["ncol"]) * data_dtype.itemsize
+
+        if offset + header_dtype.itemsize + data_size > file_size:
+            break
+
+        headers.append(header)
+        offsets.append(offset + header_dtype.itemsize)
+
+        offset += header_dtype.itemsize + data_size
+
+    return np.array(headers, dtype=header_dtype), np.array(offsets, dtype=np.int64)
+
+
+class RecordIndex:
+    """The RecordIndex of a binary result file answers the requests of the read classes (times, layers and
+    time series) with the same values flopy's HeadFile/UcnFile return, but reads only the values that are
+    requested.
+
+    Args:
+        file_name (str, Path) - the result file
+        kind (str) - 'head' (also used for drawdown) or 'ucn'
+        records (np.ndarray) - totim, kstp, kper, ilay and data offset of every record
+        precision (str) - 'single' or 'double'
+        shape (tuple) - nrow, ncol of the records
+        signature (tuple) - modification time and size of the file the records were read from
+
+    """
+
+    def __init__(self,
+                 file_name: Union[str, Path],
+                 kind: str,
+                 records: np.ndarray,
+                 precision: str,
+                 shape: tuple,
+                 signature: tuple):
+        self._file_name = str(file_name)
+        self._kind = kind
+        self._records = records
+        self._precision = precision
+        self._shape = tuple(int(value) for value in shape)
+        self._signature = tuple(int(value) for value in signature)
+
+        self._memmap = None
+
+    @staticmethod
+    def build(file_name: Union[str, Path],
+              kind: str = "head"):
+        signature = file_signature(file_name)
+        records, precision, shape = scan_records(file_name, kind)
+
+        return RecordIndex(file_name, kind, records, precision, shape, signature)
+
+    @staticmethod
+    def load(file_name: Union[str, Path],
+             kind: str = "head"):
+        """ Function to load the sidecar index of a result file
+
+        Returns:
+            index (RecordIndex) - the index or None if there is none, it can't be read or the result file
+            changed since it was written
+
+        """
+        try:
+            signature = file_signature(file_name)
+
+            with np.load(index_file_name(file_name), allow_pickle=False) as sidecar:
+                if str(sidecar["kind"]) != kind or tuple(sidecar["signature"]) != signature:
+                    return None
+
+                return RecordIndex(file_name, kind, sidecar["records"], str(sidecar["precision"]),
+                                   tuple(sidecar["shape"]), signature)
+        except (OSError, KeyError, ValueError):
+            return None
+
+    @staticmethod
+    def from_file(file_name: Union[str, Path],
+                  kind: str = "head",
+                  persist: bool = True):
+        """ Function to load the sidecar index of a result file or to build it if it is missing or outdated
+
+        Args:
+            file_name (str, Path) - the result file
+            kind (str) - 'head' (also used for drawdown) or 'ucn'
+            persist (bool) - write a built index as sidecar file
+
+        Returns:
+            index (RecordIndex)
+
+        """
+        index = RecordIndex.load(file_name, kind)
+
+        if index is None:
+            index = RecordIndex.build(file_name, kind)
+
+            if persist:
+                index.save()
+
+        return index
+
+    def save(self) -> bool:
+        """ Function to write the index next to the result file, replacing an older index at once so
+        concurrent readers never load a partially written file
+
+        Returns:
+            bool - False if the workspace isn't writable
+
+        """
+        index_file = index_file_name(self._file_name)
+
+        try:
+            with tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(index_file)),
+                                             suffix=".tmp", delete=False) as f:
+                np.savez(f, records=self._records, kind=self._kind, precision=self._precision,
+                         shape=np.array(self._shape, dtype=np.int64),
+                         signature=np.array(self._signature, dtype=np.int64))
+            os.replace(f.name, index_file)
+        except OSError:
+            return False
+
+        return True
+
+    @property
+    def file_name(self) -> str:
+        return self._file_name
+
+    @property
+    def records(self) -> np.ndarray:
+        return self._records
+
+    @property
+    def precision(self) -> str:
+        return self._precision
+
+    @property
+    def shape(self) -> tuple:
+        return self._shape
+
+    @property
+    def signature(self) -> tuple:
+        return self._signature
+
+    @property
+    def nlay(self) -> int:
+        return int(self._records["ilay"].max()) if len(self._records) else 0
+
+    @property
+    def realtype(self):
+        return DATA_DTYPES[self._precision].type
+
+    def memmap(self) -> np.memmap:
+        if self._memmap is None:
+            self._memmap = np.memmap(self._file_name, dtype=np.uint8, mode="r")
+
+        return self._memmap
+
+    def close(self):
+        self._memmap = None
+
+    def times(self) -> list:
+        """ Function to return the simulation times of the records in the order of the file, as flopy's
+        get_times does
+
+        """
+        totim = self._records["totim"]
+        first = np.ones(len(totim), dtype=bool)
+        first[1:] = totim[1:] != totim[:-1]
+
+        return list(totim[first])
+
+    def time_indices(self) -> np.ndarray:
+        """ Function to return the index in times() of every record
+
+        """
+        totim = self._records["totim"]
+        changes = np.zeros(len(totim), dtype=np.int64)
+        changes[1:] = totim[1:] != totim[:-1]
+
+        return np.cumsum(changes)
+
+    def read_values(self,
+                    offsets: np.ndarray) -> np.ndarray:
+        """ Function to read single values at byte offsets of the result file
+
+        """
+        itemsize = DATA_DTYPES[self._precision].itemsize
+        positions = np.asarray(offsets, dtype=np.int64)[:, None] + np.arange(itemsize)
+
+        return self.memmap()[positions].view(DATA_DTYPES[self._precision]).ravel().astype(self.realtype)
+
+    def layer_offset(self,
+                     totim: float,
+                     layer: int):
+        """ Function to find the data of a layer at a simulation time
+
+        Args:
+            totim (float) - the simulation time
+            layer (int) - the zero based layer
+
+        Returns:
+            offset (int) - the byte offset of the data, None if the layer is not saved at totim
+
+        """
+        matches = np.flatnonzero(self._records["totim"] == totim)
+
+        if len(matches) == 0:
+            raise Exception(f"totim value ({totim}) not found in file...")
+
+        if not -self.nlay <= layer < self.nlay:
+            raise IndexError(f"layer {layer} is out of bounds for {self.nlay} layers.")
+
+        layer = layer % self.nlay
+
+        # The last record of a layer wins, as in flopy
+        for record in self._records[matches][::-1]:
+            if record["ilay"] - 1 == layer:
+                return int(record["offset"])
+
+        return None
+
+    def read_layer(self,
+                   totim: float,
+                   layer: int) -> np.ndarray:
+        """ Function to read a layer like flopy's get_data(totim=totim, mflay=layer)
+
+        Args:
+            totim (float) - the simulation time
+            layer (int) - the zero based layer
+
+        Returns:
+            data (np.ndarray) - nrow x ncol array, nan if the layer is not saved at totim
+
+        """
+        offset = self.layer_offset(totim, layer)
+
+        data = np.full(self._shape, np.nan, dtype=self.realtype)
+
+        if offset is not None:
+            data[:] = np.frombuffer(self.memmap(), dtype=DATA_DTYPES[self._precision],
+                                    count=self._shape[0] * self._shape[1], offset=offset).reshape(self._shape)
+
+        return data
+
+    def layer_buffer(self,
+                     totim: float,
+                     layer: int):
+        """ Function to return the values of a layer as little-endian float32 bytes. For single precision files
+        this is a view of the memory map, the values aren't copied
+
+        Returns:
+            buffer (memoryview) - nrow * ncol float32 values in row major order
+
+        """
+        offset = self.layer_offset(totim, layer)
+
+        if offset is not None and self._precision == "single":
+            return memoryview(self.memmap())[offset:offset + self._shape[0] * self._shape[1] * 4]
+
+        return memoryview(self.read_layer(totim, layer).astype("<f4").reshape(-1).view(np.uint8))
+
+    def read_ts(self,
+                cells: Union[tuple, List[tuple]]) -> np.ndarray:
+        """ Function to read the time series of cells like flopy's get_ts(idx=cells)
+
+        Args:
+            cells (tuple, list) - a zero based (layer, row, column) or a list (or ncells x 3 array) of them
+
+        Returns:
+            data (np.ndarray) - ntimes x (ncells + 1) array with the simulation time in the first column, nan
+            where a layer is not saved
+
+        """
+        if isinstance(cells, tuple):
+            cells = [cells]
+        elif isinstance(cells, np.ndarray):
+            cells = cells.tolist()
+        elif not isinstance(cells, list):
+            raise Exception('Could not build kijlist from ', cells)
+
+        grid = (self.nlay, *self._shape)
+        kij = np.asarray(cells, dtype=np.int64).reshape(-1, 3)
+        outside = np.flatnonzero(((kij < 0) | (kij >= np.array(grid))).any(axis=1))
+        if len(outside):
+            raise Exception(f"Invalid cell index. Cell {tuple(cells[outside[0]])} not within model grid: {grid}")
+
+        times = self.times()
+        time_indices = self.time_indices()
+        itemsize = DATA_DTYPES[self._precision].itemsize
+
+        result = np.full((len(times), len(cells) + 1), np.nan, dtype=self.realtype)
+        result[:, 0] = times
+
+        # The cells of a layer are read together, the records of the layer in the order of the file
+        for k in np.unique(kij[:, 0]):
+            columns = np.flatnonzero(kij[:, 0] == k)
+            cell_offsets = (kij[columns, 1] * self._shape[1] + kij[columns, 2]) * itemsize
+
+            records = np.flatnonzero(self._records["ilay"] - 1 == k)
+            step = max(1, READ_CHUNK_VALUES // len(columns))
+
+            for start in range(0, len(records), step):
+                chunk = records[start:start + step]
+                offsets = self._records["offset"][chunk][:, None] + cell_offsets[None, :]
+                values = self.read_values(offsets.ravel()).reshape(len(chunk), len(columns))
+                result[time_indices[chunk][:, None], columns[None, :] + 1] = values
+
+        return result
+
+
+def index_workspace(workspace: Union[str, Path]) -> List[str]:
+    """ Function to build the sidecar indexes of the binary result files of a workspace, e.g. right after a
+    run, so the first read request doesn't have to scan the files
+
+    Returns:
+        files (list) - the result files that were indexed
+
+    """
+    indexed = []
+
+    for file in sorted(Path(workspace).iterdir()):
+        kind = INDEXED_EXTENSIONS.get(file.suffix.lower())
+
+        if kind is None or not file.is_file():
+            continue
+
+        try:
+            RecordIndex.from_file(file, kind)
+        except (OSError, ValueError) as e:
+            print(f'Result file {file.name} is not indexed: {e}')
+            continue
+
+        indexed.append(file.name)
+
+    return indexed
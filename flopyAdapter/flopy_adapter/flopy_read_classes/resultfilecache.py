@@ -0,0 +1,150 @@
+"""
+Process wide cache of opened result files. flopy's HeadFile/UcnFile read all record headers when they are
+created and MfListBudget parses the whole list file, so the read classes take the opened objects from this
+cache instead of opening the file for every request. Entries are keyed by path and kind and are reopened
+when the modification time or size of the file changed.
+
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+# Number of opened files kept by RESULT_FILE_CACHE
+MAX_OPEN_FILES = 32
+
+
+def file_signature(path: str) -> tuple:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ResultFileCache:
+    """The ResultFileCache keeps up to max_entries opened result files, least recently used files are closed
+    first, and the file listings of up to max_entries workspaces. Opened files are used with the open context
+    manager, which holds a lock per file, as the flopy file objects seek on a shared file handle and must not
+    be read by two threads at the same time.
+
+    Args:
+        max_entries (int) - number of opened files and of workspace listings kept
+
+    """
+
+    def __init__(self,
+                 max_entries: int = MAX_OPEN_FILES):
+        if not isinstance(max_entries, int) or max_entries < 1:
+            raise ValueError("max_entries is expected to be a positive int.")
+
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._listings = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @contextmanager
+    def open(self,
+             path: str,
+             kind: str,
+             factory: Callable):
+        """ Function to use the opened file object of a result file
+
+        Args:
+            path (str) - the result file
+            kind (str) - what the file is opened as (e.g. 'head', 'drawdown'), part of the key
+            factory (callable) - called with the path to open the file if it isn't cached or changed
+
+        Returns:
+            context manager - yields the file object (e.g. flopy HeadFile)
+
+        """
+        key = (os.path.abspath(path), kind)
+        signature = file_signature(path)
+
+        closed = []
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry["signature"] != signature:
+                if entry is not None:
+                    closed.append(entry)
+
+                entry = {"signature": signature, "object": None, "lock": threading.Lock()}
+                self._entries[key] = entry
+
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self._max_entries:
+                closed.append(self._entries.popitem(last=False)[1])
+
+        for old_entry in closed:
+            self.close_entry(old_entry)
+
+        with entry["lock"]:
+            if entry["object"] is None:
+                entry["object"] = factory(path)
+
+            yield entry["object"]
+
+    def list_workspace(self, workspace: str) -> List[str]:
+        """ Function to return the files of a workspace, listed again only when the folder changed
+
+        """
+        signature = os.stat(workspace).st_mtime_ns
+
+        with self._lock:
+            listing = self._listings.get(workspace)
+            if listing is not None and listing[0] == signature:
+                self._listings.move_to_end(workspace)
+                return listing[1]
+
+        files = sorted(os.listdir(workspace))
+
+        with self._lock:
+            self._listings[workspace] = (signature, files)
+            self._listings.move_to_end(workspace)
+
+            while len(self._listings) > self._max_entries:
+                self._listings.popitem(last=False)
+
+        return files
+
+    def invalidate(self, path: Optional[str] = None):
+        """ Function to close the cached files of a result file or workspace or all files if no path is given
+
+        """
+        path = os.path.abspath(path) if path is not None else None
+
+        closed = []
+        with self._lock:
+            for key in list(self._entries):
+                if path is None or key[0] == path or os.path.dirname(key[0]) == path:
+                    closed.append(self._entries.pop(key))
+
+            if path is None:
+                self._listings.clear()
+            else:
+                for workspace in [workspace for workspace in self._listings if os.path.abspath(workspace) == path]:
+                    del self._listings[workspace]
+
+        for entry in closed:
+            self.close_entry(entry)
+
+    @staticmethod
+    def close_entry(entry: dict):
+        # Waits until a thread that still reads the file is done
+        with entry["lock"]:
+            close = getattr(entry["object"], "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception:
+                    pass
+            entry["object"] = None
+
+
+# Cache shared by the read classes of the process
+RESULT_FILE_CACHE = ResultFileCache()
@@ -7,10 +7,18 @@ EMail: ralf.junghanns@gmail.com
 """
 
 from flopyAdapter.flopy_adapter.flopy_read_classes.readbudget import ReadBudget
+from flopyAdapter.flopy_adapter.flopy_read_classes.readcellbudget import ReadCellBudget
 from flopyAdapter.flopy_adapter.flopy_read_classes.readconcentration import ReadConcentration
 from flopyAdapter.flopy_adapter.flopy_read_classes.readdrawdown import ReadDrawdown
 from flopyAdapter.flopy_adapter.flopy_read_classes.readhead import ReadHead
 from flopyAdapter.flopy_adapter.flopy_read_classes.readfile import ReadFile
+from flopyAdapter.flopy_adapter.flopy_read_classes.resultfilecache import RESULT_FILE_CACHE
+
+# Keys of a timeseries request that select several cells (see cellselection)
+TIMESERIES_SELECTIONS = ['cells', 'bbox', 'zone']
+
+# Read classes of the layerdata and timeseries types
+READ_CLASSES = {'concentration': ReadConcentration, 'drawdown': ReadDrawdown, 'head': ReadHead}
 
 
 class FlopyReadAdapter:
@@ -26,6 +34,14 @@ class FlopyReadAdapter:
         self._version = version
         pass
 
+    @staticmethod
+    def invalidate_cache(projectfolder=None):
+        """ Function to close the cached result files of a project folder (all if None), e.g. before the
+        folder is removed. Changed files are reopened without it
+
+        """
+        RESULT_FILE_CACHE.invalidate(projectfolder)
+
     def read_head(self, totim, layer):
         head_file = ReadHead(self._projectfolder)
         return head_file.read_layer(totim=totim, layer=layer)
@@ -34,6 +50,10 @@ class FlopyReadAdapter:
         head_file = ReadHead(self._projectfolder)
         return head_file.read_ts(layer=layer, row=row, column=column)
 
+    def read_head_ts_cells(self, cells=None, bbox=None, zone=None, layer=None):
+        head_file = ReadHead(self._projectfolder)
+        return head_file.read_ts_cells(cells=cells, bbox=bbox, zone=zone, layer=layer)
+
     def read_concentration(self, totim, layer):
         concentration_file = ReadConcentration(self._projectfolder)
         return concentration_file.read_layer(totim=totim, layer=layer)
@@ -42,6 +62,10 @@ class FlopyReadAdapter:
         concentration_file = ReadConcentration(self._projectfolder)
         return concentration_file.read_ts(layer=layer, row=row, column=column)
 
+    def read_concentration_ts_cells(self, cells=None, bbox=None, zone=None, layer=None):
+        concentration_file = ReadConcentration(self._projectfolder)
+        return concentration_file.read_ts_cells(cells=cells, bbox=bbox, zone=zone, layer=layer)
+
     def read_drawdown(self, totim, layer):
         drawdown_file = ReadDrawdown(self._projectfolder)
         return drawdown_file.read_layer(totim=totim, layer=layer)
@@ -50,6 +74,10 @@ class FlopyReadAdapter:
         drawdown_file = ReadDrawdown(self._projectfolder)
         return drawdown_file.read_ts(layer=layer, row=row, column=column)
 
+    def read_drawdown_ts_cells(self, cells=None, bbox=None, zone=None, layer=None):
+        drawdown_file = ReadDrawdown(self._projectfolder)
+        return drawdown_file.read_ts_cells(cells=cells, bbox=bbox, zone=zone, layer=layer)
+
     def read_cumulative_budget(self, totim):
         budget_file = ReadBudget(self._projectfolder)
         return budget_file.read_cumulative_budget(totim=totim)
@@ -58,6 +86,22 @@ class FlopyReadAdapter:
         budget_file = ReadBudget(self._projectfolder)
         return budget_file.read_incremental_budget(totim=totim)
 
+    def read_budget_series(self, incremental=False, names=None):
+        budget_file = ReadBudget(self._projectfolder)
+        return budget_file.read_budget_series(incremental=incremental, names=names)
+
+    def read_cell_budget_times(self):
+        cell_budget_file = ReadCellBudget(self._projectfolder)
+        return cell_budget_file.read_times()
+
+    def read_cell_budget_records(self):
+        cell_budget_file = ReadCellBudget(self._projectfolder)
+        return cell_budget_file.read_record_names()
+
+    def read_zone_budget(self, zones, records=None, totims=None):
+        cell_budget_file = ReadCellBudget(self._projectfolder)
+        return cell_budget_file.read_zone_budget(zones=zones, records=records, totims=totims)
+
     def read_file(self, extension):
         namfile = ReadFile(self._projectfolder)
         return namfile.read_file(extension)
@@ -77,10 +121,50 @@ class FlopyReadAdapter:
                 data = self.read_cumulative_budget(totim=totim)
 
             if request['budget']['type'] == 'incremental':
-                totim = self._request['totim']
+                # Older requests hold the time at the top level of the request
+                totim = request['budget']['totim'] if 'totim' in request['budget'] else request['totim']
                 data = self.read_incremental_budget(totim=totim)
 
-        if 'layerdata' in request:
+            if request['budget']['type'] == 'series':
+                # Budgets of all times, e.g. {'type': 'series', 'incremental': True, 'names': ['WELLS_OUT']}
+                incremental = request['budget'].get('incremental', False)
+                names = request['budget'].get('names')
+                data = self.read_budget_series(incremental=incremental, names=names)
+
+        if 'cellbudget' in request:
+            if request['cellbudget']['type'] == 'times':
+                data = self.read_cell_budget_times()
+
+            if request['cellbudget']['type'] == 'records':
+                data = self.read_cell_budget_records()
+
+            if request['cellbudget']['type'] == 'zones':
+                # Flows per zone, e.g. {'type': 'zones', 'zones': [[0, 1], [1, 2]], 'records': ['WELLS'],
+                # 'totims': [365.0]}
+                zones = request['cellbudget']['zones']
+                records = request['cellbudget'].get('records')
+                totims = request['cellbudget'].get('totims')
+                data = self.read_zone_budget(zones=zones, records=records, totims=totims)
+
+        if 'layerdata' in request and 'encoding' in request['layerdata']:
+            # Raw float32 values with metadata, e.g. {'type': 'head', 'totim': 1, 'layer': 0, 'encoding': 'float32',
+            # 'compression': 'deflate'}
+            read_class = READ_CLASSES.get(request['layerdata']['type'])
+            if read_class is not None:
+                data = read_class(self._projectfolder).read_layer_encoded(
+                    totim=request['layerdata']['totim'], layer=request['layerdata']['layer'],
+                    encoding=request['layerdata']['encoding'], compression=request['layerdata'].get('compression'))
+
+        elif 'layerdata' in request and ('window' in request['layerdata'] or 'level' in request['layerdata']):
+            # Window of a downsampled layer, e.g. {'type': 'head', 'totim': 1, 'layer': 0, 'level': 2,
+            # 'window': {'row': {'min': 0, 'max': 400}, 'col': {'min': 200, 'max': 600}}}
+            read_class = READ_CLASSES.get(request['layerdata']['type'])
+            if read_class is not None:
+                data = read_class(self._projectfolder).read_layer_window(
+                    totim=request['layerdata']['totim'], layer=request['layerdata']['layer'],
+                    window=request['layerdata'].get('window'), level=request['layerdata'].get('level', 0))
+
+        elif 'layerdata' in request:
             if request['layerdata']['type'] == 'concentration':
                 totim = request['layerdata']['totim']
                 layer = request['layerdata']['layer']
@@ -102,7 +186,33 @@ class FlopyReadAdapter:
         if 'filelist' in request:
             data = self.read_file_list()
 
-        if 'timeseries' in request:
+        if 'timeseries' in request and 'encoding' in request['timeseries']:
+            read_class = READ_CLASSES.get(request['timeseries']['type'])
+            selection = {key: request['timeseries'].get(key) for key in [*TIMESERIES_SELECTIONS, 'layer']}
+
+            if not any(selection[key] is not None for key in TIMESERIES_SELECTIONS):
+                selection = dict(cells=[[request['timeseries'][key] for key in ['layer', 'row', 'column']]])
+
+            if read_class is not None:
+                data = read_class(self._projectfolder).read_ts_encoded(
+                    **selection, encoding=request['timeseries']['encoding'],
+                    compression=request['timeseries'].get('compression'))
+
+        elif 'timeseries' in request and any(key in request['timeseries'] for key in TIMESERIES_SELECTIONS):
+            # Time series of several cells, e.g. {'type': 'head', 'bbox': {'row': {'min': 0, 'max': 5}}},
+            # returned as times, cells and values (ntimes x ncells)
+            selection = {key: request['timeseries'].get(key) for key in [*TIMESERIES_SELECTIONS, 'layer']}
+
+            if request['timeseries']['type'] == 'concentration':
+                data = self.read_concentration_ts_cells(**selection)
+
+            if request['timeseries']['type'] == 'drawdown':
+                data = self.read_drawdown_ts_cells(**selection)
+
+            if request['timeseries']['type'] == 'head':
+                data = self.read_head_ts_cells(**selection)
+
+        elif 'timeseries' in request:
             if request['timeseries']['type'] == 'concentration':
                 layer = request['timeseries']['layer']
                 row = request['timeseries']['row']
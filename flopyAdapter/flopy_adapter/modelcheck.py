@@ -0,0 +1,168 @@
+"""
+Package consistency checks with the results of unchanged packages taken from a cache. flopy's checks walk
+all arrays and stress periods of a model, while usually only a few packages (e.g. WEL) change between the
+candidates of an optimization.
+
+"""
+
+import threading
+from collections import OrderedDict
+from hashlib import md5
+from typing import Optional, Tuple
+
+import numpy as np
+from flopy.utils import check, MfList, Transient2d, Transient3d, Util2d, Util3d
+
+# Attributes that don't influence the checks but differ between otherwise equal packages
+IGNORED_ATTRIBUTES = ["parent", "fn_path"]
+
+# Packages whose data is used by the checks of all other packages (cell bottoms, active cells)
+CONTEXT_PACKAGES = ["DIS", "BAS6"]
+
+
+def update_digest(digest, value):
+    """ Function to add a package attribute to a digest. Objects that are not package data (e.g. the
+    parent model) are skipped
+
+    """
+    if isinstance(value, (Util2d, Util3d, Transient2d, Transient3d)):
+        update_digest(digest, value.array)
+    elif isinstance(value, MfList):
+        for kper in sorted(value.data):
+            digest.update(str(kper).encode("utf-8"))
+            update_digest(digest, value.data[kper])
+    elif isinstance(value, np.ndarray):
+        digest.update(f"{value.dtype.str}{value.shape}".encode("utf-8"))
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        digest.update(b"[")
+        for item in value:
+            update_digest(digest, item)
+        digest.update(b"]")
+    elif isinstance(value, dict):
+        for key in sorted(value, key=str):
+            digest.update(str(key).encode("utf-8"))
+            update_digest(digest, value[key])
+    elif value is None or isinstance(value, (bool, int, float, str, np.generic)):
+        digest.update(repr(value).encode("utf-8"))
+
+
+def package_digest(package) -> str:
+    """ Function to calculate the digest of the data of a flopy package
+
+    """
+    digest = md5(package.name[0].encode("utf-8"))
+
+    for attribute in sorted(vars(package)):
+        if attribute in IGNORED_ATTRIBUTES:
+            continue
+
+        digest.update(attribute.encode("utf-8"))
+        update_digest(digest, vars(package)[attribute])
+
+    return digest.hexdigest()
+
+
+class ModelCheckCache:
+    """The ModelCheckCache keeps the check results (summary array and passed checks) of packages keyed by
+    the digest of the package and of the packages its checks depend on. It is shared by all threads of a
+    process, the least recently used results are removed once it holds max_entries.
+
+    Args:
+        max_entries (int) - number of check results kept
+
+    """
+
+    def __init__(self,
+                 max_entries: int = 256):
+        if not isinstance(max_entries, int) or max_entries < 1:
+            raise ValueError("max_entries is expected to be a positive int.")
+
+        self._max_entries = max_entries
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._results)
+
+    def get(self, key: tuple) -> Optional[tuple]:
+        with self._lock:
+            try:
+                self._results.move_to_end(key)
+            except KeyError:
+                return None
+
+            return self._results[key]
+
+    def put(self, key: tuple, result: tuple):
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+
+            while len(self._results) > self._max_entries:
+                self._results.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+
+
+# Cache used by FlopyCalculationAdapter.from_flopymodel
+MODEL_CHECK_CACHE = ModelCheckCache()
+
+
+def check_model(model,
+                cache: Optional[ModelCheckCache] = MODEL_CHECK_CACHE,
+                level: int = 1) -> Tuple[Optional[np.recarray], dict]:
+    """ Function to check the packages of a flopy model with package.check(f=None, verbose=False), the
+    results of packages that were already checked are taken from the cache
+
+    Args:
+        model - the flopy model (Modflow, Mt3dms, ...)
+        cache (ModelCheckCache) - the cache of check results, None to check all packages
+        level (int) - check level as in flopy
+
+    Returns:
+        tuple - the summary array of the package checks (errors and warnings) and a report with per package
+        if its result was taken from the cache ('cached') or checked ('fresh') and the counts of both
+
+    """
+    context = "".join(package_digest(model.get_package(name)) for name in CONTEXT_PACKAGES
+                      if model.get_package(name) is not None)
+
+    summary_arrays = []
+    report = {"packages": {}, "cached": 0, "fresh": 0}
+
+    for package in model.packagelist:
+        name = package.name[0]
+
+        # Packages that flopy's model check leaves out at this level
+        if check.package_check_levels.get(name.lower(), 0) > level:
+            continue
+
+        key = (name, package_digest(package), context, level)
+        result = cache.get(key) if cache is not None else None
+
+        if result is not None:
+            state = "cached"
+        else:
+            state = "fresh"
+            package_check = package.check(f=None, verbose=False, level=level - 1)
+
+            if package_check is not None and package_check.summary_array is not None:
+                result = (package_check.summary_array.copy(), list(package_check.passed))
+            else:
+                result = (None, [])
+
+            if cache is not None:
+                cache.put(key, result)
+
+        report["packages"][name] = state
+        report[state] += 1
+
+        if result[0] is not None:
+            summary_arrays.append(result[0])
+
+    summary_array = np.concatenate(summary_arrays).view(np.recarray) if summary_arrays else None
+
+    return summary_array, report
@@ -0,0 +1,193 @@
+"""
+Monitor that evaluates head and concentration constraints of an optimization on the binary result files while
+they are written, so runs that already violate a constraint can be stopped before the simulation ends.
+
+"""
+
+import os
+from typing import Optional
+
+import numpy as np
+
+from flopyAdapter.flopy_adapter.flopy_read_classes.binaryrecords import detect_precision, read_records
+
+# Value that is read as nan by the fitness adapter (flopy's get_alldata nodata)
+NODATA = -9999
+
+
+def is_decidable_early(constraint: dict) -> bool:
+    """ Function to check if a constraint can be violated definitively before all values are known. This is
+    the case if the maximum has to stay below or the minimum has to stay above the constraint value
+
+    """
+    return (constraint["operator"] == "less" and constraint["summary_method"] == "max") or \
+        (constraint["operator"] == "more" and constraint["summary_method"] == "min")
+
+
+class ConstraintMonitor:
+    """The ConstraintMonitor follows the head (.hds) and concentration (UCN) files of a running simulation
+    record by record and checks every new record against the constraints. Only constraints that can be
+    decided early (see is_decidable_early) are watched, all others are evaluated by the fitness adapter after
+    the run as before. The monitor is usually created by FlopyFitnessAdapter.constraint_monitor and
+    attached to the FlopyModelManager, which aborts the run once check() returns a violation.
+
+    Args:
+        watched (list) - dicts with the constraint, its mask (time steps, nlay, nrow, ncol), the file name
+        relative to the workspace and its kind ('head' or 'ucn')
+        times (np.ndarray) - end times of the time steps to match records to time steps if the output control
+        doesn't save every time step, without the n-th saved time is the n-th time step
+        workspace (str) - folder of the files if the monitor is started without model
+
+    """
+
+    def __init__(self,
+                 watched: list,
+                 times: Optional[np.ndarray] = None,
+                 workspace: Optional[str] = None):
+        self._watched = watched
+        self._times = times
+        self._workspace = workspace
+
+        for item in self._watched:
+            item["active"] = True
+
+        self._files = {}
+        self._violation = None
+
+    @property
+    def violation(self) -> Optional[str]:
+        return self._violation
+
+    def start(self, model):
+        """ Function that is called by the calculation adapter right after the executable was started. Files
+        left from an earlier run are ignored until the executable rewrites them
+
+        Args:
+            model - the flopy model that is run, the files are read from its model_ws (e.g. a scratch
+            workspace), from the workspace of the monitor if None
+
+        """
+        workspace = model.model_ws if model is not None else self._workspace
+        self._files = {}
+
+        for item in self._watched:
+            if item["file"] in self._files:
+                continue
+
+            path = os.path.join(workspace, item["file"])
+
+            try:
+                stat = os.stat(path)
+                stale = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                stale = None
+
+            self._files[item["file"]] = {
+                "path": path,
+                "kind": item["kind"],
+                "stale": stale,
+                "precision": None,
+                "offset": 0,
+                "time_index": -1,
+                "totim": None
+            }
+
+        for item in self._watched:
+            item["active"] = True
+
+    def feed_line(self, line: str):
+        pass
+
+    def check(self) -> Optional[str]:
+        """ Function that is called periodically by the calculation adapter while the model runs
+
+        Returns:
+            violation (str) - the violated constraint or None
+
+        """
+        if self._violation is None:
+            for file_name, state in self._files.items():
+                self.read_file(file_name, state)
+
+                if self._violation is not None:
+                    break
+
+        return self._violation
+
+    def read_file(self, file_name: str, state: dict):
+        try:
+            stat = os.stat(state["path"])
+        except FileNotFoundError:
+            return
+
+        if state["stale"] is not None:
+            if state["stale"] == (stat.st_ino, stat.st_mtime_ns, stat.st_size):
+                return
+            state["stale"] = None
+
+        if stat.st_size < state["offset"]:
+            # File was truncated, start over
+            state.update(precision=None, offset=0, time_index=-1, totim=None)
+
+        with open(state["path"], "rb") as f:
+            if state["precision"] is None:
+                state["precision"] = detect_precision(f, state["kind"])
+
+                if state["precision"] is None:
+                    return
+
+            for header, data, offset in read_records(f, state["offset"], state["kind"], state["precision"]):
+                state["offset"] = offset
+
+                if header["totim"] != state["totim"]:
+                    state["totim"] = header["totim"]
+                    state["time_index"] = self.time_index(header["totim"], state["time_index"])
+
+                if state["time_index"] < 0:
+                    # Transport step between the ends of flow time steps
+                    continue
+
+                self.evaluate(file_name, state["time_index"], int(header["ilay"]) - 1, data)
+
+                if self._violation is not None:
+                    return
+
+    def time_index(self, totim: float, last_index: int) -> int:
+        if self._times is None:
+            return last_index + 1
+
+        matches = np.flatnonzero(np.isclose(self._times, totim, rtol=1e-5))
+
+        return int(matches[0]) if matches.size else -1
+
+    def evaluate(self, file_name: str, time_index: int, layer: int, data: np.ndarray):
+        for item in self._watched:
+            if not item["active"] or item["file"] != file_name:
+                continue
+
+            mask = item["mask"]
+
+            if time_index >= mask.shape[0] or layer >= mask.shape[1]:
+                continue
+
+            values = data[mask[time_index, layer]]
+
+            if values.size == 0:
+                continue
+
+            if np.any(values == NODATA):
+                # The summary over nan values is nan, which never violates the constraint after the run
+                item["active"] = False
+                continue
+
+            constraint = item["constraint"]
+
+            if constraint["operator"] == "less" and np.max(values) > constraint["value"]:
+                self._violation = f"{constraint['type']} constraint violated in time step {time_index}: " \
+                                  f"{np.max(values)} exceeded max value {constraint['value']}"
+            elif constraint["operator"] == "more" and np.min(values) < constraint["value"]:
+                self._violation = f"{constraint['type']} constraint violated in time step {time_index}: " \
+                                  f"{np.min(values)} lower than min value {constraint['value']}"
+
+            if self._violation is not None:
+                return
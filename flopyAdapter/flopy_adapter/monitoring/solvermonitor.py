@@ -0,0 +1,200 @@
+"""
+Monitor for running MODFLOW/MT3D simulations, which follows the stdout of the executable and the list file
+while the model runs and tells the calculation adapter to abort runs that diverge.
+
+"""
+
+import os
+import re
+import time
+from typing import Optional
+
+# MODFLOW list file: outer iterations of PCG/GMG/SIP (calls to solver routine) or NWT (iterations)
+OUTER_ITERATIONS = re.compile(r"(\d+)\s+(?:CALLS TO \w+ ROUTINE|ITERATIONS) FOR TIME STEP\s+(\d+)\s+"
+                              r"IN STRESS PERIOD\s+(\d+)", re.IGNORECASE)
+BUDGET_HEADER = re.compile(r"BUDGET FOR ENTIRE MODEL AT END OF TIME STEP\s+(\d+),\s*STRESS PERIOD\s+(\d+)",
+                           re.IGNORECASE)
+# MT3D list file: budgets of the transport steps, e.g. CUMULATIVE MASS BUDGETS AT END OF TRANSPORT STEP    5,
+# TIME STEP    1, STRESS PERIOD    1
+MT_BUDGET_HEADER = re.compile(r"MASS BUDGETS? AT END OF TRANSPORT STEP\s+(\d+)", re.IGNORECASE)
+PERCENT_DISCREPANCY = re.compile(r"(?:PERCENT DISCREPANCY|DISCREPANCY \(PERCENT\))\s*=?\s*"
+                                 r"([-+]?(?:\d+\.?\d*|\.\d+)(?:[EeDd][-+]?\d+)?)", re.IGNORECASE)
+SOLVER_FAILURE = re.compile(r"FAILED TO (?:MEET SOLVER CONVERGENCE CRITERIA|CONVERGE)", re.IGNORECASE)
+# MODFLOW stdout
+MF_TIME_STEP = re.compile(r"Stress period:\s+(\d+)\s+Time step:\s+(\d+)", re.IGNORECASE)
+# MT3D stdout
+MT_TRANSPORT_STEP = re.compile(r"Transport Step:\s+(\d+)", re.IGNORECASE)
+MT_OUTER_ITERATION = re.compile(r"Outer Iter\.\s+(\d+)", re.IGNORECASE)
+
+
+class SolverMonitor:
+    """The SolverMonitor tracks the solver iterations, the budget discrepancy and the solver failures per
+    time step of a running simulation and reports a reason to abort the run, once one of the thresholds is
+    exceeded. Thresholds set to None are not checked. The monitor is reset on every start, so one instance can
+    be used for all runs of a FlopyModelManager.
+
+    Args:
+        max_outer_iterations (int) - maximum number of outer iterations in a single time step
+        max_percent_discrepancy (float) - maximum absolute percent discrepancy of the budget
+        max_solver_failures (int) - maximum number of time steps that didn't meet the convergence criteria
+        max_wall_time (float) - maximum run time in seconds
+
+    """
+
+    def __init__(self,
+                 max_outer_iterations: Optional[int] = None,
+                 max_percent_discrepancy: Optional[float] = None,
+                 max_solver_failures: Optional[int] = None,
+                 max_wall_time: Optional[float] = None):
+        self._max_outer_iterations = max_outer_iterations
+        self._max_percent_discrepancy = max_percent_discrepancy
+        self._max_solver_failures = max_solver_failures
+        self._max_wall_time = max_wall_time
+
+        self._list_file = None
+        self._list_file_offset = 0
+        self._list_file_remainder = b''
+        self._start_time = None
+        self._budget_step = None
+        self._violation = None
+        self._progress = {}
+
+    def start(self, model):
+        """ Function that is called by the calculation adapter right after the executable was started
+
+        Args:
+            model - the flopy model that is run, models without list file (e.g. Modpath) are followed on
+            stdout only
+
+        """
+        lst = getattr(model, "lst", None)
+        self._list_file = os.path.join(model.model_ws, lst.file_name[0]) if lst is not None else None
+        self._list_file_offset = 0
+        self._list_file_remainder = b''
+        self._start_time = time.time()
+        self._budget_step = None
+        self._violation = None
+        self._progress = {
+            "stress_period": None,
+            "time_step": None,
+            "transport_step": None,
+            "solver_failures": 0,
+            "time_steps": {}
+        }
+
+    @property
+    def progress(self):
+        """ Function to return the tracked progress, time steps are keyed by 'kper,kstp' (1-based)
+
+        """
+        return self._progress
+
+    def time_step(self, key: str):
+        return self._progress["time_steps"].setdefault(key, {
+            "outer_iterations": None,
+            "percent_discrepancy": None
+        })
+
+    def set_outer_iterations(self, key: str, outer_iterations: int):
+        self.time_step(key)["outer_iterations"] = outer_iterations
+
+        if self._violation is None and self._max_outer_iterations is not None \
+                and outer_iterations > self._max_outer_iterations:
+            self._violation = f"{outer_iterations} outer iterations in time step {key} exceeded " \
+                              f"{self._max_outer_iterations}"
+
+    def set_percent_discrepancy(self, key: str, percent_discrepancy: float):
+        self.time_step(key)["percent_discrepancy"] = percent_discrepancy
+
+        if self._violation is None and self._max_percent_discrepancy is not None \
+                and percent_discrepancy > self._max_percent_discrepancy:
+            self._violation = f"percent discrepancy {percent_discrepancy} in time step {key} exceeded " \
+                              f"{self._max_percent_discrepancy}"
+
+    def add_solver_failure(self):
+        self._progress["solver_failures"] += 1
+
+        if self._violation is None and self._max_solver_failures is not None \
+                and self._progress["solver_failures"] > self._max_solver_failures:
+            self._violation = f"solver failed to converge in {self._progress['solver_failures']} time steps"
+
+    def feed_line(self, line: str):
+        """ Function that is called with every line the executable writes to stdout
+
+        """
+        match = MF_TIME_STEP.search(line)
+        if match:
+            self._progress["stress_period"], self._progress["time_step"] = int(match.group(1)), int(match.group(2))
+            return
+
+        match = MT_TRANSPORT_STEP.search(line)
+        if match:
+            self._progress["transport_step"] = int(match.group(1))
+            return
+
+        match = MT_OUTER_ITERATION.search(line)
+        if match and self._progress["transport_step"] is not None:
+            self.set_outer_iterations(f"transport,{self._progress['transport_step']}", int(match.group(1)))
+
+    def read_list_file(self):
+        """ Function to parse the lines that were appended to the list file since the last call
+
+        """
+        if self._list_file is None:
+            return
+
+        try:
+            with open(self._list_file, 'rb') as f:
+                f.seek(self._list_file_offset)
+                content = f.read()
+                self._list_file_offset = f.tell()
+        except FileNotFoundError:
+            return
+
+        lines = (self._list_file_remainder + content).split(b'\n')
+        # The last line may still be written by the executable
+        self._list_file_remainder = lines.pop()
+
+        for line in lines:
+            line = line.decode('utf-8', errors='replace')
+
+            match = OUTER_ITERATIONS.search(line)
+            if match:
+                self.set_outer_iterations(f"{int(match.group(3))},{int(match.group(2))}", int(match.group(1)))
+                continue
+
+            match = BUDGET_HEADER.search(line)
+            if match:
+                self._budget_step = f"{int(match.group(2))},{int(match.group(1))}"
+                continue
+
+            # Keyed like the outer iterations of MT3D on stdout
+            match = MT_BUDGET_HEADER.search(line)
+            if match:
+                self._budget_step = f"transport,{int(match.group(1))}"
+                continue
+
+            discrepancies = PERCENT_DISCREPANCY.findall(line)
+            if discrepancies and self._budget_step is not None:
+                discrepancy = max(abs(float(value.upper().replace('D', 'E'))) for value in discrepancies)
+                self.set_percent_discrepancy(self._budget_step, discrepancy)
+                # A budget has a single discrepancy line (MODFLOW: cumulative and rates side by side)
+                self._budget_step = None
+                continue
+
+            if SOLVER_FAILURE.search(line):
+                self.add_solver_failure()
+
+    def check(self) -> Optional[str]:
+        """ Function that is called periodically by the calculation adapter while the model runs
+
+        Returns:
+            reason (str) - why the run has to be aborted or None if it can go on
+
+        """
+        if self._max_wall_time is not None and time.time() - self._start_time > self._max_wall_time:
+            return f"wall time exceeded {self._max_wall_time} seconds"
+
+        self.read_list_file()
+
+        return self._violation
@@ -0,0 +1,90 @@
+"""
+Capture of the stdout of MODFLOW/MT3D runs. Long transient runs print a line per time step and solver
+iteration, so the complete output is streamed to a file in the workspace and only the last lines are kept
+in memory, while the fields needed after the run are extracted line by line.
+
+"""
+
+import re
+from collections import deque
+from typing import Optional, Union
+from pathlib import Path
+
+from flopyAdapter.flopy_adapter.monitoring.solvermonitor import SOLVER_FAILURE
+
+# Number of lines kept in memory, which are returned as report of the run
+REPORT_TAIL_LINES = 1000
+
+# Extension of the file the complete stdout is written to (<model name>.stdout)
+REPORT_EXTENSION = 'stdout'
+
+# Lines with which MODFLOW/MT3D end a run: ' Normal termination of simulation' (MODFLOW, SEAWAT, MODPATH),
+# ' Program completed.' (MT3DMS), error messages and the Fortran STOP statement or runtime errors
+TERMINATION = re.compile(r"^\s*(?:normal termination\b|program completed\b|error\b|stop\b|forrtl:|"
+                         r"fortran runtime error\b)", re.IGNORECASE)
+
+# MODFLOW: ' Elapsed run time:  1 Minutes,  2.345 Seconds', MT3D: ' Elapsed Run Time:   2.345 Seconds'
+ELAPSED_RUN_TIME = re.compile(r"Elapsed run time:\s*(?:(\d+)\s*Days?,\s*)?(?:(\d+)\s*Hours?,\s*)?"
+                              r"(?:(\d+)\s*Minutes?,\s*)?(\d+(?:\.\d*)?)\s*Seconds", re.IGNORECASE)
+
+
+class ReportCapture:
+    """The ReportCapture takes the stdout lines of a run, writes them to a file, keeps the last tail_lines
+    lines and extracts the first termination message, the elapsed run time reported by the executable and the
+    number of solver failures.
+
+    Args:
+        file (str, Path) - the file the complete stdout is written to, None to only keep the tail
+        tail_lines (int) - number of lines kept in memory
+
+    """
+
+    def __init__(self,
+                 file: Optional[Union[str, Path]] = None,
+                 tail_lines: int = REPORT_TAIL_LINES):
+        self._file = file
+        self._handle = open(file, 'w', encoding='utf-8') if file is not None else None
+        self._tail = deque(maxlen=tail_lines)
+
+        self._lines = 0
+        self._termination = None
+        self._elapsed = None
+        self._solver_failures = 0
+
+    def feed(self, line: str):
+        self._lines += 1
+        self._tail.append(line)
+
+        if self._handle is not None:
+            self._handle.write(line + '\n')
+
+        # The first message is the cause, e.g. an error message before the STOP statement
+        if self._termination is None and TERMINATION.search(line):
+            self._termination = line.strip()
+
+        match = ELAPSED_RUN_TIME.search(line)
+        if match:
+            days, hours, minutes, seconds = match.groups()
+            self._elapsed = (int(days or 0) * 86400 + int(hours or 0) * 3600 + int(minutes or 0) * 60 +
+                             float(seconds))
+
+        if SOLVER_FAILURE.search(line):
+            self._solver_failures += 1
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    @property
+    def tail(self) -> str:
+        return ' \n'.join(self._tail)
+
+    def summary(self) -> dict:
+        return {
+            "file": str(self._file) if self._file is not None else None,
+            "lines": self._lines,
+            "termination": self._termination,
+            "elapsed": self._elapsed,
+            "solver_failures": self._solver_failures
+        }
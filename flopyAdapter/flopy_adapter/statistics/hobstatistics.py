@@ -1,8 +1,9 @@
 import json
 import numpy as np
 import os
-from scipy import stats
-from sklearn.metrics import r2_score
+
+# scipy and sklearn are imported on first use, as they are slow to import and only needed for
+# models with a hob package
 
 
 class HobStatistics:
@@ -19,6 +20,8 @@ class HobStatistics:
 
     @staticmethod
     def calculate_npf(x, n):
+        from scipy import stats
+
         a = 0.5
         if x < 11:
             a = 3 / 8
@@ -29,6 +32,9 @@ class HobStatistics:
         if not os.path.isfile(self._input_file):
             return {"error": 'File ' + self._input_file + ' not found.'}
 
+        from scipy import stats
+        from sklearn.metrics import r2_score
+
         f = open(self._input_file)
 
         header = False
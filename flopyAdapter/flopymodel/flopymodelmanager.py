@@ -5,11 +5,35 @@ EMail: ralf.junghanns@gmail.com
 
 """
 
-
-from flopyAdapter.datamodel.modflowdatamodel import ModflowDataModel
+import asyncio
+import os
+import tempfile
+from contextlib import nullcontext
+from copy import deepcopy
+from functools import partial
+from pathlib import Path
+from typing import Callable, Optional, List, Union
+
+import numpy as np
+
+from flopyAdapter.datamodel.modflowdatamodel import ModflowDataModel, MODULE_DEPENDENCIES
 from flopyAdapter.mapping.flopy_package_to_adapter_mapping import FLOPY_PACKAGE_TO_ADAPTER_MAPPER
-from flopyAdapter.flopy_adapter.flopy_calculationadapter import FlopyCalculationAdapter
+from flopyAdapter.flopy_adapter.flopy_calculationadapter import FlopyCalculationAdapter, STOPPED_STATUSES
+from flopyAdapter.flopy_adapter.flopy_read_classes.binaryrecords import read_period_end_heads
+from flopyAdapter.flopy_adapter.flopy_read_classes.recordindex import index_workspace
 from flopyAdapter.flopy_adapter.statistics.hobstatistics import HobStatistics
+from flopyAdapter.flopymodel.simulationstore import SimulationStore
+from flopyAdapter.flopymodel import prefixrestart
+from flopyAdapter.flopymodel.scratchworkspace import scratch_workspace
+
+# Heads with an absolute value above are dry cells (hdry defaults to -1e30)
+DRY_HEAD_THRESHOLD = 1e29
+
+# Output files MT3DMS/SEAWAT write with fixed names, they are not registered in the flopy model
+MT_OUTPUT_PATTERNS = ["MT3D*.UCN", "MT3D*.MAS", "MT3D.CNF"]
+
+# Keys of run_limits, passed to every FlopyCalculationAdapter
+RUN_LIMITS = ["timeout", "max_cpu_time", "max_memory"]
 
 
 class FlopyModelManager:
@@ -20,7 +44,15 @@ class FlopyModelManager:
     def __init__(self,
                  modflowdatamodel: ModflowDataModel,
                  version: str = None,
-                 uuid: str = None):
+                 uuid: str = None,
+                 monitors: Optional[List] = None,
+                 warm_start: Union[str, Path] = None,
+                 store: Optional[SimulationStore] = None,
+                 prefix_restart: bool = False,
+                 run_limits: Optional[dict] = None,
+                 scratch: Optional[Union[str, Path]] = None,
+                 keep_files: Optional[List[str]] = None,
+                 index_outputs: bool = False):
 
         self._modflowdatamodel = modflowdatamodel
 
@@ -32,16 +64,44 @@ class FlopyModelManager:
 
         self._flopy_packages = {}
         self._flopy_packages_success = {}
+        self._calculation_adapters = {}
+
+        # Monitors (e.g. SolverMonitor) that follow every run and may abort it
+        self._monitors = list(monitors or [])
+
+        self._run_report = {}
+
+        # Head file of a reference run (e.g. the base model) used as initial heads
+        self._warm_start = warm_start
+
+        # Outputs of finished simulations, which are restored instead of running the same model again
+        self._store = store
+        self._restored = []
+
+        # Restart from the heads of a stored run which only differs from a later stress period on
+        self._prefix_restart = prefix_restart
+
+        # Wall clock timeout, cpu time and memory limits of every executable (see FlopyCalculationAdapter)
+        self._run_limits = dict(run_limits or {})
+        unknown_limits = [key for key in self._run_limits if key not in RUN_LIMITS]
+        if unknown_limits:
+            raise ValueError(f"Unknown run limits: {', '.join(unknown_limits)}, expected {', '.join(RUN_LIMITS)}.")
+
+        self._cancelled = False
+        self._restart_manager = None
+
+        # Folder (or 'auto' for /dev/shm) the models are run in, only keep_files are copied back to model_ws
+        self._scratch = scratch
+        self._keep_files = keep_files
 
-        # self._report = ''
+        # Build the record indexes of the binary outputs after the run (see recordindex)
+        self._index_outputs = index_outputs
 
         self.package_orders = {
             "mf": ['mf', 'dis', 'bas', 'bas6',
                    'chd', 'evt', 'drn', 'ghb', 'hob', 'rch', 'riv', 'wel',
                    'lpf', 'upw', 'pcg', 'nwt', 'oc', 'lmt', 'lmt6'],
-            "mt": ['mf', 'dis', 'bas', 'bas6',
-                   'chd', 'evt', 'drn', 'ghb', 'hob', 'rch', 'riv', 'wel',
-                   'lpf', 'upw', 'pcg', 'nwt', 'oc', 'lmt', 'lmt6'],
+            "mt": ['mt', 'btn', 'adv', 'dsp', 'gcg', 'ssm', 'lkt', 'phc', 'rct', 'sft', 'tob', 'uzt'],
             "swt": [  # Modflow
                 'swt', 'dis', 'bas', 'bas6', 'riv', 'wel', 'rch', 'chd', 'ghb', 'hob',
                 'lpf', 'upw', 'pcg', 'nwt', 'oc', 'lmt', 'lmt6',
@@ -58,17 +118,100 @@ class FlopyModelManager:
             raise TypeError("Error: model is not a ModflowDataModel.")
 
         return FlopyModelManager(model)
-    #
-    # @staticmethod
-    # def from_hash(hash: str,
-    #               model_ws: str = "./"):
-    #     if not isinstance(hash, str):
-    #         raise TypeError("Error: hash is not a string.")
+
+    @staticmethod
+    def from_hash(hash: str,
+                  store: SimulationStore,
+                  model_ws: str = "./"):
+        """ Function to rehydrate a manager of a model that was calculated before. The outputs are copied
+        from the store to model_ws and the flopy models are built from the stored model data
+
+        Args:
+            hash (str) - the module hash of the model (see ModflowDataModel.module_hash)
+            store (SimulationStore) - the store holding the outputs
+            model_ws (str) - the workspace the outputs are restored to
+
+        Returns:
+            FlopyModelManager - with built flopy models, success and run report as after run_model
+
+        """
+        if not isinstance(hash, str):
+            raise TypeError("Error: hash is not a string.")
+        if not isinstance(store, SimulationStore):
+            raise TypeError("Error: store is not a SimulationStore.")
+
+        meta = store.get(hash)
+
+        if meta is None or meta["data"] is None:
+            raise KeyError(f"model {hash} is not in the simulation store.")
+
+        model = ModflowDataModel(deepcopy(meta["data"]))
+        model.model_ws = model_ws
+
+        manager = FlopyModelManager(model, store=store)
+
+        if manager.restore_from_store() != manager.package_types():
+            raise KeyError(f"outputs of model {hash} are not complete in the simulation store.")
+
+        manager.build_flopymodel()
+
+        return manager
 
     @property
     def flopy_packages(self):
         return self._flopy_packages
 
+    @property
+    def flopy_packages_success(self):
+        return self._flopy_packages_success
+
+    @property
+    def calculation_adapters(self):
+        return self._calculation_adapters
+
+    @property
+    def run_report(self):
+        """ Function to return the report of the last run with the status (success, failed, aborted), exit
+        status and abort reason per flopy model and the warm start (source, applied and reason). Models
+        restored from or put into the simulation store have their hash and if it was a hit under 'store'
+
+        """
+        return self._run_report
+
+    def add_monitor(self, monitor):
+        """ Function to attach a monitor (e.g. SolverMonitor or the ConstraintMonitor of the fitness adapter),
+        which follows every following run and may abort it
+
+        """
+        self._monitors.append(monitor)
+
+    def cancel(self):
+        """ Function to stop the runs of the manager (may be called from another thread or task). The running
+        executable is killed and the models that were not run yet are not started, all of them end with
+        status killed
+
+        """
+        print('Cancel model runs')
+
+        self._cancelled = True
+
+        for calculation_adapter in list(self._calculation_adapters.values()):
+            calculation_adapter.cancel()
+
+        if self._restart_manager is not None:
+            self._restart_manager.cancel()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def set_warm_start(self, head_file: Union[str, Path]):
+        """ Function to set the head file (.hds) of a reference run, e.g. the base model or the nearest
+        cached candidate, whose heads are used as starting heads of the next built model
+
+        """
+        self._warm_start = head_file
+
     def build_flopymodel(self):
         """Builds the flopy models based on what's found in the model data. The existing packages also
         have impact on which flopy models are created (either only swt or a followup of mf, mt, mp)
@@ -104,6 +247,9 @@ class FlopyModelManager:
 
                     self._flopy_packages[model] = self.create_flopy_package(self.package_orders[model], package_content)
 
+        if self._warm_start is not None:
+            self.apply_warm_start()
+
     @staticmethod
     def read_packages(data: dict):
         package_content = {}
@@ -140,30 +286,428 @@ class FlopyModelManager:
         adapter = FLOPY_PACKAGE_TO_ADAPTER_MAPPER[name]
 
         if name in ['mf', 'mt', 'mp', 'swt']:
-            return adapter(content).get_package()
+            # mt is based on the mf model
+            return adapter(content).get_package(*model)
         else:
             adapter(content).get_package(*model)
 
-    # @staticmethod
-    # def write_input_model(model):
-    #     print('Write input files.')
-    #     model.write_input()
+    def apply_warm_start(self):
+        """ Function to replace the starting heads (strt) of the bas package with the heads at the end of the
+        first stress period of the reference run. Starting heads are only initial guesses for the solver if
+        the first stress period is steady state, in transient models they are part of the solution, so
+        they are kept then. Cells that are inactive or dry in either model keep their starting heads.
 
-    def run_model(self):
+        Returns:
+            None - the outcome is written to the run report under 'warm_start'
+
+        """
+        report = {
+            "source": str(self._warm_start),
+            "applied": False,
+            "reason": None
+        }
+        self._run_report["warm_start"] = report
+
+        model = self._flopy_packages.get("swt", self._flopy_packages.get("mf"))
+
+        if model is None or model.get_package('BAS6') is None:
+            report["reason"] = "model has no bas package"
+            return
+        if not model.dis.steady.array[0]:
+            report["reason"] = "first stress period is transient"
+            return
+
+        bas = model.get_package('BAS6')
+        strt = bas.strt.array
+
+        try:
+            heads = self.read_first_period_heads(self._warm_start, strt.shape)
+        except (OSError, ValueError) as e:
+            report["reason"] = str(e)
+            return
+
+        # The head file is single precision, hnoflo and hdry are compared in the same precision
+        valid = np.isfinite(heads) & (np.abs(heads) < DRY_HEAD_THRESHOLD) & \
+            (heads != heads.dtype.type(bas.hnoflo)) & (bas.ibound.array != 0)
+
+        for package_name in ['LPF', 'UPW']:
+            flow_package = model.get_package(package_name)
+            if flow_package is not None:
+                valid &= heads != heads.dtype.type(flow_package.hdry)
+
+        bas.strt = np.where(valid, heads, strt)
+
+        print(f'Warm start with heads of {self._warm_start} in {int(valid.sum())} of {valid.size} cells')
+        report["applied"] = True
+
+    @staticmethod
+    def read_first_period_heads(head_file: Union[str, Path],
+                                shape: tuple):
+        """ Function to read the heads at the end of the first stress period from a head file
+
+        Args:
+            head_file (str, Path) - the head file (.hds) of the reference run
+            shape (tuple) - nlay, nrow, ncol of the model that is warm started
+
+        Returns:
+            heads (np.ndarray) - the heads with nan for layers that are not in the file
+
+        """
+        period_end_heads = read_period_end_heads(head_file, 0, shape)
+
+        if period_end_heads is None:
+            raise ValueError(f"head file {head_file} has no heads of the first stress period.")
+
+        return period_end_heads[0]
+
+    def write_input_model(self):
+        """ Function to write the input files of all flopy models (first stage of run_model). Models whose
+        outputs were restored from the simulation store are skipped
+
+        """
         for package_type, package in self._flopy_packages.items():
-            calculation_adapter = FlopyCalculationAdapter(package)  # includes check
+            if package_type in self._restored:
+                continue
+
+            calculation_adapter = FlopyCalculationAdapter(package, self._monitors, **self._run_limits)
 
             calculation_adapter.write_input_model()
 
+            self._calculation_adapters[package_type] = calculation_adapter
+
+    def run_calculation(self):
+        """ Function to run the executables of all flopy models one after another (second stage of run_model)
+
+        """
+        for package_type, calculation_adapter in self._calculation_adapters.items():
+            if self._cancelled:
+                calculation_adapter.cancel()
+
             calculation_adapter.run_calculation()
 
-            if package_type in ["swt", "mf"] and 'hob' in self._modflowdatamodel.data["mf"]['packages']:
-                print(f'Calculate hob-statistics and write to file {self._uuid}.hob.stat')
-                self.run_hob_statistics(package)
+            if calculation_adapter.status in STOPPED_STATUSES:
+                print(f'Run of {package_type} was stopped ({calculation_adapter.status}), '
+                      f'following models are not run.')
+                break
+
+    def post_process(self):
+        """ Function to calculate the hob statistics and collect the success of all runs (last stage of
+        run_model)
+
+        """
+        for package_type, calculation_adapter in self._calculation_adapters.items():
+            self.finish_calculation(package_type, self._flopy_packages[package_type], calculation_adapter)
+
+    def workspace(self):
+        """ Function to return the context the models are run in, a scratch workspace (see
+        scratchworkspace) if the manager has a scratch folder
+
+        """
+        if self._scratch is None:
+            return nullcontext()
+
+        return scratch_workspace(self._flopy_packages, self._scratch, self._keep_files)
+
+    def run_model(self):
+        with self.workspace() as scratch_report:
+            if scratch_report is not None:
+                self._run_report["scratch"] = scratch_report
+
+            self.run_calculations()
+
+        self.index_output_files()
+
+    def run_calculations(self):
+        if self._store is not None:
+            if self.restore_from_store() == self.package_types():
+                return
+
+            if self._prefix_restart and self.run_from_prefix():
+                self.save_to_store()
+                return
+
+        self.write_input_model()
+
+        self.run_calculation()
+
+        self.post_process()
+
+        if self._store is not None:
+            self.save_to_store()
+
+    async def run_model_async(self,
+                              stdout_callback: Optional[Callable[[str], None]] = None):
+        """ Function to run the flopy models without blocking the event loop. Writing input files and
+        hob statistics are done in the default executor, the executables run as asyncio subprocesses. The
+        models of one manager still run one after another as mt depends on the results of mf, but the
+        runs of several managers can be awaited together e.g. with asyncio.gather
+
+        Args:
+            stdout_callback (callable) - called with every line the executables write to stdout
+
+        """
+        with self.workspace() as scratch_report:
+            if scratch_report is not None:
+                self._run_report["scratch"] = scratch_report
+
+            await self.run_calculations_async(stdout_callback)
+
+        await asyncio.get_running_loop().run_in_executor(None, self.index_output_files)
+
+    async def run_calculations_async(self,
+                                     stdout_callback: Optional[Callable[[str], None]] = None):
+        loop = asyncio.get_running_loop()
+
+        if self._store is not None and \
+                await loop.run_in_executor(None, self.restore_from_store) == self.package_types():
+            return
+
+        for package_type, package in self._flopy_packages.items():
+            if package_type in self._restored:
+                continue
+
+            calculation_adapter = await loop.run_in_executor(
+                None, partial(FlopyCalculationAdapter, package, self._monitors, **self._run_limits))
+            # Registered before the run, so cancel() reaches it
+            self._calculation_adapters[package_type] = calculation_adapter
+
+            if self._cancelled:
+                calculation_adapter.cancel()
+
+            await loop.run_in_executor(None, calculation_adapter.write_input_model)
+
+            await calculation_adapter.run_calculation_async(stdout_callback)
+
+            await loop.run_in_executor(None, self.finish_calculation,
+                                       package_type, package, calculation_adapter)
+
+            if calculation_adapter.status in STOPPED_STATUSES:
+                print(f'Run of {package_type} was stopped ({calculation_adapter.status}), '
+                      f'following models are not run.')
+                break
+
+        if self._store is not None:
+            await loop.run_in_executor(None, self.save_to_store)
+
+    def index_output_files(self):
+        """ Function to build the record indexes of the head, drawdown and concentration files of the
+        successful runs, so the read requests following the run don't scan the files. Runs after the scratch
+        workspace is left, as copying the files back changes their modification time
+
+        """
+        if not self._index_outputs:
+            return
+
+        for model_ws in sorted({self._flopy_packages[package_type].model_ws for package_type, success
+                                in self._flopy_packages_success.items() if success}):
+            self._run_report.setdefault("indexed", []).extend(index_workspace(model_ws))
+
+    def package_types(self) -> List[str]:
+        """ Function to return the flopy models that are built from the model data
+
+        """
+        if "swt" in self._modflowdatamodel.data:
+            return ["swt"]
+
+        return [model for model in self._regular_order if model in self._modflowdatamodel.data]
+
+    def restore_from_store(self) -> List[str]:
+        """ Function to restore the input and output files of the flopy models from the store into the
+        workspace. The models are restored in order as long as they are found, e.g. if only the transport data changed,
+        the mf outputs including the flow-transport link file are restored and only mt has to be run
+
+        Returns:
+            list - the restored flopy models, their success and run report are set as after a run
+
+        """
+        self._restored = []
+
+        for package_type in self.package_types():
+            hash = self._modflowdatamodel.module_hash(package_type)
+
+            # A built flopy model may have been moved into a scratch workspace
+            model = self._flopy_packages.get(package_type)
+            meta = self._store.restore(hash, self._modflowdatamodel.model_ws if model is None else model.model_ws)
+
+            if meta is None:
+                break
+
+            self._flopy_packages_success[package_type] = meta["success"]
+            self._run_report[package_type] = {
+                **(meta["report"] or {}),
+                "store": {"hash": hash, "hit": True}
+            }
+            self._restored.append(package_type)
+
+        return self._restored
+
+    def save_to_store(self):
+        """ Function to put the outputs of the successful runs into the store
+
+        """
+        for package_type, model in self._flopy_packages.items():
+            if package_type in self._restored or not self._flopy_packages_success.get(package_type):
+                continue
+
+            hash = self._modflowdatamodel.module_hash(package_type)
+            data = {module: self._modflowdatamodel.data[module]
+                    for module in MODULE_DEPENDENCIES[package_type] if module in self._modflowdatamodel.data}
+
+            prefix = prefixrestart.prefix_key(self._modflowdatamodel.data) if package_type == "mf" else None
+
+            # The input files are stored with the outputs, so a restored workspace can be loaded from its
+            # name file like a workspace that was run (e.g. by FlopyFitnessAdapter.from_id)
+            files = self.collect_input_files(model) + self.collect_output_files(package_type, model)
+
+            self._store.put(hash, package_type, model.model_ws, files, True, self._run_report.get(package_type),
+                            data, prefix)
+
+            self._run_report.setdefault(package_type, {})["store"] = {"hash": hash, "hit": False}
+
+    def run_from_prefix(self) -> bool:
+        """ Function to simulate only the stress periods in which the model differs from a stored run. The
+        stored run with the most equal stress periods (compared by the wel, chd and rch data) is searched,
+        the model is restarted from its heads at the end of the last equal stress period with a truncated
+        dis and the head and drawdown files are stitched, so they hold all stress periods. The budget
+        outputs (list, cbc) only hold the simulated stress periods. The restart starts from the single
+        precision heads of the head file, so results may differ slightly from a full run
+
+        Returns:
+            bool - True if the model was restarted, success and run report are then set as after a run
+
+        """
+        key = prefixrestart.prefix_key(self._modflowdatamodel.data)
+
+        if key is None or self.package_types() != ["mf"]:
+            return False
+
+        period, prefix_hash = 0, None
+        for hash, prefix in self._store.prefixes():
+            equal_periods = prefixrestart.first_differing_period(key, prefix)
+
+            if period < equal_periods < len(key["period_hashes"]):
+                period, prefix_hash = equal_periods, hash
+
+        if prefix_hash is None:
+            return False
+
+        model = self._flopy_packages["mf"]
+        oc = model.get_package('OC')
+
+        if oc is None or model.get_output(unit=oc.iuhead) is None:
+            return False
+
+        head_file = model.get_output(unit=oc.iuhead)
+        drawdown_file = model.get_output(unit=oc.iuddn)
+
+        try:
+            period_end_heads = read_period_end_heads(self._store.file_path(prefix_hash, head_file),
+                                                     period - 1, model.bas6.strt.array.shape)
+        except (OSError, ValueError):
+            # Evicted by another manager meanwhile
+            return False
+
+        if period_end_heads is None or np.isnan(period_end_heads[0]).any():
+            print(f'Heads of model {prefix_hash} are not saved at the end of stress period {period - 1}')
+            return False
+
+        heads, totim = period_end_heads
+
+        print(f'Restart model in stress period {period} from the heads of model {prefix_hash}')
+
+        restart_model = ModflowDataModel(prefixrestart.restart_data(self._modflowdatamodel.data, period, heads))
+
+        # The restart runs in a folder of its own, so the input files of the truncated model don't replace the
+        # ones of the model in the workspace, only the outputs are moved into the workspace
+        Path(model.model_ws).mkdir(parents=True, exist_ok=True)
+
+        with tempfile.TemporaryDirectory(prefix=".restart-", dir=model.model_ws) as restart_ws:
+            restart_model.model_ws = restart_ws
+
+            restart_manager = FlopyModelManager(restart_model, monitors=self._monitors, run_limits=self._run_limits)
+            self._restart_manager = restart_manager
+            if self._cancelled:
+                restart_manager.cancel()
+            restart_manager.build_flopymodel()
+            restart_manager.run_model()
+
+            for file in self.collect_output_files("mf", restart_manager.flopy_packages["mf"]):
+                os.replace(Path(restart_ws, file), Path(model.model_ws, file))
+
+        model.write_input()
+
+        success = restart_manager.flopy_packages_success.get("mf", False)
+
+        if success:
+            prefixrestart.stitch_records(self._store.file_path(prefix_hash, head_file),
+                                         Path(model.model_ws, head_file), "head", period, totim)
+
+            if drawdown_file is not None and Path(model.model_ws, drawdown_file).is_file():
+                # Drawdowns refer to the starting heads, which are the heads of the prefix run for the restart
+                nodata = tuple(package.hdry for package in [model.get_package('LPF'), model.get_package('UPW')]
+                               if package is not None) + (model.bas6.hnoflo,)
+                prefixrestart.stitch_records(self._store.file_path(prefix_hash, drawdown_file),
+                                             Path(model.model_ws, drawdown_file), "head", period, totim,
+                                             model.bas6.strt.array - heads, nodata)
+
+        self._calculation_adapters = restart_manager.calculation_adapters
+        self._flopy_packages_success["mf"] = success
+        self._run_report["mf"] = {
+            **restart_manager.run_report["mf"],
+            "restart": {"hash": prefix_hash, "stress_period": period}
+        }
+
+        return True
+
+    @staticmethod
+    def collect_input_files(model) -> List[str]:
+        """ Function to collect the names of the input files (name file, package and external files) a flopy
+        model has written to its workspace
+
+        """
+        files = [model.namefile, *model.external_fnames]
+
+        for package in model.packagelist:
+            files += package.file_name
+
+        return sorted({file for file in files if Path(model.model_ws, file).is_file()})
+
+    @staticmethod
+    def collect_output_files(package_type: str,
+                             model) -> List[str]:
+        """ Function to collect the names of the output files a flopy model has written to its workspace
+
+        """
+        files = [*model.output_fnames, f"{model.name}.hob.stat"]
+
+        # Modpath has no list file package
+        lst = getattr(model, "lst", None)
+        if lst is not None:
+            files.append(lst.file_name[0])
+
+        # The flow-transport link file is not registered as output by the lmt package
+        lmt = model.get_package('LMT6')
+        if lmt is not None:
+            files.append(lmt.output_file_name)
+
+        if package_type in ["mt", "swt"]:
+            files += [path.name for pattern in MT_OUTPUT_PATTERNS for path in Path(model.model_ws).glob(pattern)]
+
+        return sorted({file for file in files if Path(model.model_ws, file).is_file()})
+
+    def finish_calculation(self,
+                           package_type: str,
+                           package,
+                           calculation_adapter: FlopyCalculationAdapter):
+        if package_type in ["swt", "mf"] and 'hob' in self._modflowdatamodel.data["mf"]['packages']:
+            print(f'Calculate hob-statistics and write to file {self._uuid}.hob.stat')
+            self.run_hob_statistics(package)
 
-            calculation_success, calculation_report = calculation_adapter.get_success_and_report()
+        calculation_success, calculation_report = calculation_adapter.get_success_and_report()
 
-            self._flopy_packages_success[package_type] = calculation_success
+        self._flopy_packages_success[package_type] = calculation_success
+        self._calculation_adapters[package_type] = calculation_adapter
+        self._run_report[package_type] = calculation_adapter.summary()
 
     @staticmethod
     def run_hob_statistics(model):
@@ -0,0 +1,178 @@
+"""This module holds a pipeline which runs many candidate models through the stages of the FlopyModelManager
+(build, write input, simulate, post-process) in separate threads connected by bounded queues. While
+candidate N simulates, candidate N+1 is built and written and candidate N-1 is post-processed.
+
+"""
+
+import itertools
+import queue
+import threading
+import traceback
+from typing import Any, Callable, Iterable, Optional
+
+from flopyAdapter.datamodel.modflowdatamodel import ModflowDataModel
+from flopyAdapter.flopymodel.flopymodelmanager import FlopyModelManager
+
+# Marks the end of the candidates in the stage queues
+_END = object()
+
+
+class FlopyModelPipeline:
+    """The FlopyModelPipeline processes candidate models in four stages, each running in its own thread:
+
+        build - FlopyModelManager.build_flopymodel
+        write - FlopyModelManager.write_input_model
+        simulate - FlopyModelManager.run_calculation
+        post-process - FlopyModelManager.post_process and the optional fitness function
+
+    The simulation runs in a subprocess and writing is mostly I/O, so the stages overlap even though the
+    python parts share one interpreter. The queues between the stages are bounded, so building doesn't run
+    arbitrarily far ahead of the simulation. If the caller stops iterating the results (or calls close), the
+    pending candidates are dropped and the threads end once their current stage is done.
+
+    Args:
+        fitness (callable) - called with the FlopyModelManager of a successful candidate in the
+        post-process stage, its return value is put into the result
+        queue_size (int) - number of candidates that may wait between two stages
+
+    """
+
+    def __init__(self,
+                 fitness: Optional[Callable[[FlopyModelManager], Any]] = None,
+                 queue_size: int = 1):
+        if fitness is not None and not callable(fitness):
+            raise TypeError("fitness is expected to be callable.")
+        if not isinstance(queue_size, int) or queue_size < 1:
+            raise ValueError("queue_size is expected to be a positive int.")
+
+        self._fitness = fitness
+        self._queue_size = queue_size
+        self._runs = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @staticmethod
+    def build(candidate: dict):
+        candidate["manager"] = FlopyModelManager(candidate["model"], uuid=candidate["uuid"])
+        candidate["manager"].build_flopymodel()
+
+    @staticmethod
+    def write(candidate: dict):
+        candidate["manager"].write_input_model()
+
+    @staticmethod
+    def simulate(candidate: dict):
+        candidate["manager"].run_calculation()
+
+    def post_process(self, candidate: dict):
+        candidate["manager"].post_process()
+        candidate["success"] = candidate["manager"].flopy_packages_success
+
+        if self._fitness is not None and all(candidate["success"].values()):
+            candidate["fitness"] = self._fitness(candidate["manager"])
+
+    @staticmethod
+    def run_stage(stage: Callable[[dict], None],
+                  inbox: queue.Queue,
+                  outbox: queue.Queue,
+                  stop: threading.Event):
+        """ Function that is run by each stage thread. Candidates that failed in an earlier stage or come in
+        after the pipeline was stopped are passed through untouched
+
+        """
+        for candidate in iter(inbox.get, _END):
+            if candidate["error"] is None and not stop.is_set():
+                try:
+                    stage(candidate)
+                except Exception as e:
+                    candidate["error"] = f"{type(e).__name__}: {str(e)}"
+                    print(traceback.format_exc())
+
+            outbox.put(candidate)
+
+        outbox.put(_END)
+
+    @staticmethod
+    def drain(results: queue.Queue,
+              threads: list):
+        """ Function to empty the result queue until all threads ended, so no stage stays blocked on a full
+        queue. The stages pass the remaining candidates through without running them
+
+        """
+        while any(thread.is_alive() for thread in threads):
+            try:
+                results.get(timeout=0.01)
+            except queue.Empty:
+                pass
+
+    def close(self):
+        """ Function to stop the runs whose results are not iterated to the end
+
+        """
+        for run in self._runs:
+            run.close()
+
+        self._runs = []
+
+    def run(self,
+            models: Iterable[ModflowDataModel],
+            uuids: Optional[Iterable[str]] = None):
+        """ Function to run the candidate models through the pipeline
+
+        Args:
+            models (iterable) - the candidates as ModflowDataModel, each with its own model_ws
+            uuids (iterable) - the ids of the calculations
+
+        Returns:
+            generator - yields a dict per candidate in the order of the models with the keys index, manager,
+            success, fitness and error
+
+        """
+        run = self.run_candidates(models, uuids)
+        self._runs.append(run)
+
+        return run
+
+    def run_candidates(self,
+                       models: Iterable[ModflowDataModel],
+                       uuids: Optional[Iterable[str]] = None):
+        stop = threading.Event()
+        stages = [self.build, self.write, self.simulate, self.post_process]
+        queues = [queue.Queue(maxsize=self._queue_size) for _ in range(len(stages) + 1)]
+
+        threads = [threading.Thread(target=self.run_stage, args=(stage, inbox, outbox, stop), daemon=True)
+                   for stage, inbox, outbox in zip(stages, queues[:-1], queues[1:])]
+
+        def feed():
+            try:
+                for index, (model, uuid) in enumerate(zip(models, uuids or itertools.repeat(None))):
+                    if stop.is_set():
+                        break
+                    queues[0].put({
+                        "index": index,
+                        "model": model,
+                        "uuid": uuid,
+                        "manager": None,
+                        "success": {},
+                        "fitness": None,
+                        "error": None
+                    })
+            finally:
+                queues[0].put(_END)
+
+        threads.append(threading.Thread(target=feed, daemon=True))
+
+        for thread in threads:
+            thread.start()
+
+        try:
+            for candidate in iter(queues[-1].get, _END):
+                del candidate["model"], candidate["uuid"]
+                yield candidate
+        finally:
+            stop.set()
+            self.drain(queues[-1], threads)
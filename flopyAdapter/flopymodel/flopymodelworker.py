@@ -0,0 +1,364 @@
+"""This module holds a pool of long-lived worker processes that build and run flopy models. Every worker
+imports flopy and the package adapters once on startup and keeps a cache of base model data, so a job
+only pays for building and simulating its model.
+
+"""
+
+import heapq
+import itertools
+import multiprocessing
+import time
+import traceback
+from collections import OrderedDict
+from copy import deepcopy
+from typing import Optional, List, Union
+from pathlib import Path
+
+from flopyAdapter.datamodel.modflowdatamodel import ModflowDataModel
+from flopyAdapter.flopymodel.runcostestimator import RunCostEstimator
+
+
+def preload():
+    """ Function to import the modules needed for building and running models, so the first job
+    of a worker doesn't pay for it
+
+    """
+    from flopyAdapter.mapping.flopy_package_to_adapter_mapping import FLOPY_PACKAGE_TO_ADAPTER_MAPPER
+    import flopyAdapter.flopymodel.flopymodelmanager  # noqa: F401
+
+    FLOPY_PACKAGE_TO_ADAPTER_MAPPER.preload()
+
+    # Deferred by the hob statistics until first use
+    import scipy.stats  # noqa: F401
+    import sklearn.metrics  # noqa: F401
+
+
+def run_job(job: dict,
+            base_models: OrderedDict,
+            max_cached_models: int) -> dict:
+    """ Function to build and run a single job inside a worker
+
+    Args:
+        job (dict) - the job as created by FlopyModelWorkerPool.submit
+        base_models (OrderedDict) - the worker's cache of base model data keyed by md5 hash
+        max_cached_models (int) - the number of base models kept in the cache
+
+    Returns:
+        result (dict) - the job id, the success and status (success, failed, aborted, timeout, killed) per
+        flopy model, the hash of the model data, the elapsed time and peak memory or an error message
+
+    """
+    from flopyAdapter.flopymodel.flopymodelmanager import FlopyModelManager
+
+    start = time.time()
+
+    result = {
+        "job_id": job["job_id"],
+        "success": {},
+        "status": {},
+        "hash": None,
+        "elapsed": None,
+        "peak_memory": None,
+        "error": None
+    }
+
+    try:
+        if job["data"] is not None:
+            base_hash = ModflowDataModel(job["data"]).md5_hash
+            base_models[base_hash] = job["data"]
+        else:
+            base_hash = job["base_hash"]
+
+        try:
+            base_data = base_models[base_hash]
+        except KeyError:
+            raise KeyError(f"base model {base_hash} is not cached in worker.")
+
+        base_models.move_to_end(base_hash)
+        while len(base_models) > max_cached_models:
+            base_models.popitem(last=False)
+
+        model = ModflowDataModel(deepcopy(base_data))
+
+        if job["model_ws"] is not None:
+            model.model_ws = job["model_ws"]
+
+        if job["objects"]:
+            model.add_objects(job["objects"])
+
+        result["hash"] = model.md5_hash
+
+        flopymodelmanager = FlopyModelManager(model, uuid=job["uuid"], run_limits=job["run_limits"])
+        flopymodelmanager.build_flopymodel()
+        flopymodelmanager.run_model()
+
+        result["success"] = flopymodelmanager.flopy_packages_success
+        # The run report also holds entries of the whole run (e.g. scratch), only the models are reported
+        reports = {package_type: flopymodelmanager.run_report.get(package_type, {})
+                   for package_type in flopymodelmanager.package_types()}
+
+        result["status"] = {package_type: report.get("status") for package_type, report in reports.items()}
+
+        peak_memory = [report.get("peak_memory") for report in reports.values() if report.get("peak_memory")]
+        result["peak_memory"] = max(peak_memory) if peak_memory else None
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {str(e)}"
+        print(traceback.format_exc())
+
+    result["elapsed"] = time.time() - start
+
+    return result
+
+
+def worker_loop(job_queue,
+                result_queue,
+                base_models: List[dict],
+                max_cached_models: int):
+    """ Function that is run by every worker process. It takes jobs from the job queue until it receives
+    None and puts the results to the result queue
+
+    """
+    preload()
+
+    cache = OrderedDict()
+    for data in base_models:
+        cache[ModflowDataModel(data).md5_hash] = data
+
+    for job in iter(job_queue.get, None):
+        result_queue.put(run_job(job, cache, max_cached_models))
+
+
+class FlopyModelWorkerPool:
+    """The FlopyModelWorkerPool keeps a number of worker processes alive, which take modflow model data from
+    a local job queue, build the flopy models with the FlopyModelManager and run them. Base models that are
+    passed on creation are cached in every worker, so following jobs only have to reference the hash of the
+    base model and the objects that are added to it. Base models passed with a job are kept by the pool as
+    well and sent again with jobs that reference them, as they are only cached in the worker that took the
+    job.
+
+    Args:
+        processes (int) - number of worker processes, defaults to the number of cpus
+        base_models (list) - modflow model data that is cached in every worker on startup
+        max_cached_models (int) - number of base models every worker keeps in its cache
+        run_limits (dict) - timeout, max_cpu_time and max_memory of every executable (see FlopyModelManager),
+        so a hung or runaway model frees its worker
+        estimator (RunCostEstimator) - if given, jobs are not queued in the order they are submitted, but
+        the job with the shortest estimated runtime is started whenever a worker is free. Finished jobs are
+        recorded in the estimator
+        memory_budget (int) - bytes the estimated peak memory of all running jobs must stay within, a job
+        that exceeds the budget alone is only started when no other job runs
+
+    """
+
+    def __init__(self,
+                 processes: Optional[int] = None,
+                 base_models: Optional[List[dict]] = None,
+                 max_cached_models: int = 8,
+                 run_limits: Optional[dict] = None,
+                 estimator: Optional[RunCostEstimator] = None,
+                 memory_budget: Optional[int] = None):
+        if processes is not None and (not isinstance(processes, int) or processes < 1):
+            raise ValueError("processes is expected to be a positive int.")
+        if not isinstance(max_cached_models, int) or max_cached_models < 1:
+            raise ValueError("max_cached_models is expected to be a positive int.")
+        if memory_budget is not None and (not isinstance(memory_budget, int) or memory_budget < 1):
+            raise ValueError("memory_budget is expected to be a positive int.")
+
+        self._processes = processes or multiprocessing.cpu_count()
+        self._base_models = list(base_models or [])
+        self._max_cached_models = max_cached_models
+        self._run_limits = run_limits
+
+        if estimator is None and memory_budget is not None:
+            estimator = RunCostEstimator()
+        self._estimator = estimator
+        self._memory_budget = memory_budget
+
+        self._context = multiprocessing.get_context()
+        self._job_queue = None
+        self._result_queue = None
+        self._workers = []
+
+        self._job_ids = itertools.count()
+        self._pending = set()
+
+        # Scheduled jobs waiting for a worker (heap by estimated runtime) and the estimates of the running jobs
+        self._waiting = []
+        self._running = {}
+        self._job_data = {}
+        self._base_data = {ModflowDataModel(data).md5_hash: data for data in self._base_models}
+
+        # Base models passed with jobs, the least recently used are removed beyond max_cached_models
+        self._job_base_data = OrderedDict()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def base_hashes(self):
+        """ Function to return the hashes under which the base models can be referenced by jobs
+
+        """
+        return [ModflowDataModel(data).md5_hash for data in self._base_models]
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    def start(self):
+        if self._workers:
+            return
+
+        # Import in the parent as well, so forked workers start with warm modules
+        preload()
+
+        self._job_queue = self._context.Queue()
+        self._result_queue = self._context.Queue()
+
+        for _ in range(self._processes):
+            worker = self._context.Process(target=worker_loop,
+                                           args=(self._job_queue, self._result_queue,
+                                                 self._base_models, self._max_cached_models),
+                                           daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self,
+               data: Optional[dict] = None,
+               base_hash: Optional[str] = None,
+               objects: Optional[list] = None,
+               model_ws: Optional[Union[str, Path]] = None,
+               uuid: Optional[str] = None,
+               run_limits: Optional[dict] = None) -> int:
+        """ Function to put a job onto the job queue
+
+        Args:
+            data (dict) - modflow model data, which is cached in the worker that takes the job
+            base_hash (str) - the hash of a base model of the pool or of the data of an earlier job, used if no
+            data is given
+            objects (list) - objects (wells) that are added to the model before it is built
+            model_ws (str, Path) - the folder the model is written to and run in
+            uuid (str) - the id of the calculation
+            run_limits (dict) - limits of this job instead of the limits of the pool
+
+        Returns:
+            job_id (int) - the id under which the result is returned
+
+        """
+        if data is None and base_hash is None:
+            raise ValueError("Either data or base_hash has to be given.")
+        if data is not None and not isinstance(data, dict):
+            raise TypeError("data is not a json/dictionary.")
+        if not self._workers:
+            raise RuntimeError("Worker pool is not started.")
+
+        if data is not None:
+            base_data = data
+            base_hash = ModflowDataModel(data).md5_hash
+            self._job_base_data[base_hash] = data
+        elif base_hash in self._base_data:
+            base_data = self._base_data[base_hash]
+        elif base_hash in self._job_base_data:
+            # Cached only in the worker that took the earlier job, any worker may take this one
+            base_data = data = self._job_base_data[base_hash]
+        else:
+            raise ValueError(f"base model {base_hash} is neither a base model of the pool nor the data of a "
+                             f"recent job.")
+
+        if base_hash in self._job_base_data:
+            self._job_base_data.move_to_end(base_hash)
+            while len(self._job_base_data) > self._max_cached_models:
+                self._job_base_data.popitem(last=False)
+
+        job_id = next(self._job_ids)
+
+        job = {
+            "job_id": job_id,
+            "data": data,
+            "base_hash": base_hash if data is None else None,
+            "objects": objects,
+            "model_ws": str(model_ws) if model_ws is not None else None,
+            "uuid": uuid,
+            "run_limits": run_limits if run_limits is not None else self._run_limits
+        }
+        self._pending.add(job_id)
+
+        if self._estimator is None:
+            self._job_queue.put(job)
+            return job_id
+
+        estimate = self._estimator.estimate(base_data)
+
+        self._job_data[job_id] = base_data
+        heapq.heappush(self._waiting, (estimate["runtime"], job_id, job, estimate))
+
+        self.dispatch()
+
+        return job_id
+
+    def dispatch(self):
+        """ Function to pass the scheduled jobs with the shortest estimated runtime to free workers as long
+        as their estimated memory fits into the memory budget
+
+        """
+        while self._waiting and len(self._running) < self._processes:
+            used_memory = sum(estimate["peak_memory"] for estimate in self._running.values())
+
+            candidates = sorted(self._waiting)
+            item = next((item for item in candidates if self._memory_budget is None
+                         or used_memory + item[3]["peak_memory"] <= self._memory_budget), None)
+
+            if item is None:
+                if self._running:
+                    return
+                item = candidates[0]
+
+            self._waiting.remove(item)
+            heapq.heapify(self._waiting)
+
+            _, job_id, job, estimate = item
+
+            self._running[job_id] = estimate
+            self._job_queue.put(job)
+
+    def get_result(self, timeout: Optional[float] = None) -> dict:
+        """ Function to return the next finished job. Raises queue.Empty if no result arrives in time
+
+        """
+        result = self._result_queue.get(timeout=timeout)
+        self._pending.discard(result["job_id"])
+
+        if self._estimator is not None:
+            self._running.pop(result["job_id"], None)
+            data = self._job_data.pop(result["job_id"], None)
+
+            if data is not None and result["error"] is None and result["success"] and \
+                    all(result["success"].values()):
+                self._estimator.record(data, result["elapsed"], result["peak_memory"])
+
+            self.dispatch()
+
+        return result
+
+    def results(self):
+        """ Function to yield the results of all pending jobs in the order they finish
+
+        """
+        while self._pending:
+            yield self.get_result()
+
+    def close(self):
+        """ Function to stop the workers after they finished the jobs in the queue
+
+        """
+        for _ in self._workers:
+            self._job_queue.put(None)
+
+        for worker in self._workers:
+            worker.join()
+
+        self._workers = []
@@ -0,0 +1,261 @@
+"""This module holds the functions to restart a MODFLOW model from the heads of an earlier run, which only
+differs from a later stress period on, e.g. pumping that starts in year 5. The first stress periods are then
+taken from the earlier run and only the remaining ones are simulated with a truncated model.
+
+"""
+
+import json
+import os
+from copy import deepcopy
+from hashlib import md5
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+from flopyAdapter.datamodel.modflowdatamodel import sort_dictionary
+from flopyAdapter.flopy_adapter.flopy_read_classes.binaryrecords import detect_precision, read_records
+
+# Fields whose data per stress period is compared to find the first differing stress period
+PREFIX_PERIOD_FIELDS = {
+    "wel": ["stress_period_data"],
+    "chd": ["stress_period_data"],
+    "rch": ["rech", "irch"]
+}
+
+# Fields with data per stress period, which are reindexed for the restart
+PERIOD_FIELDS = {
+    **PREFIX_PERIOD_FIELDS,
+    "ghb": ["stress_period_data"],
+    "riv": ["stress_period_data"],
+    "drn": ["stress_period_data"],
+    "evt": ["surf", "evtr", "exdp", "ievt"]
+}
+
+DIS_PERIOD_FIELDS = ["perlen", "nstp", "tsmult", "steady"]
+
+# Packages a model may hold to be restarted, others (e.g. hob, lmt) depend on the whole simulation time
+RESTART_PACKAGES = ["mf", "dis", "bas", "bas6", "lpf", "upw", "pcg", "nwt", "oc", *PERIOD_FIELDS]
+
+# Heads/drawdowns with an absolute value above are dry cells
+DRY_VALUE_THRESHOLD = 1e29
+
+
+def is_period_dict(value) -> bool:
+    """ Function to check if a field holds data per stress period, which is given as dict keyed by stress
+    period. Like in flopy a list or array (e.g. stress_period_data=[[0, 14, 39, -5000]]) is the data of the
+    first stress period, which applies to all stress periods
+
+    """
+    return isinstance(value, dict)
+
+
+def period_items(value: dict) -> dict:
+    return {int(period): data for period, data in value.items()}
+
+
+def effective_value(value, period: int):
+    """ Function to return the data that is active in a stress period. Like in flopy the data of a stress
+    period without an entry is taken from the last stress period before with an entry
+
+    """
+    if not is_period_dict(value):
+        return value
+
+    items = period_items(value)
+    periods = [item_period for item_period in items if item_period <= period]
+
+    if not periods:
+        return None
+
+    return items[max(periods)]
+
+
+def digest(data) -> str:
+    if isinstance(data, dict):
+        data = sort_dictionary(deepcopy(data), recursive=True)
+
+    return md5(json.dumps(data).encode("utf-8")).hexdigest()
+
+
+def prefix_key(data: dict) -> Optional[dict]:
+    """ Function to create the key of a mf model which is used to find earlier runs to restart from
+
+    Args:
+        data (dict) - the modflow model data
+
+    Returns:
+        key (dict) - the hash of the data that has to be equal for all stress periods ('static_hash') and a
+        hash per stress period of the wel, chd and rch data ('period_hashes'), None if the model can't be
+        restarted
+
+    """
+    if "mf" not in data or any(module in data for module in ["mt", "mp", "swt"]):
+        return None
+    if any(package.lower() not in RESTART_PACKAGES for package in data["mf"]["packages"]):
+        return None
+
+    static_data = deepcopy(data["mf"])
+    static_data["mf"].pop("model_ws", None)
+
+    for package, fields in PREFIX_PERIOD_FIELDS.items():
+        for field in fields:
+            if package in static_data:
+                static_data[package].pop(field, None)
+
+    period_hashes = []
+    for period in range(data["mf"]["dis"]["nper"]):
+        period_hashes.append(digest({
+            f"{package}.{field}": effective_value(data["mf"][package].get(field), period)
+            for package, fields in PREFIX_PERIOD_FIELDS.items() if package in data["mf"]
+            for field in fields
+        }))
+
+    return {
+        "static_hash": digest(static_data),
+        "period_hashes": period_hashes
+    }
+
+
+def first_differing_period(key: dict, other_key: dict) -> int:
+    """ Function to return the first stress period in which two models differ, 0 if they can't share
+    any stress periods
+
+    """
+    if key["static_hash"] != other_key["static_hash"]:
+        return 0
+
+    period = 0
+    for period_hash, other_period_hash in zip(key["period_hashes"], other_key["period_hashes"]):
+        if period_hash != other_period_hash:
+            break
+        period += 1
+
+    return period
+
+
+def restart_data(data: dict,
+                 period: int,
+                 strt: np.ndarray) -> dict:
+    """ Function to create the model data of a restart in a stress period
+
+    Args:
+        data (dict) - the modflow model data
+        period (int) - the first stress period that is simulated (zero based)
+        strt (np.ndarray) - the heads at the end of the stress period before
+
+    Returns:
+        data (dict) - the model data with the stress periods from period on, reindexed from 0
+
+    """
+    data = deepcopy(data)
+    mf_data = data["mf"]
+
+    for field in DIS_PERIOD_FIELDS:
+        if isinstance(mf_data["dis"].get(field), list):
+            mf_data["dis"][field] = mf_data["dis"][field][period:]
+    mf_data["dis"]["nper"] -= period
+
+    mf_data["bas"]["strt"] = strt.tolist()
+
+    for package, fields in PERIOD_FIELDS.items():
+        if package not in mf_data:
+            continue
+
+        for field in fields:
+            value = mf_data[package].get(field)
+
+            # Data that applies to all stress periods is kept as it is
+            if not is_period_dict(value):
+                continue
+
+            restart_value = {
+                str(item_period - period): item
+                for item_period, item in period_items(value).items() if item_period > period
+            }
+
+            active_value = effective_value(value, period)
+            if active_value is not None:
+                restart_value["0"] = active_value
+
+            mf_data[package][field] = restart_value
+
+    oc_data = mf_data.get("oc", {}).get("stress_period_data")
+    if isinstance(oc_data, list):
+        # Output control is given as [[stress period, time step], actions] and only applies to the listed time
+        # steps, so the restart saves the same time steps as the full run
+        mf_data["oc"]["stress_period_data"] = [[[item[0][0] - period, item[0][1]], item[1]] for item in oc_data
+                                               if item[0][0] >= period]
+
+    return data
+
+
+def restart_records(restart_file: Path,
+                    kind: str):
+    """ Function to iterate over the records of the restart file, none if it's missing or empty
+
+    """
+    if not restart_file.is_file():
+        return
+
+    with open(restart_file, "rb") as f:
+        precision = detect_precision(f, kind)
+
+        if precision is None:
+            return
+
+        for header, data, _ in read_records(f, 0, kind, precision):
+            yield header, data
+
+
+def stitch_records(prefix_file: Union[str, Path],
+                   restart_file: Union[str, Path],
+                   kind: str,
+                   period: int,
+                   totim: float,
+                   correction: Optional[np.ndarray] = None,
+                   nodata: tuple = ()):
+    """ Function to put the records of the prefix run before the records of the restart, so the restart
+    file holds the complete time series. The stress periods and times of the restart are shifted
+
+    Args:
+        prefix_file (str, Path) - the binary file of the run the model was restarted from
+        restart_file (str, Path) - the binary file of the restart, which is replaced (or created if the restart
+        saved no records)
+        kind (str) - 'head' (also used for drawdown)
+        period (int) - the first stress period of the restart (zero based)
+        totim (float) - the simulation time at the end of the stress period before
+        correction (np.ndarray) - nlay, nrow, ncol values added to the restart records (drawdowns refer to
+        the starting heads, which differ for the restart)
+        nodata (tuple) - values which are not corrected
+
+    """
+    restart_file = Path(restart_file)
+    temporary_file = restart_file.with_name(f"{restart_file.name}.stitch")
+
+    with open(temporary_file, "wb") as target:
+        with open(prefix_file, "rb") as f:
+            precision = detect_precision(f, kind)
+
+            for header, data, _ in read_records(f, 0, kind, precision):
+                if header["kper"] > period:
+                    break
+
+                target.write(header.tobytes())
+                target.write(data.tobytes())
+
+        # The restart saves no records if the output control lists no time steps after the restart
+        for header, data in restart_records(restart_file, kind):
+            header = np.array(header, dtype=header.dtype)
+            header["kper"] += period
+            header["totim"] += totim
+
+            if correction is not None:
+                layer_correction = correction[header["ilay"] - 1]
+                valid = (np.abs(data) < DRY_VALUE_THRESHOLD) & ~np.isin(data, nodata)
+                data = np.where(valid, data + layer_correction, data).astype(data.dtype)
+
+            target.write(header.tobytes())
+            target.write(data.tobytes())
+
+    os.replace(temporary_file, restart_file)
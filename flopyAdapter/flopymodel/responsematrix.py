@@ -0,0 +1,299 @@
+"""This module holds an engine that evaluates well placement candidates of linear models by superposition. The
+head change caused by a well in a confined model without nonlinear boundaries is proportional to its rate,
+so one simulation per well location and stress period is enough to calculate the heads of any combination of
+well rates.
+
+"""
+
+from copy import deepcopy
+from pathlib import Path
+from typing import List, Optional, Union
+
+import numpy as np
+
+from flopyAdapter.datamodel.modflowdatamodel import ModflowDataModel
+from flopyAdapter.datamodel.outputcontrol import timestep_end_times
+from flopyAdapter.flopymodel.flopymodelmanager import FlopyModelManager
+
+# Packages that keep the model linear in the well rates. GHB and CHD are head dependent but linear,
+# while DRN, RIV and EVT switch off at a head and NWT/UPW are only used with convertible layers
+LINEAR_PACKAGES = ["mf", "dis", "bas", "bas6", "lpf", "pcg", "oc", "wel", "chd", "ghb", "rch"]
+
+WELL_OBJECT_TYPES = ["wel", "well"]
+
+
+def linearity_violation(data: dict) -> Optional[str]:
+    """ Function to check if the heads of a model are a linear function of the well rates
+
+    Args:
+        data (dict) - the modflow model data
+
+    Returns:
+        reason (str) - why the model is not linear or None if it is linear
+
+    """
+    from flopyAdapter.mapping.flopy_package_to_adapter_mapping import FLOPY_PACKAGE_TO_ADAPTER_MAPPER
+
+    other_modules = [module for module in data if module != "mf"]
+    if other_modules:
+        return f"model has other modules than mf: {', '.join(other_modules)}"
+
+    packages = [package.lower() for package in data["mf"]["packages"]]
+
+    nonlinear_packages = [package for package in packages if package not in LINEAR_PACKAGES]
+    if nonlinear_packages:
+        return f"model has nonlinear or unsupported packages: {', '.join(nonlinear_packages)}"
+
+    if "lpf" not in packages:
+        return "model has no lpf package"
+
+    laytyp = FLOPY_PACKAGE_TO_ADAPTER_MAPPER["lpf"](data["mf"]["lpf"]).merge()["laytyp"]
+    if np.any(np.array(laytyp) != 0):
+        return "model has convertible layers (laytyp != 0)"
+
+    return None
+
+
+def object_wells(objects: list) -> Optional[list]:
+    """ Function to return the wells of the optimization objects
+
+    Returns:
+        wells (list) - lay, row, col and the rates per stress period of every well or None if there are
+        other objects than wells
+
+    """
+    wells = []
+
+    for obj in objects:
+        if obj["type"] not in WELL_OBJECT_TYPES:
+            return None
+
+        wells.append((int(obj["position"]["lay"]["result"]),
+                      int(obj["position"]["row"]["result"]),
+                      int(obj["position"]["col"]["result"]),
+                      [float(period_data["result"]) for period_data in obj["flux"].values()]))
+
+    return wells
+
+
+class ResponseMatrixEngine:
+    """The ResponseMatrixEngine calculates the heads of well placement candidates as heads of the base model
+    plus the sum of the responses of the single wells. The response of a location and stress period is the
+    head change of a simulation with a pulse of pulse_rate in that stress period divided by pulse_rate. It
+    is simulated with add_well and FlopyModelManager the first time the location is needed and cached in
+    memory and in workspace. The pulse rate shouldn't be too small, as the responses would be dominated by
+    the solver tolerance then. Models that are not linear (see linearity_violation) and optimizations with
+    other objectives than heads, fluxes and input concentrations are evaluated with full runs.
+
+    Args:
+        model (ModflowDataModel) - the base model without the candidate wells
+        workspace (str, Path) - folder for the pulse simulations, the cached responses and full runs
+        pulse_rate (float) - the rate of the pulse simulations
+
+    """
+
+    def __init__(self,
+                 model: ModflowDataModel,
+                 workspace: Union[str, Path],
+                 pulse_rate: float = -1000.0):
+        if not isinstance(model, ModflowDataModel):
+            raise TypeError("Error: model is not a ModflowDataModel.")
+        if not isinstance(workspace, (str, Path)):
+            raise TypeError("Error: workspace is not a str/Path.")
+        if not pulse_rate:
+            raise ValueError("pulse_rate is expected to be non zero.")
+
+        self._model = model
+        self._workspace = Path(workspace)
+        self._pulse_rate = pulse_rate
+
+        self._linearity_violation = linearity_violation(model.data)
+
+        self._response_folder = self._workspace / f"responses_{model.module_hash('mf')}"
+        self._responses = {}
+        self._base_heads = None
+        self._base_flopy_model = None
+
+        self._full_runs = 0
+
+    @property
+    def is_linear(self) -> bool:
+        return self._linearity_violation is None
+
+    @property
+    def linearity_violation(self) -> Optional[str]:
+        return self._linearity_violation
+
+    @property
+    def number_of_responses(self) -> int:
+        return len(self._responses)
+
+    @property
+    def full_runs(self) -> int:
+        return self._full_runs
+
+    def simulate(self,
+                 name: str,
+                 wells: list):
+        """ Function to run the base model with additional wells
+
+        Args:
+            name (str) - the folder of the simulation in the workspace
+            wells (list) - lay, row, col and rates per stress period of the wells
+
+        Returns:
+            flopy model - the simulated mf model
+
+        """
+        model = ModflowDataModel(deepcopy(self._model.data))
+        model.model_ws = str(self._workspace / name)
+
+        for lay, row, col, rates in wells:
+            model.add_well(lay=lay, row=row, col=col, pumping_rates=rates)
+
+        manager = FlopyModelManager(model)
+        manager.build_flopymodel()
+        manager.run_model()
+
+        if not manager.flopy_packages_success.get("mf"):
+            raise ValueError(f"simulation {name} did not terminate normally.")
+
+        return manager.flopy_packages["mf"]
+
+    @staticmethod
+    def read_heads(flopy_model) -> np.ndarray:
+        """ Function to read the heads of a run with one entry per time step, matched to the time steps like
+        the FlopyFitnessAdapter does for the head file
+
+        """
+        import flopy
+        from flopyAdapter.flopy_adapter.flopy_fitnessadapter import FlopyFitnessAdapter
+
+        dis = flopy_model.get_package('DIS')
+        times = timestep_end_times(dis.perlen.array, dis.nstp.array, dis.tsmult.array)
+
+        head_file = flopy.utils.HeadFile(f"{Path(flopy_model.model_ws, flopy_model.name)}.hds")
+        heads = FlopyFitnessAdapter.timestep_data(head_file, len(times), times)
+        head_file.close()
+
+        return heads
+
+    @property
+    def base_heads(self) -> np.ndarray:
+        if self._base_heads is None:
+            self._base_flopy_model = self.simulate("base", [])
+            self._base_heads = self.read_heads(self._base_flopy_model)
+
+        return self._base_heads
+
+    def response(self,
+                 lay: int,
+                 row: int,
+                 col: int,
+                 period: int) -> np.ndarray:
+        """ Function to return the head change per unit rate of a well in a stress period
+
+        """
+        key = (lay, row, col, period)
+
+        if key not in self._responses:
+            response_file = self._response_folder / f"{lay}_{row}_{col}_{period}.npy"
+
+            if response_file.is_file():
+                self._responses[key] = np.load(response_file)
+            else:
+                base_heads = self.base_heads
+
+                rates = [0.0] * self._model.nper
+                rates[period] = self._pulse_rate
+
+                print(f"Simulate response of well at lay {lay}, row {row}, col {col} in stress period {period}")
+
+                pulse_heads = self.read_heads(self.simulate(f"pulse_{lay}_{row}_{col}_{period}",
+                                                            [(lay, row, col, rates)]))
+
+                self._responses[key] = (pulse_heads - base_heads) / self._pulse_rate
+
+                self._response_folder.mkdir(parents=True, exist_ok=True)
+                np.save(response_file, self._responses[key])
+
+        return self._responses[key]
+
+    def superpose(self, wells: list) -> np.ndarray:
+        """ Function to calculate the heads of the base model with additional wells
+
+        Args:
+            wells (list) - lay, row, col and rates per stress period of the wells
+
+        Returns:
+            heads (np.ndarray) - nstp_flat, nlay, nrow, ncol heads with nan for no data
+
+        """
+        heads = self.base_heads.copy()
+
+        for lay, row, col, rates in wells:
+            if len(rates) != self._model.nper:
+                raise ValueError(f"number of p-rates={len(rates)} not equal to nper={self._model.nper}")
+
+            for period, rate in enumerate(rates):
+                if rate:
+                    heads += rate * self.response(lay, row, col, period)
+
+        return heads
+
+    def get_fitness(self, optimization_data: dict) -> List[float]:
+        """ Function to calculate the fitness of a candidate like FlopyFitnessAdapter.get_fitness
+
+        Args:
+            optimization_data (dict) - objectives, constraints and objects (wells) of the candidate
+
+        Returns:
+            fitness (list) - the objective values or penalty values if a constraint is violated
+
+        """
+        from flopyAdapter.flopy_adapter.flopy_fitnessadapter import FlopyFitnessAdapter
+
+        wells = object_wells(optimization_data["objects"])
+
+        reason = self._linearity_violation
+        if reason is None and wells is None:
+            reason = "objects are not only wells"
+        if reason is None and any(item["type"] not in ["head", "flux", "input_concentration"]
+                                  for item in [*optimization_data["objectives"],
+                                               *optimization_data["constraints"]]):
+            reason = "objectives or constraints depend on other results than heads"
+
+        if reason is not None:
+            print(f"Superposition not possible ({reason}), run full model")
+            return self.get_fitness_of_full_run(optimization_data)
+
+        heads = self.superpose(wells)
+
+        fitness_adapter = FlopyFitnessAdapter.from_data(optimization_data, self._base_flopy_model)
+        fitness_adapter.set_heads(heads)
+
+        return fitness_adapter.get_fitness()
+
+    def get_fitness_of_full_run(self, optimization_data: dict) -> List[float]:
+        from flopyAdapter.flopy_adapter.flopy_fitnessadapter import FlopyFitnessAdapter
+
+        self._full_runs += 1
+
+        model = ModflowDataModel(deepcopy(self._model.data))
+        model.model_ws = str(self._workspace / "full")
+
+        wells = object_wells(optimization_data["objects"])
+        if wells is not None:
+            for lay, row, col, rates in wells:
+                model.add_well(lay=lay, row=row, col=col, pumping_rates=rates)
+        else:
+            model.add_objects(optimization_data["objects"])
+
+        manager = FlopyModelManager(model)
+        manager.build_flopymodel()
+        manager.run_model()
+
+        if not all(manager.flopy_packages_success.values()):
+            return [objective["penalty_value"] for objective in optimization_data["objectives"]]
+
+        return FlopyFitnessAdapter.from_data(optimization_data, manager.flopy_packages["mf"]).get_fitness()
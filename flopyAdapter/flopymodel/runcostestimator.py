@@ -0,0 +1,208 @@
+"""This module holds an estimator of the runtime and peak memory of model runs, which is used to schedule the
+jobs of the worker pool. The estimates are derived from the size of the model data and learned from the
+timings of finished runs.
+
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+# Estimates used until there are enough recorded runs, per cell and time step (runtime) and per cell (memory)
+DEFAULT_RUNTIME_PER_CELL_STEP = 2e-6
+DEFAULT_MEMORY_PER_CELL = 2000
+DEFAULT_BASE_MEMORY = 20 * 1024 ** 2
+
+# Transport is simulated per species and usually needs several transport steps per flow time step
+DEFAULT_TRANSPORT_FACTOR = 5
+
+# Recorded runs needed per regression coefficient before the estimates are fitted to the records
+RECORDS_PER_COEFFICIENT = 3
+
+SOLVERS = ["pcg", "nwt", "sip", "de4", "gmg"]
+
+
+def model_features(data: dict) -> dict:
+    """ Function to extract the properties of a model that drive its runtime and memory
+
+    Args:
+        data (dict) - the modflow model data
+
+    Returns:
+        features (dict) - number of cells, total number of time steps, solver, number of transport species
+        and number of packages
+
+    """
+    module = "swt" if "swt" in data else "mf"
+    dis = data[module]["dis"]
+
+    nstp = dis.get("nstp", 1)
+    nstp = sum(nstp) if isinstance(nstp, list) else nstp * dis["nper"]
+
+    packages = [package.lower() for package in data[module]["packages"]]
+
+    ncomp = 0
+    if "mt" in data or module == "swt":
+        btn = data.get("mt", data[module]).get("btn", {})
+        ncomp = btn.get("ncomp", 1) or 1
+
+    return {
+        "cells": dis["nlay"] * dis["nrow"] * dis["ncol"],
+        "nstp": nstp,
+        "solver": next((package for package in packages if package in SOLVERS), None),
+        "ncomp": ncomp,
+        "packages": len(packages) + sum(len(data[other]["packages"]) for other in ["mt", "mp"] if other in data)
+    }
+
+
+def runtime_vector(features: dict) -> np.ndarray:
+    """ Function to return the regressors of the logarithmic runtime
+
+    """
+    return np.array([1.0,
+                     np.log(features["cells"]),
+                     np.log(max(features["nstp"], 1)),
+                     np.log1p(features["ncomp"]),
+                     1.0 if features["solver"] == "nwt" else 0.0,
+                     features["packages"]])
+
+
+def memory_vector(features: dict) -> np.ndarray:
+    """ Function to return the regressors of the logarithmic peak memory
+
+    """
+    return np.array([1.0,
+                     np.log(features["cells"]),
+                     np.log1p(features["ncomp"])])
+
+
+def default_runtime(features: dict) -> float:
+    transport = 1 + DEFAULT_TRANSPORT_FACTOR * features["ncomp"]
+    return DEFAULT_RUNTIME_PER_CELL_STEP * features["cells"] * features["nstp"] * transport
+
+
+def default_memory(features: dict) -> float:
+    return DEFAULT_BASE_MEMORY + DEFAULT_MEMORY_PER_CELL * features["cells"] * (1 + features["ncomp"])
+
+
+class RunCostEstimator:
+    """The RunCostEstimator predicts the runtime (seconds) and peak memory (bytes) of a model run from its
+    features (see model_features). Until there are RECORDS_PER_COEFFICIENT recorded runs per coefficient,
+    the default estimates are scaled by the median ratio of the recorded to the default values. Afterwards
+    log-linear models are fitted by least squares to the records. Records are appended to records_file, so
+    the estimator keeps learning across sessions.
+
+    Args:
+        records_file (str, Path) - json lines file the recorded runs are read from and appended to
+
+    """
+
+    def __init__(self,
+                 records_file: Optional[Union[str, Path]] = None):
+        if records_file is not None and not isinstance(records_file, (str, Path)):
+            raise TypeError("Error: records_file is not a str/Path.")
+
+        self._records_file = Path(records_file) if records_file is not None else None
+        self._records = []
+        self._coefficients = None
+        self._lock = threading.Lock()
+
+        if self._records_file is not None and self._records_file.is_file():
+            with open(self._records_file) as f:
+                self._records = [json.loads(line) for line in f if line.strip()]
+
+    @property
+    def records(self) -> list:
+        return list(self._records)
+
+    def record(self,
+               data: dict,
+               runtime: float,
+               peak_memory: Optional[int] = None):
+        """ Function to add the timing of a finished run
+
+        Args:
+            data (dict) - the modflow model data
+            runtime (float) - the runtime in seconds
+            peak_memory (int) - the peak memory in bytes, None if it wasn't measured
+
+        """
+        record = {
+            "features": model_features(data),
+            "runtime": runtime,
+            "peak_memory": peak_memory
+        }
+
+        with self._lock:
+            self._records.append(record)
+            self._coefficients = None
+
+            if self._records_file is not None:
+                with open(self._records_file, "a") as f:
+                    f.write(json.dumps(record) + "\n")
+
+    @staticmethod
+    def fit_values(records: list,
+                   vector,
+                   default,
+                   key: str):
+        """ Function to fit the coefficients of the logarithmic value or the scale of the default estimate
+
+        Returns:
+            tuple - ('fit', coefficients) or ('scale', factor)
+
+        """
+        records = [record for record in records if record[key]]
+
+        if not records:
+            return "scale", 1.0
+
+        number_of_coefficients = len(vector(records[0]["features"]))
+
+        if len(records) < RECORDS_PER_COEFFICIENT * number_of_coefficients:
+            return "scale", float(np.median([record[key] / default(record["features"]) for record in records]))
+
+        a = np.array([vector(record["features"]) for record in records])
+        b = np.log([record[key] for record in records])
+
+        coefficients, _, _, _ = np.linalg.lstsq(a, b, rcond=None)
+
+        return "fit", coefficients
+
+    def coefficients(self) -> dict:
+        with self._lock:
+            if self._coefficients is None:
+                self._coefficients = {
+                    "runtime": self.fit_values(self._records, runtime_vector, default_runtime, "runtime"),
+                    "peak_memory": self.fit_values(self._records, memory_vector, default_memory, "peak_memory")
+                }
+
+            return self._coefficients
+
+    def estimate(self, data: dict) -> dict:
+        """ Function to predict the cost of a run
+
+        Args:
+            data (dict) - the modflow model data
+
+        Returns:
+            estimate (dict) - runtime (seconds) and peak_memory (bytes)
+
+        """
+        features = model_features(data)
+        coefficients = self.coefficients()
+
+        estimate = {}
+        for key, vector, default in [("runtime", runtime_vector, default_runtime),
+                                     ("peak_memory", memory_vector, default_memory)]:
+            method, value = coefficients[key]
+
+            if method == "fit":
+                estimate[key] = float(np.exp(vector(features) @ value))
+            else:
+                estimate[key] = default(features) * value
+
+        return estimate
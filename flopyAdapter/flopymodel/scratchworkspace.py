@@ -0,0 +1,101 @@
+"""This module holds the scratch workspaces of the FlopyModelManager. The flopy models are written to and run in
+a folder on a RAM-backed or local file system and only the files the caller needs are copied back to the
+workspace of the model, so large intermediate outputs (.ddn, .cbc, .ftl) never reach a network mounted
+project folder.
+
+"""
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import List, Optional, Union
+
+# Scratch root that is RAM-backed on most linux systems
+SHARED_MEMORY = "/dev/shm"
+
+# Chooses the shared memory if available and the local temporary folder otherwise
+SCRATCH_AUTO = "auto"
+
+# Files copied back if the caller doesn't name any: heads, list files, hob output and concentrations
+DEFAULT_KEEP_FILES = ["*.hds", "*.list", "*.hob.out", "*.hob.stat", "MT3D*.UCN"]
+
+SCRATCH_PREFIX = "flopy-scratch-"
+
+
+def scratch_root(scratch: Union[str, Path]) -> Path:
+    """ Function to return the folder in which the scratch workspaces are created
+
+    Args:
+        scratch (str, Path) - a folder or SCRATCH_AUTO
+
+    """
+    if scratch == SCRATCH_AUTO:
+        if os.path.isdir(SHARED_MEMORY) and os.access(SHARED_MEMORY, os.W_OK):
+            return Path(SHARED_MEMORY)
+        return Path(tempfile.gettempdir())
+
+    Path(scratch).mkdir(parents=True, exist_ok=True)
+
+    return Path(scratch)
+
+
+def keep_file(file_name: str, keep_files: List[str]) -> bool:
+    """ Function to check if a file matches one of the patterns (e.g. '*.hds' or 'modflowtest.list')
+
+    """
+    return any(fnmatch(file_name, pattern) for pattern in keep_files)
+
+
+@contextmanager
+def scratch_workspace(models: dict,
+                      scratch: Union[str, Path],
+                      keep_files: Optional[List[str]] = None):
+    """ Function to move flopy models into a scratch workspace for the time of the context. Models sharing a
+    workspace (mf and mt) share a scratch workspace as well. On exit the files matching keep_files are
+    copied back, the models are moved back to their workspaces and the scratch workspace is removed, also
+    if the run failed
+
+    Args:
+        models (dict) - the flopy models by type
+        scratch (str, Path) - the folder the scratch workspaces are created in or SCRATCH_AUTO
+        keep_files (list) - file names or patterns of files that are copied back, defaults to
+        DEFAULT_KEEP_FILES
+
+    Returns:
+        report (dict) - the scratch workspace ('path') and the files that were copied back ('copied'), which
+        are filled in on exit
+
+    """
+    keep_files = DEFAULT_KEEP_FILES if keep_files is None else keep_files
+
+    root = Path(tempfile.mkdtemp(prefix=SCRATCH_PREFIX, dir=scratch_root(scratch)))
+
+    model_ws = {package_type: model.model_ws for package_type, model in models.items()}
+    scratch_ws = {ws: root / str(index) for index, ws in enumerate(sorted(set(model_ws.values())))}
+
+    report = {"path": str(root), "copied": []}
+
+    try:
+        for package_type, model in models.items():
+            model.change_model_ws(str(scratch_ws[model_ws[package_type]]))
+
+        yield report
+    finally:
+        for ws, folder in scratch_ws.items():
+            if not folder.is_dir():
+                continue
+
+            Path(ws).mkdir(parents=True, exist_ok=True)
+
+            for file in sorted(folder.iterdir()):
+                if file.is_file() and keep_file(file.name, keep_files):
+                    shutil.copyfile(file, Path(ws, file.name))
+                    report["copied"].append(file.name)
+
+        for package_type, model in models.items():
+            model.change_model_ws(model_ws[package_type])
+
+        shutil.rmtree(root, ignore_errors=True)
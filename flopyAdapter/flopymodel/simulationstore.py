@@ -0,0 +1,277 @@
+"""This module holds a content-addressed store for the outputs of finished simulations. Entries are keyed by
+the hash of the model data (see ModflowDataModel.module_hash), so a model that was already calculated can be
+restored into a workspace instead of running it again.
+
+"""
+
+import json
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Optional, List, Union
+
+META_FILE = "meta.json"
+PREFIX_FILE = "prefix.json"
+# Holds the time of the last use of an entry in nanoseconds, apart from the meta file so it's cheap to update
+USED_FILE = "used"
+FILES_FOLDER = "files"
+
+
+class SimulationStore:
+    """The SimulationStore keeps the output files (heads, drawdowns, list files, concentrations, hob output)
+    and the input files of finished simulations in a folder per hash together with a meta file holding the
+    success, the run report and the model data. Entries are evicted least recently used first, once the store
+    exceeds max_size (bytes) or max_entries. Entries are written to a temporary folder first and renamed, so
+    several managers/processes can share one store.
+
+    Args:
+        root (str, Path) - the folder of the store
+        max_size (int) - maximum size of all stored files in bytes, None for no limit
+        max_entries (int) - maximum number of entries, None for no limit
+
+    """
+
+    def __init__(self,
+                 root: Union[str, Path],
+                 max_size: Optional[int] = None,
+                 max_entries: Optional[int] = None):
+        if not isinstance(root, (str, Path)):
+            raise TypeError("Error: root is not a str/Path.")
+        if max_size is not None and (not isinstance(max_size, int) or max_size < 0):
+            raise ValueError("max_size is expected to be a positive int.")
+        if max_entries is not None and (not isinstance(max_entries, int) or max_entries < 1):
+            raise ValueError("max_entries is expected to be a positive int.")
+
+        self._root = Path(root)
+        self._max_size = max_size
+        self._max_entries = max_entries
+
+        # Last use time handed out by this store, uses are strictly ordered even with a coarse clock
+        self._last_used = 0
+
+        self._root.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def root(self):
+        return self._root
+
+    def __contains__(self, hash: str):
+        return (self._root / hash / META_FILE).is_file()
+
+    def hashes(self) -> List[str]:
+        return [entry.name for entry in self._root.iterdir() if (entry / META_FILE).is_file()]
+
+    def get(self, hash: str) -> Optional[dict]:
+        """ Function to return the meta data of an entry and mark it as recently used
+
+        Args:
+            hash (str) - the hash of the model data
+
+        Returns:
+            meta (dict) - hash, module, files, size, success, report and data of the entry or None if the
+            hash is not in the store
+
+        """
+        try:
+            with open(self._root / hash / META_FILE) as f:
+                meta = json.load(f)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+
+        self.touch(hash)
+
+        return meta
+
+    def next_used(self) -> int:
+        self._last_used = max(time.time_ns(), self._last_used + 1)
+        return self._last_used
+
+    def touch(self, hash: str):
+        if not (self._root / hash).is_dir():
+            return
+
+        try:
+            (self._root / hash / USED_FILE).write_text(str(self.next_used()))
+        except (FileNotFoundError, NotADirectoryError):
+            pass
+
+    def last_used(self, hash: str) -> int:
+        """ Function to return the time of the last use of an entry in nanoseconds, entries without time of
+        last use count as used when they were created
+
+        """
+        try:
+            return int((self._root / hash / USED_FILE).read_text())
+        except (FileNotFoundError, NotADirectoryError, ValueError):
+            pass
+
+        with open(self._root / hash / META_FILE) as f:
+            return int(json.load(f)["created"] * 1e9)
+
+    def put(self,
+            hash: str,
+            module: str,
+            model_ws: Union[str, Path],
+            files: List[str],
+            success: bool,
+            report: Optional[dict] = None,
+            data: Optional[dict] = None,
+            prefix: Optional[dict] = None) -> dict:
+        """ Function to copy the files of a finished simulation into the store
+
+        Args:
+            hash (str) - the hash of the model data
+            module (str) - the flopy model the files belong to (mf, mt, swt)
+            model_ws (str, Path) - the workspace the simulation was run in
+            files (list) - the names of the input and output files in the workspace
+            success (bool) - if the simulation terminated normally
+            report (dict) - the run report of the simulation
+            data (dict) - the model data, used to rehydrate a manager with FlopyModelManager.from_hash
+            prefix (dict) - the key to find the entry as prefix run for a restart (see prefixrestart)
+
+        Returns:
+            meta (dict) - the meta data of the entry
+
+        """
+        if hash in self:
+            self.touch(hash)
+            return self.get(hash)
+
+        temporary_folder = self._root / f".tmp-{uuid.uuid4().hex}"
+        (temporary_folder / FILES_FOLDER).mkdir(parents=True)
+
+        try:
+            size = 0
+            for file in files:
+                shutil.copyfile(Path(model_ws, file), temporary_folder / FILES_FOLDER / file)
+                size += (temporary_folder / FILES_FOLDER / file).stat().st_size
+
+            meta = {
+                "hash": hash,
+                "module": module,
+                "files": list(files),
+                "size": size,
+                "created": time.time(),
+                "success": success,
+                "report": report,
+                "data": data
+            }
+
+            with open(temporary_folder / META_FILE, "w") as f:
+                json.dump(meta, f)
+
+            (temporary_folder / USED_FILE).write_text(str(self.next_used()))
+
+            if prefix is not None:
+                # Kept apart from the meta file, so searching prefixes doesn't load the model data
+                with open(temporary_folder / PREFIX_FILE, "w") as f:
+                    json.dump(prefix, f)
+
+            try:
+                os.rename(temporary_folder, self._root / hash)
+            except OSError:
+                # Stored by another manager in the meantime
+                shutil.rmtree(temporary_folder, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(temporary_folder, ignore_errors=True)
+            raise
+
+        print(f'Stored {len(files)} files of {module} model {hash}')
+
+        self.evict(keep=hash)
+
+        return meta
+
+    def restore(self,
+                hash: str,
+                model_ws: Union[str, Path]) -> Optional[dict]:
+        """ Function to copy the files of an entry into a workspace. Files are copied and not linked,
+        as the executables overwrite their output files in place
+
+        Args:
+            hash (str) - the hash of the model data
+            model_ws (str, Path) - the workspace the files are copied to
+
+        Returns:
+            meta (dict) - the meta data of the entry or None if the hash is not in the store
+
+        """
+        meta = self.get(hash)
+
+        if meta is None:
+            return None
+
+        Path(model_ws).mkdir(parents=True, exist_ok=True)
+
+        try:
+            for file in meta["files"]:
+                shutil.copyfile(self._root / hash / FILES_FOLDER / file, Path(model_ws, file))
+        except FileNotFoundError:
+            # Evicted by another manager while copying
+            return None
+
+        print(f'Restored {len(meta["files"])} files of {meta["module"]} model {hash}')
+
+        return meta
+
+    def prefixes(self):
+        """ Function to iterate over the prefix keys of the entries without marking them as used
+
+        Returns:
+            generator - yields hash and prefix key of every entry that has one
+
+        """
+        for hash in self.hashes():
+            try:
+                with open(self._root / hash / PREFIX_FILE) as f:
+                    yield hash, json.load(f)
+            except (FileNotFoundError, ValueError):
+                continue
+
+    def file_path(self,
+                  hash: str,
+                  file: str) -> Path:
+        return self._root / hash / FILES_FOLDER / file
+
+    def remove(self, hash: str):
+        shutil.rmtree(self._root / hash, ignore_errors=True)
+
+    def evict(self, keep: Optional[str] = None):
+        """ Function to remove the least recently used entries until the store is within its limits
+
+        Args:
+            keep (str) - hash of an entry that must not be removed (the one that was just stored)
+
+        """
+        if self._max_size is None and self._max_entries is None:
+            return
+
+        entries = []
+        for hash in self.hashes():
+            try:
+                with open(self._root / hash / META_FILE) as f:
+                    size = json.load(f)["size"]
+                entries.append((self.last_used(hash), hash, size))
+            except (FileNotFoundError, ValueError):
+                continue
+
+        entries.sort()
+
+        total_size = sum(size for _, _, size in entries)
+        number_of_entries = len(entries)
+
+        for _, hash, size in entries:
+            if (self._max_size is None or total_size <= self._max_size) and \
+                    (self._max_entries is None or number_of_entries <= self._max_entries):
+                break
+
+            if hash == keep:
+                continue
+
+            print(f'Evict model {hash} from simulation store')
+            self.remove(hash)
+
+            total_size -= size
+            number_of_entries -= 1
@@ -1,81 +1,99 @@
 """
 Mapping of flopy package names to modflow adapters
 
+The adapters are only imported when they are looked up for the first time, as importing them also
+imports the flopy modules (modflow, mt3d, modpath, seawat) they are based on.
+
 """
 
-from flopyAdapter.modflow_package_adapter.basadapter import BasAdapter
-from flopyAdapter.modflow_package_adapter.chdadapter import ChdAdapter
-from flopyAdapter.modflow_package_adapter.disadapter import DisAdapter
-from flopyAdapter.modflow_package_adapter.drnadapter import DrnAdapter
-from flopyAdapter.modflow_package_adapter.ghbadapter import GhbAdapter
-from flopyAdapter.modflow_package_adapter.hobadapter import HobAdapter
-from flopyAdapter.modflow_package_adapter.lpfadapter import LpfAdapter
-from flopyAdapter.modflow_package_adapter.mfadapter import MfAdapter
-from flopyAdapter.modflow_package_adapter.nwtadapter import NwtAdapter
-from flopyAdapter.modflow_package_adapter.ocadapter import OcAdapter
-from flopyAdapter.modflow_package_adapter.pcgadapter import PcgAdapter
-from flopyAdapter.modflow_package_adapter.rchadapter import RchAdapter
-from flopyAdapter.modflow_package_adapter.evtadapter import EvtAdapter
-from flopyAdapter.modflow_package_adapter.rivadapter import RivAdapter
-from flopyAdapter.modflow_package_adapter.upwadapter import UpwAdapter
-from flopyAdapter.modflow_package_adapter.weladapter import WelAdapter
-from flopyAdapter.modflow_package_adapter.lmtadapter import LmtAdapter
-from flopyAdapter.modflow_package_adapter.mpadapter import MpAdapter
-from flopyAdapter.modflow_package_adapter.mpbasadapter import MpBasAdapter
-from flopyAdapter.modflow_package_adapter.mpsimadapter import MpSimAdapter
-from flopyAdapter.modflow_package_adapter.mtadapter import MtAdapter
-from flopyAdapter.modflow_package_adapter.advadapter import AdvAdapter
-from flopyAdapter.modflow_package_adapter.btnadapter import BtnAdapter
-from flopyAdapter.modflow_package_adapter.dspadapter import DspAdapter
-from flopyAdapter.modflow_package_adapter.gcgadapter import GcgAdapter
-from flopyAdapter.modflow_package_adapter.lktadapter import LktAdapter
-from flopyAdapter.modflow_package_adapter.phcadapter import PhcAdapter
-from flopyAdapter.modflow_package_adapter.rctadapter import RctAdapter
-from flopyAdapter.modflow_package_adapter.sftadapter import SftAdapter
-from flopyAdapter.modflow_package_adapter.ssmadapter import SsmAdapter
-from flopyAdapter.modflow_package_adapter.tobadapter import TobAdapter
-from flopyAdapter.modflow_package_adapter.uztadapter import UztAdapter
-from flopyAdapter.modflow_package_adapter.swtadapter import SwtAdapter
-from flopyAdapter.modflow_package_adapter.vdfadapter import VdfAdapter
-from flopyAdapter.modflow_package_adapter.vscadapter import VscAdapter
-
-FLOPY_PACKAGE_TO_ADAPTER_MAPPER = {
+from collections.abc import Mapping
+from importlib import import_module
+from threading import Lock
+
+ADAPTER_PACKAGE = "flopyAdapter.modflow_package_adapter"
+
+
+class LazyAdapterMapping(Mapping):
+    """Read-only mapping of package names to adapter classes, that resolves the adapter modules on
+    first access.
+
+    Args:
+        adapters (dict) - package name to a tuple of module name (within the adapter package) and
+        class name of the adapter
+
+    """
+
+    def __init__(self,
+                 adapters: dict):
+        self._adapters = adapters
+        self._resolved = {}
+        self._lock = Lock()
+
+    def __getitem__(self, name):
+        try:
+            return self._resolved[name]
+        except KeyError:
+            pass
+
+        module_name, class_name = self._adapters[name]
+
+        with self._lock:
+            adapter = getattr(import_module(f"{ADAPTER_PACKAGE}.{module_name}"), class_name)
+            self._resolved[name] = adapter
+
+        return adapter
+
+    def __iter__(self):
+        return iter(self._adapters)
+
+    def __len__(self):
+        return len(self._adapters)
+
+    def preload(self):
+        """ Function to resolve all adapters at once e.g. on startup of long-lived workers
+
+        """
+        for name in self:
+            self[name]
+
+
+FLOPY_PACKAGE_TO_ADAPTER_MAPPER = LazyAdapterMapping({
     # Main adapters
-    "mf": MfAdapter,
-    "mt": MtAdapter,
-    "mp": MpAdapter,
-    "mpbas": MpBasAdapter,
-    "mpsim": MpSimAdapter,
+    "mf": ("mfadapter", "MfAdapter"),
+    "mt": ("mtadapter", "MtAdapter"),
+    "mp": ("mpadapter", "MpAdapter"),
+    "mpbas": ("mpbasadapter", "MpBasAdapter"),
+    "mpsim": ("mpsimadapter", "MpSimAdapter"),
     # Package adapters
-    "adv": AdvAdapter,
-    "bas": BasAdapter,
-    "bas6": BasAdapter,
-    "btn": BtnAdapter,
-    "chd": ChdAdapter,
-    "dis": DisAdapter,
-    "drn": DrnAdapter,
-    "dsp": DspAdapter,
-    "evt": EvtAdapter,
-    "gcg": GcgAdapter,
-    "ghb": GhbAdapter,
-    "hob": HobAdapter,
-    "lkt": LktAdapter,
-    "lmt": LmtAdapter,
-    "lpf": LpfAdapter,
-    "nwt": NwtAdapter,
-    "oc": OcAdapter,
-    "pcg": PcgAdapter,
-    "phc": PhcAdapter,
-    "rch": RchAdapter,
-    "rct": RctAdapter,
-    "riv": RivAdapter,
-    "sft": SftAdapter,
-    "ssm": SsmAdapter,
-    "swt": SwtAdapter,
-    "tob": TobAdapter,
-    "upw": UpwAdapter,
-    "uzt": UztAdapter,
-    "vdf": VdfAdapter,
-    "vsc": VscAdapter,
-    "wel": WelAdapter
-}
+    "adv": ("advadapter", "AdvAdapter"),
+    "bas": ("basadapter", "BasAdapter"),
+    "bas6": ("basadapter", "BasAdapter"),
+    "btn": ("btnadapter", "BtnAdapter"),
+    "chd": ("chdadapter", "ChdAdapter"),
+    "dis": ("disadapter", "DisAdapter"),
+    "drn": ("drnadapter", "DrnAdapter"),
+    "dsp": ("dspadapter", "DspAdapter"),
+    "evt": ("evtadapter", "EvtAdapter"),
+    "gcg": ("gcgadapter", "GcgAdapter"),
+    "ghb": ("ghbadapter", "GhbAdapter"),
+    "hob": ("hobadapter", "HobAdapter"),
+    "lkt": ("lktadapter", "LktAdapter"),
+    "lmt": ("lmtadapter", "LmtAdapter"),
+    "lpf": ("lpfadapter", "LpfAdapter"),
+    "nwt": ("nwtadapter", "NwtAdapter"),
+    "oc": ("ocadapter", "OcAdapter"),
+    "pcg": ("pcgadapter", "PcgAdapter"),
+    "phc": ("phcadapter", "PhcAdapter"),
+    "rch": ("rchadapter", "RchAdapter"),
+    "rct": ("rctadapter", "RctAdapter"),
+    "riv": ("rivadapter", "RivAdapter"),
+    "sft": ("sftadapter", "SftAdapter"),
+    "ssm": ("ssmadapter", "SsmAdapter"),
+    "swt": ("swtadapter", "SwtAdapter"),
+    "tob": ("tobadapter", "TobAdapter"),
+    "upw": ("upwadapter", "UpwAdapter"),
+    "uzt": ("uztadapter", "UztAdapter"),
+    "vdf": ("vdfadapter", "VdfAdapter"),
+    "vsc": ("vscadapter", "VscAdapter"),
+    "wel": ("weladapter", "WelAdapter")
+})
@@ -9,7 +9,7 @@ class OcAdapter(ModflowPackageAdapterBase):
     # Override
     @staticmethod
     def to_dict(data):
-        if not data or type(data) is not list:
+        if data is None or type(data) is not list:
             return data
 
         stress_period_data = {}
@@ -0,0 +1,39 @@
+import numpy as np
+from flopyAdapter.datamodel.outputcontrol import minimal_output_control, timestep_end_times
+
+
+def bbox(ts_min, ts_max):
+    return {"type": "bbox", "ts": {"min": ts_min, "max": ts_max}, "lay": {"min": 0, "max": 0},
+            "row": {"min": 0, "max": 0}, "col": {"min": 0, "max": 0}}
+
+
+def test_timestep_end_times():
+    assert np.allclose(timestep_end_times([10, 20], [2, 2], [1, 3]), [5, 10, 15, 30])
+
+
+def test_minimal_output_control():
+    data = {
+        "mf": {
+            "dis": {"nper": 2, "perlen": [10, 20], "nstp": [2, 2], "tsmult": [1, 3]},
+            "oc": {"stress_period_data": [[[0, 0], ["save head", "save drawdown", "save budget"]]]}
+        },
+        "mt": {
+            "btn": {"savucn": True, "nprs": 0}
+        }
+    }
+    optimization_data = {
+        "objectives": [{"type": "head", "location": bbox(1, 3)}, {"type": "flux", "location": {}}],
+        "constraints": [{"type": "concentration", "location": bbox(3, 3)}]
+    }
+
+    minimal_output_control(data, optimization_data)
+
+    assert data["mf"]["oc"]["stress_period_data"] == [[[0, 1], ["save head", "print budget"]],
+                                                      [[1, 0], ["save head"]], [[1, 1], ["print budget"]]]
+    assert data["mt"]["btn"] == {"savucn": True, "nprs": 1, "timprs": [30.0]}
+
+    # test for: nothing is saved without head and concentration objectives, the budget is still printed
+    minimal_output_control(data, {"objectives": [], "constraints": []})
+
+    assert data["mf"]["oc"]["stress_period_data"] == [[[0, 1], ["print budget"]], [[1, 1], ["print budget"]]]
+    assert data["mt"]["btn"] == {"savucn": False, "nprs": 0, "timprs": None}
@@ -0,0 +1,102 @@
+import json
+import shutil
+import sys
+import time
+import pytest
+from copy import deepcopy
+from pathlib import Path
+from flopyAdapter.datamodel.modflowdatamodel import ModflowDataModel
+from flopyAdapter.flopymodel.flopymodelmanager import FlopyModelManager
+from flopyAdapter.flopy_adapter.flopy_calculationadapter import STATUS_ABORTED
+from flopyAdapter.flopy_adapter.flopy_fitnessadapter import FlopyFitnessAdapter
+from flopyAdapter.flopy_adapter.monitoring.constraintmonitor import is_decidable_early
+from tests.flopy_adapter.test_flopy_fitnessadapter import SAMPLE_OPTIMIZATION_DATA
+
+SAMPLE_FILE_WELL_WITH_SAME_POSITION = "tests/test_data/modflow_model_data.json"
+
+with open(SAMPLE_FILE_WELL_WITH_SAME_POSITION) as f:
+    modflowmodeldata = json.load(f)
+
+CALCULATION_ID = "abc123"
+FOLDER = Path(__file__).parent.parent.parent / "test_data" / "test_model"
+
+# Head at layer 0, row 20, col 45 is about 436.8 in the first time step
+HEAD_CONSTRAINT = {
+    "type": "head",
+    "summary_method": "max",
+    "operator": "less",
+    "value": 400,
+    "location": {
+        "type": "bbox",
+        "ts": {"min": 0, "max": 0},
+        "lay": {"min": 0, "max": 0},
+        "row": {"min": 20, "max": 20},
+        "col": {"min": 45, "max": 45}
+    }
+}
+
+
+def test_is_decidable_early():
+    assert is_decidable_early(HEAD_CONSTRAINT)
+    assert is_decidable_early({**HEAD_CONSTRAINT, "operator": "more", "summary_method": "min"})
+    assert not is_decidable_early({**HEAD_CONSTRAINT, "summary_method": "mean"})
+    assert not is_decidable_early({**HEAD_CONSTRAINT, "operator": "more"})
+
+
+def test_constraintmonitor_partially_written_head_file(tmp_path):
+    shutil.copytree(FOLDER / CALCULATION_ID, tmp_path / CALCULATION_ID)
+
+    optimization_data = deepcopy(SAMPLE_OPTIMIZATION_DATA)
+    optimization_data["constraints"] = [HEAD_CONSTRAINT]
+
+    fitness_adapter = FlopyFitnessAdapter.from_id(optimization_data, CALCULATION_ID, tmp_path)
+    monitor = fitness_adapter.constraint_monitor()
+
+    head_file = tmp_path / CALCULATION_ID / "modflowtest.hds"
+    head_content = head_file.read_bytes()
+
+    # test for: the head file of an earlier run is ignored
+    monitor.start(None)
+    assert monitor.check() is None
+
+    # test for: the unfinished first record is not evaluated
+    head_file.write_bytes(head_content[:100])
+    assert monitor.check() is None
+
+    head_file.write_bytes(head_content)
+    assert monitor.check().startswith("head constraint violated in time step 0")
+
+    # test for: the penalty is assigned without reading the result files
+    head_file.unlink()
+    assert fitness_adapter.get_fitness() == [999]
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="fake executable is a shell script")
+def test_constraintmonitor_scratch_workspace(tmp_path):
+    shutil.copytree(FOLDER / CALCULATION_ID, tmp_path / CALCULATION_ID)
+
+    fake_executable = tmp_path / "fake_mf2005"
+    fake_executable.write_text(f"#!/bin/sh\ncp {FOLDER / CALCULATION_ID / 'modflowtest.hds'} modflowtest.hds\n"
+                               "sleep 30\necho \" Normal termination of simulation\"\n")
+    fake_executable.chmod(0o755)
+
+    optimization_data = deepcopy(SAMPLE_OPTIMIZATION_DATA)
+    optimization_data["constraints"] = [HEAD_CONSTRAINT]
+
+    fitness_adapter = FlopyFitnessAdapter.from_id(optimization_data, CALCULATION_ID, tmp_path)
+
+    model = ModflowDataModel(deepcopy(modflowmodeldata))
+    model.data["mf"]["mf"]["exe_name"] = str(fake_executable)
+    model.model_ws = str(tmp_path / CALCULATION_ID)
+
+    flopymodelmanager = FlopyModelManager(model, monitors=[fitness_adapter.constraint_monitor()],
+                                          scratch=tmp_path / "scratch")
+    flopymodelmanager.build_flopymodel()
+
+    start = time.time()
+    flopymodelmanager.run_model()
+
+    # test for: the head file is followed in the scratch workspace the model runs in, not in the workspace
+    assert time.time() - start < 10
+    assert flopymodelmanager.run_report["mf"]["status"] == STATUS_ABORTED
+    assert flopymodelmanager.run_report["mf"]["abort_reason"].startswith("head constraint violated in time step 0")
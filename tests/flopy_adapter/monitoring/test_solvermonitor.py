@@ -0,0 +1,107 @@
+import json
+import sys
+import time
+import pytest
+from copy import deepcopy
+from types import SimpleNamespace
+from flopyAdapter.datamodel.modflowdatamodel import ModflowDataModel
+from flopyAdapter.flopymodel.flopymodelmanager import FlopyModelManager
+from flopyAdapter.flopy_adapter.flopy_calculationadapter import STATUS_ABORTED
+from flopyAdapter.flopy_adapter.monitoring.solvermonitor import SolverMonitor
+
+SAMPLE_FILE_WELL_WITH_SAME_POSITION = "tests/test_data/modflow_model_data.json"
+
+with open(SAMPLE_FILE_WELL_WITH_SAME_POSITION) as f:
+    modflowmodeldata = json.load(f)
+
+LIST_FILE_LINES = [
+    "     3 CALLS TO PCG ROUTINE FOR TIME STEP   1 IN STRESS PERIOD   1",
+    "  VOLUMETRIC BUDGET FOR ENTIRE MODEL AT END OF TIME STEP    1, STRESS PERIOD   1",
+    " PERCENT DISCREPANCY =           0.01     PERCENT DISCREPANCY =          -0.02",
+    "    50 CALLS TO PCG ROUTINE FOR TIME STEP   2 IN STRESS PERIOD   1",
+    " FAILED TO MEET SOLVER CONVERGENCE CRITERIA",
+    "  VOLUMETRIC BUDGET FOR ENTIRE MODEL AT END OF TIME STEP    2, STRESS PERIOD   1",
+    " PERCENT DISCREPANCY =          12.50     PERCENT DISCREPANCY =           3.00",
+]
+
+MT_LIST_FILE_LINES = [
+    "                             CUMMULATIVE MASS BUDGETS AT END OF TRANSPORT STEP    1, TIME STEP    1, "
+    "STRESS PERIOD    1",
+    "                                                   DISCREPANCY (PERCENT) =  0.1250E-01",
+    "                             CUMMULATIVE MASS BUDGETS AT END OF TRANSPORT STEP    2, TIME STEP    1, "
+    "STRESS PERIOD    1",
+    "                                                   DISCREPANCY (PERCENT) =   -8.500",
+]
+
+
+def test_solvermonitor_read_list_file(tmp_path):
+    model = SimpleNamespace(model_ws=str(tmp_path), lst=SimpleNamespace(file_name=["model.list"]))
+
+    list_file = tmp_path / "model.list"
+    list_file.write_text("\n".join(LIST_FILE_LINES[:3]) + "\n" + LIST_FILE_LINES[3][:20])
+
+    monitor = SolverMonitor(max_outer_iterations=40)
+    monitor.start(model)
+
+    # test for: first time step is fine, the unfinished line is not parsed yet
+    assert monitor.check() is None
+    assert monitor.progress["time_steps"] == {"1,1": {"outer_iterations": 3, "percent_discrepancy": 0.02}}
+
+    list_file.write_text("\n".join(LIST_FILE_LINES) + "\n")
+
+    assert monitor.check() == "50 outer iterations in time step 1,2 exceeded 40"
+    assert monitor.progress["time_steps"]["1,2"] == {"outer_iterations": 50, "percent_discrepancy": 12.5}
+    assert monitor.progress["solver_failures"] == 1
+
+    # test for: monitor is reset on start
+    monitor.start(model)
+    assert monitor.progress["time_steps"] == {}
+
+    # test for: models without list file (e.g. Modpath) are followed on stdout only
+    monitor.start(SimpleNamespace(model_ws=str(tmp_path)))
+    assert monitor.check() is None
+    assert monitor.progress["time_steps"] == {}
+
+
+def test_solvermonitor_read_mt3d_list_file(tmp_path):
+    model = SimpleNamespace(model_ws=str(tmp_path), lst=SimpleNamespace(file_name=["mt3d.list"]))
+
+    list_file = tmp_path / "mt3d.list"
+    list_file.write_text("\n".join(MT_LIST_FILE_LINES[:2]) + "\n")
+
+    monitor = SolverMonitor(max_percent_discrepancy=5)
+    monitor.start(model)
+
+    # test for: the discrepancy of the mass budget is recorded per transport step
+    assert monitor.check() is None
+    assert monitor.progress["time_steps"] == {"transport,1": {"outer_iterations": None,
+                                                              "percent_discrepancy": 0.0125}}
+
+    list_file.write_text("\n".join(MT_LIST_FILE_LINES) + "\n")
+
+    assert monitor.check() == "percent discrepancy 8.5 in time step transport,2 exceeded 5"
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="fake executable is a shell script")
+def test_solvermonitor_aborts_run(tmp_path):
+    fake_executable = tmp_path / "fake_mf2005"
+    fake_executable.write_text("#!/bin/sh\nprintf '%s\\n' " +
+                               " ".join(f"'{line}'" for line in LIST_FILE_LINES) +
+                               " > modflowtest.list\nsleep 30\necho \" Normal termination of simulation\"\n")
+    fake_executable.chmod(0o755)
+
+    model = ModflowDataModel(deepcopy(modflowmodeldata))
+    model.data["mf"]["mf"]["exe_name"] = str(fake_executable)
+    model.model_ws = str(tmp_path)
+
+    flopymodelmanager = FlopyModelManager(model, monitors=[SolverMonitor(max_percent_discrepancy=5)])
+    flopymodelmanager.build_flopymodel()
+
+    start = time.time()
+    flopymodelmanager.run_model()
+
+    assert time.time() - start < 10
+    assert flopymodelmanager.flopy_packages_success == {"mf": False}
+    assert flopymodelmanager.run_report["mf"]["status"] == STATUS_ABORTED
+    assert flopymodelmanager.run_report["mf"]["abort_reason"] == \
+        "percent discrepancy 12.5 in time step 1,2 exceeded 5"
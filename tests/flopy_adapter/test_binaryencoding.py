@@ -0,0 +1,40 @@
+import shutil
+import zlib
+from pathlib import Path
+
+import flopy.utils.binaryfile as bf
+import numpy as np
+import pytest
+from flopyAdapter.flopy_adapter.flopy_read_classes.binaryencoding import check_encoding
+from flopyAdapter.flopy_adapter.flopy_readadapter import FlopyReadAdapter
+
+FOLDER = Path(__file__).parent.parent / "test_data" / "test_model" / "abc123"
+
+
+def test_binary_encoding(tmp_path):
+    shutil.copytree(FOLDER, tmp_path / "model")
+    heads = bf.HeadFile(str(tmp_path / "model" / "modflowtest.hds"), precision="single")
+
+    request = {"layerdata": {"type": "head", "totim": 3652.0, "layer": 0, "encoding": "float32"}}
+    response = FlopyReadAdapter("3.2.12", str(tmp_path / "model"), request).response()["response"]
+
+    assert response["shape"] == [40, 75]
+    np.testing.assert_array_equal(np.frombuffer(response["data"], dtype="<f4").reshape(response["shape"]),
+                                  heads.get_data(totim=3652.0, mflay=0))
+
+    # test for: compressed time series
+    request = {"timeseries": {"type": "head", "layer": 0, "row": 3, "column": 4, "encoding": "float32",
+                              "compression": "deflate"}}
+    response = FlopyReadAdapter("3.2.12", str(tmp_path / "model"), request).response()["response"]
+
+    values = np.frombuffer(zlib.decompress(response["data"]), dtype="<f4").reshape(response["shape"])
+    expected = heads.get_ts((0, 3, 4))
+    assert response["times"] == expected[:, 0].tolist()
+    np.testing.assert_array_equal(values, expected[:, 1:])
+
+    heads.close()
+
+    with pytest.raises(ValueError):
+        check_encoding("float64")
+    with pytest.raises(ValueError):
+        check_encoding("float32", "gzip")
@@ -0,0 +1,37 @@
+import shutil
+from pathlib import Path
+from flopyAdapter.flopy_adapter.flopy_read_classes.budgettable import BudgetTable
+from flopyAdapter.flopy_adapter.flopy_read_classes.resultfilecache import RESULT_FILE_CACHE
+from flopyAdapter.flopy_adapter.flopy_readadapter import FlopyReadAdapter
+
+FOLDER = Path(__file__).parent.parent / "test_data" / "test_model" / "abc123"
+
+
+def test_read_budget_from_budget_table(tmp_path):
+    shutil.copytree(FOLDER, tmp_path / "model")
+    workspace = str(tmp_path / "model")
+
+    request = {"budget": {"type": "incremental", "totim": 3652.0}}
+    response = FlopyReadAdapter("3.2.12", workspace, request).response()["response"]
+
+    assert response["WELLS_OUT"] == "-10000.0" and response["STORAGE_OUT"] == "-0.0"
+    assert (tmp_path / "model" / "modflowtest.list.budget.npz").is_file()
+
+    # test for: the budgets are read from the sidecar file once the cached table is closed
+    RESULT_FILE_CACHE.invalidate(workspace)
+    request = {"budget": {"type": "series", "names": ["TOTAL_IN", "TOTAL_OUT"]}}
+    response = FlopyReadAdapter("3.2.12", workspace, request).response()["response"]
+
+    assert response == {"times": [3652.0], "kstpkper": [[0, 0]],
+                        "budget": {"TOTAL_IN": [36520000.0], "TOTAL_OUT": [-36520000.0]}}
+    assert BudgetTable.load(tmp_path / "model" / "modflowtest.list").read_budget(1.0) is None
+
+    # test for: incremental budgets with the time at the top level of the request
+    request = {"budget": {"type": "incremental"}, "totim": 3652.0}
+    response = FlopyReadAdapter("3.2.12", workspace, request).response()["response"]
+
+    assert response["WELLS_OUT"] == "-10000.0"
+
+    # test for: the sidecar file is not listed as file of the workspace
+    response = FlopyReadAdapter("3.2.12", workspace, {"filelist": True}).response()["response"]
+    assert "modflowtest.list" in response and "modflowtest.list.budget.npz" not in response
@@ -1,7 +1,15 @@
+import asyncio
 import json
+import sys
+import threading
+import time
+import pytest
+from copy import deepcopy
 from flopyAdapter.datamodel.modflowdatamodel import ModflowDataModel
 from flopyAdapter.flopymodel.flopymodelmanager import FlopyModelManager
-from flopyAdapter.flopy_adapter.flopy_calculationadapter import FlopyCalculationAdapter
+from flopyAdapter.flopy_adapter.flopy_calculationadapter import FlopyCalculationAdapter, STATUS_KILLED, \
+    STATUS_TIMEOUT
+from flopyAdapter.flopy_adapter.reportcapture import ReportCapture
 
 SAMPLE_FILE_WELL_WITH_SAME_POSITION = "tests/test_data/modflow_model_data.json"
 
@@ -17,3 +25,135 @@ def test_flopy_calculation_adapter():
     FlopyCalculationAdapter.from_flopymodel(model=flopymodelmanager.flopy_packages["mf"])
 
     pass
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="fake executable is a shell script")
+def test_flopy_calculation_adapter_run_calculation_async(tmp_path):
+    fake_executable = tmp_path / "fake_mf2005"
+    fake_executable.write_text("#!/bin/sh\necho \"Running $1\"\necho \" Normal termination of simulation\"\nexit 3\n")
+    fake_executable.chmod(0o755)
+
+    flopymodelmanager = FlopyModelManager(ModflowDataModel(deepcopy(modflowmodeldata)))
+    flopymodelmanager.build_flopymodel()
+
+    model = flopymodelmanager.flopy_packages["mf"]
+    model.change_model_ws(str(tmp_path))
+    model.exe_name = str(fake_executable)
+
+    calculation_adapter = FlopyCalculationAdapter(model)
+    calculation_adapter.write_input_model()
+
+    lines = []
+    success, report = asyncio.run(calculation_adapter.run_calculation_async(lines.append))
+
+    assert success
+    assert lines == ["Running modflowtest.nam", " Normal termination of simulation"]
+    assert report == " \n".join(lines)
+    assert calculation_adapter.returncode == 3
+    assert calculation_adapter.summary()["report"]["termination"] == "Normal termination of simulation"
+    assert (tmp_path / "modflowtest.stdout").read_text() == \
+        "Running modflowtest.nam\n Normal termination of simulation\n"
+
+
+def fake_model(tmp_path, script):
+    fake_executable = tmp_path / "fake_mf2005"
+    fake_executable.write_text(f"#!{sys.executable}\n{script}\n")
+    fake_executable.chmod(0o755)
+
+    flopymodelmanager = FlopyModelManager(ModflowDataModel(deepcopy(modflowmodeldata)))
+    flopymodelmanager.build_flopymodel()
+
+    model = flopymodelmanager.flopy_packages["mf"]
+    model.change_model_ws(str(tmp_path))
+    model.exe_name = str(fake_executable)
+
+    return model
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="fake executable needs posix process groups")
+def test_flopy_calculation_adapter_timeout(tmp_path):
+    model = fake_model(tmp_path, "import time\nprint('Running', flush=True)\ntime.sleep(30)")
+
+    calculation_adapter = FlopyCalculationAdapter(model, timeout=1)
+    calculation_adapter.write_input_model()
+
+    start = time.time()
+    calculation_adapter.run_calculation()
+
+    assert time.time() - start < 10
+    assert calculation_adapter.status == STATUS_TIMEOUT
+    assert calculation_adapter.abort_reason == "wall time exceeded 1 seconds"
+    assert not calculation_adapter.get_success_and_report()[0]
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="resource limits are posix only")
+def test_flopy_calculation_adapter_cpu_limit(tmp_path):
+    model = fake_model(tmp_path, "while True:\n    pass")
+
+    calculation_adapter = FlopyCalculationAdapter(model, timeout=20, max_cpu_time=1)
+    calculation_adapter.write_input_model()
+    calculation_adapter.run_calculation()
+
+    assert calculation_adapter.status == STATUS_KILLED
+    assert calculation_adapter.abort_reason in ["killed by signal SIGXCPU", "killed by signal SIGKILL"]
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="fake executable needs posix process groups")
+def test_flopy_model_manager_cancel(tmp_path):
+    fake_executable = tmp_path / "fake_mf2005"
+    fake_executable.write_text(f"#!{sys.executable}\nimport time\ntime.sleep(30)\n")
+    fake_executable.chmod(0o755)
+
+    model = ModflowDataModel(deepcopy(modflowmodeldata))
+    model.data["mf"]["mf"]["exe_name"] = str(fake_executable)
+    model.model_ws = str(tmp_path)
+
+    flopymodelmanager = FlopyModelManager(model, run_limits={"timeout": 20, "max_cpu_time": 20})
+    flopymodelmanager.build_flopymodel()
+
+    threading.Timer(1, flopymodelmanager.cancel).start()
+
+    start = time.time()
+    flopymodelmanager.run_model()
+
+    assert time.time() - start < 10
+    assert flopymodelmanager.run_report["mf"]["status"] == STATUS_KILLED
+    assert flopymodelmanager.run_report["mf"]["abort_reason"] == "cancelled"
+    assert flopymodelmanager.flopy_packages_success == {"mf": False}
+
+    with pytest.raises(ValueError):
+        FlopyModelManager(ModflowDataModel(deepcopy(modflowmodeldata)), run_limits={"memory": 1})
+
+
+def test_report_capture(tmp_path):
+    capture = ReportCapture(tmp_path / "model.stdout", tail_lines=2)
+
+    for line in [" Solving:  Stress period:     1    Time step:     1",
+                 " ****FAILED TO MEET SOLVER CONVERGENCE CRITERIA",
+                 " Run end date and time (yyyy/mm/dd hh:mm:ss): 2020/01/01 12:00:01",
+                 " Elapsed run time:  1 Minutes,  2.500 Seconds",
+                 "  Normal termination of simulation"]:
+        capture.feed(line)
+    capture.close()
+
+    # test for: only the tail is kept in memory, the file holds all lines
+    assert capture.tail == " Elapsed run time:  1 Minutes,  2.500 Seconds \n  Normal termination of simulation"
+    assert len((tmp_path / "model.stdout").read_text().splitlines()) == 5
+    assert capture.summary() == {
+        "file": str(tmp_path / "model.stdout"),
+        "lines": 5,
+        "termination": "Normal termination of simulation",
+        "elapsed": 62.5,
+        "solver_failures": 1
+    }
+
+    capture = ReportCapture()
+
+    for line in [" Solving:  Stress period:     1    Time step:     1   Groundwater-Flow Eqn.",
+                 " Maximum head change at stop of the outer iteration: error of 0.01",
+                 " Error in WEL input: Layer outside the grid",
+                 " STOP EXECUTION - (GWF2WEL7AR)"]:
+        capture.feed(line)
+
+    # test for: the first termination message is kept, lines mentioning stop or error mid-line are no termination
+    assert capture.summary()["termination"] == "Error in WEL input: Layer outside the grid"
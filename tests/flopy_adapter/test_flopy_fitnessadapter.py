@@ -1,7 +1,10 @@
+import flopy
+import numpy as np
 import pytest
 from copy import deepcopy
 from pathlib import Path
 from flopyAdapter.flopy_adapter.flopy_fitnessadapter import FlopyFitnessAdapter
+from flopyAdapter.flopy_adapter.flopy_read_classes.binaryrecords import HEADER_DTYPES
 
 CALCULATION_ID = "abc123"
 FOLDER = Path(__file__).parent.parent / "test_data" / "test_model"
@@ -162,3 +165,33 @@ def test_flopy_fitnessadapter_get_fitness():
     # with pytest.raises(ValueError):
     #     FlopyFitnessAdapter.from_id(test_optimization_data, CALCULATION_ID, FOLDER). \
     #         get_fitness()
+
+
+def test_flopy_fitnessadapter_timestep_data(tmp_path):
+    # Head file with the time steps 1 and 3 of 4 saved
+    header_dtype = HEADER_DTYPES[("head", "single")]
+    with open(tmp_path / "model.hds", "wb") as f:
+        for kstp, kper, totim, value in [(2, 1, 10.0, 1.0), (2, 2, 30.0, 2.0)]:
+            f.write(np.array((kstp, kper, totim, totim, b"            HEAD", 2, 2, 1), dtype=header_dtype).tobytes())
+            f.write(np.full((2, 2), value, dtype="<f4").tobytes())
+
+    head_file = flopy.utils.HeadFile(str(tmp_path / "model.hds"))
+    heads = FlopyFitnessAdapter.timestep_data(head_file, 4, np.array([5.0, 10.0, 15.0, 30.0]))
+    head_file.close()
+
+    assert heads.shape == (4, 1, 2, 2)
+    assert np.isnan(heads[[0, 2]]).all()
+    assert (heads[1] == 1.0).all() and (heads[3] == 2.0).all()
+
+
+def test_flopy_fitnessadapter_set_heads():
+    fitness_adapter = FlopyFitnessAdapter.from_id(deepcopy(SAMPLE_OPTIMIZATION_DATA), CALCULATION_ID, FOLDER)
+    # The test model has a single time step
+    shape = (1, 1, 40, 75)
+
+    fitness_adapter.set_heads(np.full(shape, 450.0))
+    assert fitness_adapter.get_fitness() == [450.0]
+
+    # test for: heads without an entry per time step are rejected
+    with pytest.raises(ValueError):
+        fitness_adapter.set_heads(np.full((shape[0] + 1, *shape[1:]), 450.0))
@@ -0,0 +1,52 @@
+import numpy as np
+from flopyAdapter.flopy_adapter.flopy_read_classes.binaryrecords import HEADER_DTYPES
+from flopyAdapter.flopy_adapter.flopy_read_classes.layerpyramid import LayerPyramid, downsample, level_count
+from flopyAdapter.flopy_adapter.flopy_read_classes.recordindex import RecordIndex
+from flopyAdapter.flopy_adapter.flopy_readadapter import FlopyReadAdapter
+
+
+def write_layer(file_name, data, totim=1.0):
+    header = np.zeros(1, dtype=HEADER_DTYPES[("head", "single")])
+    header["kstp"], header["kper"], header["totim"], header["ilay"] = 1, 1, totim, 1
+    header["text"] = "HEAD"
+    header["nrow"], header["ncol"] = data.shape
+
+    with open(file_name, "wb") as f:
+        f.write(header.tobytes())
+        f.write(data.astype("<f4").tobytes())
+
+
+def test_downsample():
+    data = np.array([[1, 3, 5], [-1e30, 5, 7], [2, 2, 1]], dtype=np.float32)
+
+    # test for: nodata cells are left out and odd rows/columns are averaged with the cells they have
+    np.testing.assert_array_equal(downsample(data), [[3, 6], [2, 1]])
+    assert level_count((200, 100)) == 3
+
+
+def test_layer_pyramid(tmp_path):
+    data = np.arange(300 * 200, dtype=np.float32).reshape(300, 200)
+    data[:10, :10] = -1e30
+    write_layer(tmp_path / "model.hds", data)
+
+    pyramid = LayerPyramid(RecordIndex.from_file(tmp_path / "model.hds"))
+    window = pyramid.read_window(1.0, 0, {"row": {"min": 0, "max": 20}, "col": {"min": 100, "max": 120}}, level=2)
+
+    assert window["row"] == {"min": 0, "max": 5} and window["col"] == {"min": 25, "max": 30}
+    np.testing.assert_allclose(window["data"], downsample(downsample(data))[0:5, 25:30])
+    assert (pyramid.folder / "1.0_0_2.npy").is_file()
+
+    # test for: the cached levels are removed once the result file changed
+    write_layer(tmp_path / "model.hds", data + 1)
+    pyramid = LayerPyramid(RecordIndex.from_file(tmp_path / "model.hds"))
+    assert not (pyramid.folder / "1.0_0_2.npy").exists()
+
+    request = {"layerdata": {"type": "head", "totim": 1.0, "layer": 0, "level": 1,
+                             "window": {"row": {"min": 0, "max": 4}, "col": {"min": 0, "max": 4}}}}
+    response = FlopyReadAdapter("3.2.12", str(tmp_path), request).response()["response"]
+
+    assert response["data"] == [[None, None], [None, None]]
+
+    # test for: the pyramid folder is not listed as file of the workspace
+    response = FlopyReadAdapter("3.2.12", str(tmp_path), {"filelist": True}).response()["response"]
+    assert (tmp_path / "model.hds.pyramid").is_dir() and response == ["model.hds"]
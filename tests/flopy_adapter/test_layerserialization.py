@@ -0,0 +1,46 @@
+import json
+import shutil
+from pathlib import Path
+
+import flopy.utils.binaryfile as bf
+import numpy as np
+from flopyAdapter.flopy_adapter.flopy_read_classes.layerserialization import serialize_layer
+from flopyAdapter.flopy_adapter.flopy_readadapter import FlopyReadAdapter
+
+FOLDER = Path(__file__).parent.parent / "test_data" / "test_model" / "abc123"
+
+
+def serialize_layer_by_cell(data):
+    data = data.tolist()
+    for i in range(len(data)):
+        for j in range(len(data[i])):
+            data[i][j] = round(data[i][j], 2)
+            if data[i][j] < -999:
+                data[i][j] = None
+    return data
+
+
+def test_serialize_layer():
+    rng = np.random.default_rng(0)
+    data = np.concatenate([rng.normal(0, 1000, 40000), rng.uniform(-5, 5, 40000),
+                           np.arange(-20000, 20000) / 200 + 0.005]).astype(np.float32)
+    data[:8] = [1e30, -1e30, -999.99, -999.004, -0.001, 0.125, np.nan, 3.4e38]
+    data = data.reshape(400, 300)
+
+    # test for: the text of the serialized layer is the same as rounding cell by cell
+    assert json.dumps(serialize_layer(data)) == json.dumps(serialize_layer_by_cell(data))
+
+
+def test_read_layer_response(tmp_path):
+    shutil.copytree(FOLDER, tmp_path / "model")
+    request = {"layerdata": {"type": "head", "totim": 3652.0, "layer": 0}}
+
+    heads = bf.HeadFile(str(tmp_path / "model" / "modflowtest.hds"), precision="single")
+    expected = serialize_layer_by_cell(heads.get_data(totim=3652.0, mflay=0))
+    heads.close()
+
+    response = FlopyReadAdapter("3.2.12", str(tmp_path / "model"), request).response()
+
+    # test for: the response holds the same values and encodes to the same json text as before
+    assert response["response"] == expected
+    assert json.dumps(response) == json.dumps(dict(status_code=200, request=request, response=expected))
@@ -0,0 +1,46 @@
+import json
+from copy import deepcopy
+from flopyAdapter.datamodel.modflowdatamodel import ModflowDataModel
+from flopyAdapter.flopymodel.flopymodelmanager import FlopyModelManager
+from flopyAdapter.flopy_adapter.flopy_calculationadapter import FlopyCalculationAdapter
+from flopyAdapter.flopy_adapter.modelcheck import ModelCheckCache, check_model
+
+SAMPLE_FILE_WELL_WITH_SAME_POSITION = "tests/test_data/modflow_model_data.json"
+
+with open(SAMPLE_FILE_WELL_WITH_SAME_POSITION) as f:
+    modflowmodeldata = json.load(f)
+
+
+def flopy_model(model_ws, well_row=None):
+    model = ModflowDataModel(deepcopy(modflowmodeldata))
+    model.model_ws = str(model_ws)
+
+    if well_row is not None:
+        model.add_well(lay=0, row=well_row, col=10, pumping_rates=[-100.0])
+
+    flopymodelmanager = FlopyModelManager(model)
+    flopymodelmanager.build_flopymodel()
+
+    return flopymodelmanager.flopy_packages["mf"]
+
+
+def test_check_model(tmp_path):
+    cache = ModelCheckCache()
+
+    model = flopy_model(tmp_path / "first", well_row=5)
+    summary_array, report = check_model(model, cache)
+
+    assert report["cached"] == 0 and report["fresh"] == 7
+    assert len(summary_array) == len(model.check(f=None, verbose=False).summary_array)
+
+    # test for: only the changed well package is checked again, the workspace doesn't matter
+    summary_array, report = check_model(flopy_model(tmp_path / "second", well_row=6), cache)
+
+    assert report["packages"] == {"DIS": "cached", "BAS6": "cached", "GHB": "cached", "WEL": "fresh",
+                                  "LPF": "cached", "PCG": "cached", "OC": "cached"}
+    assert report["cached"] == 6 and report["fresh"] == 1
+
+    calculation_adapter = FlopyCalculationAdapter.from_flopymodel(flopy_model(tmp_path / "third", well_row=6),
+                                                                  check_cache=cache)
+
+    assert calculation_adapter.summary()["check"]["fresh"] == 0
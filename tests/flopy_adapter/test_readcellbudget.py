@@ -0,0 +1,73 @@
+import numpy as np
+from flopyAdapter.flopy_adapter.flopy_read_classes.readcellbudget import face_budget, zone_budget
+from flopyAdapter.flopy_adapter.flopy_readadapter import FlopyReadAdapter
+
+HEADER1 = np.dtype([("kstp", "<i4"), ("kper", "<i4"), ("text", "S16"), ("ncol", "<i4"), ("nrow", "<i4"),
+                    ("nlay", "<i4")])
+HEADER2 = np.dtype([("imeth", "<i4"), ("delt", "<f4"), ("pertim", "<f4"), ("totim", "<f4")])
+
+
+def write_record(f, text, totim, imeth, data, shape=(2, 3, 4)):
+    f.write(np.array([(1, 1, text.rjust(16).encode(), shape[2], shape[1], -shape[0])], dtype=HEADER1).tobytes())
+    f.write(np.array([(imeth, totim, totim, totim)], dtype=HEADER2).tobytes())
+
+    if imeth == 1:
+        f.write(np.asarray(data, dtype="<f4").tobytes())
+    else:
+        f.write(np.array([len(data)], dtype="<i4").tobytes())
+        f.write(np.array(data, dtype=[("node", "<i4"), ("q", "<f4")]).tobytes())
+
+
+def test_zone_budget():
+    inflow, outflow = zone_budget(np.array([1.0, -2.0, 3.0, -4.0]), np.array([0, 0, 2, 2]), 3)
+
+    assert inflow.tolist() == [1.0, 0.0, 3.0] and outflow.tolist() == [2.0, 0.0, 4.0]
+
+
+def test_face_budget():
+    values = np.array([[[5.0, -2.0, 7.0]]])
+    zones = np.array([[[0, 1, 1]]])
+
+    # test for: only the flow between the cells of zone 0 and 1 counts, the flow within zone 1 is left out
+    inflow, outflow = face_budget(values, zones, 2, 2)
+    assert inflow.tolist() == [0.0, 5.0] and outflow.tolist() == [5.0, 0.0]
+
+    inflow, outflow = face_budget(-values, zones, 2, 2)
+    assert inflow.tolist() == [5.0, 0.0] and outflow.tolist() == [0.0, 5.0]
+
+
+def test_read_zone_budget(tmp_path):
+    flow_right_face = np.arange(24, dtype=np.float32).reshape(2, 3, 4) - 10
+
+    with open(tmp_path / "model.cbc", "wb") as f:
+        write_record(f, "FLOW RIGHT FACE", 10.0, 1, flow_right_face)
+        write_record(f, "WELLS", 10.0, 2, [(1, -100.0), (14, -50.0), (24, 20.0)])
+
+    zones = np.zeros((3, 4), dtype=int)
+    zones[:, 2:] = 1
+
+    request = {"cellbudget": {"type": "zones", "zones": zones.tolist(), "records": ["WELLS", "FLOW RIGHT FACE"]}}
+    response = FlopyReadAdapter("3.2.12", str(tmp_path), request).response()["response"]
+
+    assert response["times"] == [10.0] and response["zones"] == [0, 1]
+    # Cells 1 and 14 (one based) are in zone 0, cell 24 in zone 1
+    assert response["records"]["WELLS"] == {"in": [[0.0, 20.0]], "out": [[150.0, 0.0]], "net": [[-150.0, 20.0]]}
+
+    # Zone 0 and 1 meet between column 1 and 2, flows of -9, -5, -1 from zone 1 and 3, 7, 11 to zone 1
+    assert response["records"]["FLOW RIGHT FACE"] == {"in": [[15.0, 21.0]], "out": [[21.0, 15.0]],
+                                                      "net": [[-6.0, 6.0]]}
+
+    # test for: records and times that are not in the budget file return no data instead of zeros
+    request = {"cellbudget": {"type": "zones", "zones": zones.tolist(), "records": ["RECHARGE"]}}
+    assert FlopyReadAdapter("3.2.12", str(tmp_path), request).response()["response"] == []
+
+    request = {"cellbudget": {"type": "zones", "zones": zones.tolist(), "totims": [20.0]}}
+    assert FlopyReadAdapter("3.2.12", str(tmp_path), request).response()["response"] == []
+
+    # test for: a workspace without budget file returns no data
+    (tmp_path / "empty").mkdir()
+    assert FlopyReadAdapter("3.2.12", str(tmp_path / "empty"), request).response()["response"] == []
+
+    request = {"cellbudget": {"type": "records"}}
+    assert FlopyReadAdapter("3.2.12", str(tmp_path), request).response()["response"] == \
+        ["FLOW RIGHT FACE", "WELLS"]
@@ -0,0 +1,112 @@
+import os
+import shutil
+from pathlib import Path
+
+import flopy.utils.binaryfile as bf
+import numpy as np
+from flopyAdapter.flopy_adapter.flopy_read_classes.binaryrecords import HEADER_DTYPES
+from flopyAdapter.flopy_adapter.flopy_read_classes.readhead import ReadHead
+from flopyAdapter.flopy_adapter.flopy_read_classes.recordindex import RecordIndex, index_file_name, \
+    index_workspace
+from flopyAdapter.flopy_adapter.flopy_readadapter import FlopyReadAdapter
+
+FOLDER = Path(__file__).parent.parent / "test_data" / "test_model" / "abc123"
+
+
+def write_records(file_name, kind, records, shape=(3, 4)):
+    header_dtype = HEADER_DTYPES[(kind, "single")]
+
+    with open(file_name, "wb") as f:
+        for kstp, kper, totim, ilay in records:
+            header = np.zeros(1, dtype=header_dtype)
+            header["kstp"], header["kper"], header["totim"], header["ilay"] = kstp, kper, totim, ilay
+            header["text"] = "HEAD" if kind == "head" else "CONCENTRATION"
+            header["nrow"], header["ncol"] = shape
+            f.write(header.tobytes())
+            f.write((np.arange(shape[0] * shape[1], dtype="<f4") + totim * 10 + ilay).tobytes())
+
+
+def test_recordindex_matches_flopy(tmp_path):
+    # Layer 2 is not saved at the second time step
+    records = [(1, 1, 0.5, 1), (1, 1, 0.5, 2), (2, 1, 1.25, 1), (1, 2, 11.0, 1), (1, 2, 11.0, 2)]
+    write_records(tmp_path / "model.hds", "head", records)
+    write_records(tmp_path / "MT3D001.UCN", "ucn", records)
+
+    for file_name, flopy_file, kind in [(tmp_path / "model.hds", bf.HeadFile, "head"),
+                                        (tmp_path / "MT3D001.UCN", bf.UcnFile, "ucn")]:
+        flopy_object = flopy_file(str(file_name), precision="single")
+        index = RecordIndex.from_file(file_name, kind)
+
+        assert index.times() == flopy_object.get_times()
+        assert index.nlay == 2
+        for totim in [0.5, 1.25, 11.0]:
+            for layer in [0, 1]:
+                np.testing.assert_array_equal(index.read_layer(totim, layer),
+                                              flopy_object.get_data(totim=totim, mflay=layer))
+
+        cells = [(0, 0, 0), (1, 2, 3), (1, 0, 1)]
+        np.testing.assert_array_equal(index.read_ts(cells), flopy_object.get_ts(cells))
+
+        flopy_object.close()
+        index.close()
+
+
+def test_recordindex_sidecar(tmp_path):
+    shutil.copytree(FOLDER, tmp_path / "model")
+    head_file = tmp_path / "model" / "modflowtest.hds"
+
+    # test for: the index is built after a run or on first access and then loaded
+    assert index_workspace(tmp_path / "model") == ["modflowtest.ddn", "modflowtest.hds"]
+    assert RecordIndex.load(head_file, "head") is not None
+
+    layer = ReadHead(str(tmp_path / "model")).read_layer(totim=3652.0, layer=0)
+    assert len(layer) == 40 and len(layer[0]) == 75
+
+    # test for: the index files are not listed as files of the workspace
+    response = FlopyReadAdapter("3.2.12", str(tmp_path / "model"), {"filelist": True}).response()["response"]
+    assert "modflowtest.hds" in response and not [file for file in response if file.endswith(".npz")]
+
+    # test for: the index isn't used once the result file changed
+    content = head_file.read_bytes()
+    write_records(head_file, "head", [(1, 1, 1.0, 1)])
+    assert RecordIndex.load(head_file, "head") is None
+    assert RecordIndex.from_file(head_file, "head").times() == [1.0]
+
+    head_file.write_bytes(content)
+    os.remove(index_file_name(head_file))
+    assert RecordIndex.from_file(head_file, "head", persist=False).times() == [3652.0]
+    assert not os.path.exists(index_file_name(head_file))
+
+
+def test_read_ts_of_several_cells(tmp_path):
+    shutil.copytree(FOLDER, tmp_path / "model")
+    heads = bf.HeadFile(str(tmp_path / "model" / "modflowtest.hds"), precision="single")
+
+    request = {"timeseries": {"type": "head", "bbox": {"row": {"min": 2, "max": 4}, "col": {"min": 5, "max": 8}}}}
+    response = FlopyReadAdapter("3.2.12", str(tmp_path / "model"), request).response()["response"]
+
+    cells = [(0, row, col) for row in range(2, 4) for col in range(5, 8)]
+    expected = heads.get_ts(cells)
+
+    assert response["cells"] == [list(cell) for cell in cells]
+    assert response["times"] == expected[:, 0].tolist()
+    assert response["values"] == expected[:, 1:].tolist()
+
+    zone = np.zeros((40, 75))
+    zone[[2, 3], [5, 7]] = 1
+    request = {"timeseries": {"type": "drawdown", "zone": zone.tolist(), "layer": 0}}
+    response = FlopyReadAdapter("3.2.12", str(tmp_path / "model"), request).response()["response"]
+
+    assert response["cells"] == [[0, 2, 5], [0, 3, 7]]
+    assert np.array(response["values"]).shape == (1, 2)
+
+    heads.close()
+
+    # test for: values of layers that are not saved at a time are None instead of nan
+    records = [(1, 1, 0.5, 1), (1, 1, 0.5, 2), (2, 1, 1.25, 1)]
+    write_records(tmp_path / "model.hds", "head", records)
+
+    request = {"timeseries": {"type": "head", "cells": [[0, 0, 0], [1, 0, 0]]}}
+    response = FlopyReadAdapter("3.2.12", str(tmp_path), request).response()["response"]
+
+    assert response["values"] == [[6.0, 7.0], [13.5, None]]
@@ -0,0 +1,89 @@
+import os
+import shutil
+import threading
+from pathlib import Path
+from flopyAdapter.flopy_adapter.flopy_read_classes.readbudget import ReadBudget
+from flopyAdapter.flopy_adapter.flopy_read_classes.readhead import ReadHead
+from flopyAdapter.flopy_adapter.flopy_read_classes.resultfilecache import RESULT_FILE_CACHE, ResultFileCache
+
+FOLDER = Path(__file__).parent.parent / "test_data" / "test_model" / "abc123"
+
+
+def test_resultfilecache(tmp_path):
+    shutil.copytree(FOLDER, tmp_path / "model")
+    head_file = str(tmp_path / "model" / "modflowtest.hds")
+
+    opened = []
+
+    def open_file(path):
+        opened.append(path)
+        return open(path, "rb")
+
+    cache = ResultFileCache(max_entries=1)
+
+    with cache.open(head_file, "head", open_file) as f:
+        content = f.read()
+    with cache.open(head_file, "head", open_file):
+        pass
+
+    # test for: the file is opened once and again after it changed
+    assert opened == [head_file]
+
+    Path(head_file).write_bytes(content + b"0")
+    with cache.open(head_file, "head", open_file):
+        pass
+
+    assert len(opened) == 2
+
+    # test for: least recently used files are closed
+    with cache.open(str(tmp_path / "model" / "modflowtest.ddn"), "drawdown", open_file) as f:
+        pass
+
+    assert len(cache) == 1
+
+    cache.invalidate(str(tmp_path / "model"))
+
+    assert len(cache) == 0
+    assert f.closed
+
+
+def test_resultfilecache_listings(tmp_path, monkeypatch):
+    for name in ["first", "second"]:
+        (tmp_path / name).mkdir()
+
+    listed = []
+    listdir = os.listdir
+    monkeypatch.setattr(os, "listdir", lambda path: listed.append(path) or listdir(path))
+
+    cache = ResultFileCache(max_entries=1)
+
+    cache.list_workspace(str(tmp_path / "first"))
+    cache.list_workspace(str(tmp_path / "first"))
+    cache.list_workspace(str(tmp_path / "second"))
+    cache.list_workspace(str(tmp_path / "first"))
+
+    # test for: an unchanged workspace is listed once, listings beyond max_entries are dropped
+    assert listed == [str(tmp_path / "first"), str(tmp_path / "second"), str(tmp_path / "first")]
+
+
+def test_read_classes_with_resultfilecache(tmp_path):
+    shutil.copytree(FOLDER, tmp_path / "model")
+    workspace = str(tmp_path / "model")
+
+    layer = ReadHead(workspace).read_layer(totim=3652.0, layer=0)
+    assert len(layer) == 40 and len(layer[0]) == 75
+
+    # test for: concurrent requests share the opened file
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(ReadHead(workspace).read_layer(3652.0, 0)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [layer] * 8
+    assert ReadBudget(workspace).read_times() == [3652.0]
+
+    RESULT_FILE_CACHE.invalidate(workspace)
+    assert ReadHead(workspace).read_layer(totim=3652.0, layer=0) == layer
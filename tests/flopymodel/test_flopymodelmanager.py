@@ -1,6 +1,11 @@
 import json
+import sys
+import numpy as np
+import pytest
+from copy import deepcopy
 from flopyAdapter.datamodel.modflowdatamodel import ModflowDataModel
 from flopyAdapter.flopymodel.flopymodelmanager import FlopyModelManager
+from flopyAdapter.flopy_adapter.flopy_read_classes.binaryrecords import HEADER_DTYPES
 
 SAMPLE_FILE_WELL_WITH_SAME_POSITION = "tests/test_data/modflow_model_data.json"
 
@@ -17,3 +22,76 @@ def test_flopymodel():
 
     assert flopymodelmanager.flopy_packages.get("mf").get_package_list() == \
         ["DIS", "BAS6", "GHB", "WEL",  "LPF", "PCG", "OC"]
+
+
+def test_flopymodel_warm_start():
+    reference_head_file = "tests/test_data/test_model/abc123/modflowtest.hds"
+
+    flopymodelmanager = FlopyModelManager(ModflowDataModel(modflowmodeldata), warm_start=reference_head_file)
+    flopymodelmanager.build_flopymodel()
+
+    strt = flopymodelmanager.flopy_packages.get("mf").bas6.strt.array
+    reference_heads = FlopyModelManager.read_first_period_heads(reference_head_file, strt.shape)
+
+    # test for: starting heads are taken from the reference run where cells are active
+    active = np.array(modflowmodeldata["mf"]["bas"]["ibound"]) != 0
+    assert flopymodelmanager.run_report["warm_start"] == {
+        "source": reference_head_file,
+        "applied": True,
+        "reason": None
+    }
+    assert np.allclose(strt[active], reference_heads[active])
+    assert not np.allclose(strt[active], 480)
+
+    # test for: missing reference run keeps the starting heads
+    flopymodelmanager = FlopyModelManager(ModflowDataModel(modflowmodeldata), warm_start="missing.hds")
+    flopymodelmanager.build_flopymodel()
+
+    assert flopymodelmanager.run_report["warm_start"]["source"] == "missing.hds"
+    assert flopymodelmanager.run_report["warm_start"]["applied"] is False
+
+
+def test_flopymodel_warm_start_single_precision_hnoflo(tmp_path):
+    ibound = np.array(modflowmodeldata["mf"]["bas"]["ibound"]).reshape(1, 40, 75)
+    row, col = np.argwhere(ibound[0] != 0)[0]
+
+    heads = np.full((40, 75), 470, dtype=np.float32)
+    heads[row, col] = modflowmodeldata["mf"]["bas"]["hnoflo"]
+
+    header = np.zeros(1, dtype=HEADER_DTYPES[("head", "single")])
+    header["kstp"], header["kper"], header["totim"], header["ilay"] = 1, 1, 1.0, 1
+    header["text"] = "HEAD"
+    header["nrow"], header["ncol"] = heads.shape
+    (tmp_path / "reference.hds").write_bytes(header.tobytes() + heads.astype("<f4").tobytes())
+
+    flopymodelmanager = FlopyModelManager(ModflowDataModel(modflowmodeldata), warm_start=tmp_path / "reference.hds")
+    flopymodelmanager.build_flopymodel()
+
+    # test for: hnoflo written in single precision is recognized and keeps the starting head
+    strt = flopymodelmanager.flopy_packages.get("mf").bas6.strt.array
+    assert strt[0, row, col] == 480
+    assert np.count_nonzero(strt[ibound != 0] == 470) == np.count_nonzero(ibound) - 1
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="fake executable is a shell script")
+def test_flopymodelmanager_scratch_workspace(tmp_path):
+    fake_executable = tmp_path / "fake_mf2005"
+    fake_executable.write_text("#!/bin/sh\necho heads > modflowtest.hds\necho budget > modflowtest.cbc\n"
+                               "echo list > modflowtest.list\necho \" Normal termination of simulation\"\n")
+    fake_executable.chmod(0o755)
+
+    model = ModflowDataModel(deepcopy(modflowmodeldata))
+    model.data["mf"]["mf"]["exe_name"] = str(fake_executable)
+    model.model_ws = str(tmp_path / "model")
+
+    flopymodelmanager = FlopyModelManager(model, scratch=tmp_path / "scratch", keep_files=["*.hds", "*.list"])
+    flopymodelmanager.build_flopymodel()
+    flopymodelmanager.run_model()
+
+    assert flopymodelmanager.flopy_packages_success == {"mf": True}
+    assert flopymodelmanager.run_report["scratch"]["copied"] == ["modflowtest.hds", "modflowtest.list"]
+
+    # test for: only the kept files reach the workspace, the scratch workspace is removed
+    assert sorted(path.name for path in (tmp_path / "model").iterdir()) == ["modflowtest.hds", "modflowtest.list"]
+    assert list((tmp_path / "scratch").iterdir()) == []
+    assert flopymodelmanager.flopy_packages["mf"].model_ws == str(tmp_path / "model")
@@ -0,0 +1,62 @@
+import json
+import sys
+import threading
+import pytest
+from copy import deepcopy
+from flopyAdapter.datamodel.modflowdatamodel import ModflowDataModel
+from flopyAdapter.flopymodel.flopymodelpipeline import FlopyModelPipeline
+
+SAMPLE_FILE_WELL_WITH_SAME_POSITION = "tests/test_data/modflow_model_data.json"
+
+with open(SAMPLE_FILE_WELL_WITH_SAME_POSITION) as f:
+    modflowmodeldata = json.load(f)
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="fake executable is a shell script")
+def test_flopymodelpipeline(tmp_path):
+    fake_executable = tmp_path / "fake_mf2005"
+    fake_executable.write_text("#!/bin/sh\necho \" Normal termination of simulation\"\n")
+    fake_executable.chmod(0o755)
+
+    models = []
+    for candidate in range(3):
+        model = ModflowDataModel(deepcopy(modflowmodeldata))
+        model.data["mf"]["mf"]["exe_name"] = str(fake_executable)
+        model.model_ws = str(tmp_path / str(candidate))
+        models.append(model)
+
+    # test for: a candidate failing in the build stage doesn't stop the others
+    del models[1].data["mf"]["dis"]
+
+    pipeline = FlopyModelPipeline(fitness=lambda manager: manager.flopy_packages["mf"].name)
+
+    results = list(pipeline.run(models))
+
+    assert [result["index"] for result in results] == [0, 1, 2]
+    assert [result["success"] for result in results] == [{"mf": True}, {}, {"mf": True}]
+    assert [result["fitness"] for result in results] == ["modflowtest", None, "modflowtest"]
+    assert results[1]["error"].startswith("KeyError")
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="fake executable is a shell script")
+def test_flopymodelpipeline_close(tmp_path):
+    fake_executable = tmp_path / "fake_mf2005"
+    fake_executable.write_text("#!/bin/sh\necho \" Normal termination of simulation\"\n")
+    fake_executable.chmod(0o755)
+
+    def models():
+        for candidate in range(10):
+            model = ModflowDataModel(deepcopy(modflowmodeldata))
+            model.data["mf"]["mf"]["exe_name"] = str(fake_executable)
+            model.model_ws = str(tmp_path / str(candidate))
+            yield model
+
+    active_threads = threading.active_count()
+
+    with FlopyModelPipeline() as pipeline:
+        results = pipeline.run(models())
+        assert next(results)["success"] == {"mf": True}
+
+    # test for: stopping the iteration ends the stage threads and leaves the remaining candidates unrun
+    assert threading.active_count() == active_threads
+    assert not (tmp_path / "9").exists()
@@ -0,0 +1,50 @@
+import json
+import sys
+from copy import deepcopy
+
+import pytest
+from flopyAdapter.datamodel.modflowdatamodel import ModflowDataModel
+from flopyAdapter.flopymodel.flopymodelworker import FlopyModelWorkerPool
+
+SAMPLE_FILE_WELL_WITH_SAME_POSITION = "tests/test_data/modflow_model_data.json"
+
+with open(SAMPLE_FILE_WELL_WITH_SAME_POSITION) as f:
+    modflowmodeldata = json.load(f)
+
+
+def test_flopymodelworkerpool():
+    with FlopyModelWorkerPool(processes=1, base_models=[modflowmodeldata]) as pool:
+        assert pool.base_hashes == [ModflowDataModel(modflowmodeldata).md5_hash]
+
+        # test for: base model that is neither a base model of the pool nor the data of a job
+        with pytest.raises(ValueError):
+            pool.submit(base_hash="not_a_cached_hash")
+
+        assert pool.pending == 0
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="fake executable is a shell script")
+def test_flopymodelworkerpool_reuses_base_model(tmp_path):
+    fake_executable = tmp_path / "fake_mf2005"
+    fake_executable.write_text("#!/bin/sh\necho \" Normal termination of simulation\"\n")
+    fake_executable.chmod(0o755)
+
+    data = deepcopy(modflowmodeldata)
+    data["mf"]["mf"]["exe_name"] = str(fake_executable)
+    base_hash = ModflowDataModel(data).md5_hash
+
+    with FlopyModelWorkerPool(processes=2) as pool:
+        first_job = pool.submit(data=data, model_ws=tmp_path / "first")
+        result = pool.get_result(timeout=60)
+
+        assert result["job_id"] == first_job
+        assert result["error"] is None
+        assert result["success"] == {"mf": True} and result["status"]["mf"] == "success"
+
+        # test for: jobs referencing the data of the first job succeed in any worker
+        job_ids = [pool.submit(base_hash=base_hash, model_ws=tmp_path / f"job{index}") for index in range(4)]
+        results = {result["job_id"]: result for result in pool.results()}
+
+        assert sorted(results) == job_ids
+        assert all(result["error"] is None and result["success"] == {"mf": True} for result in results.values())
+        assert all((tmp_path / f"job{index}" / "modflowtest.nam").is_file() for index in range(4))
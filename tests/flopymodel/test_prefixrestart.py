@@ -0,0 +1,135 @@
+import json
+import sys
+import numpy as np
+import pytest
+from copy import deepcopy
+from flopyAdapter.datamodel.modflowdatamodel import ModflowDataModel
+from flopyAdapter.flopy_adapter.flopy_fitnessadapter import FlopyFitnessAdapter
+from flopyAdapter.flopy_adapter.flopy_read_classes.binaryrecords import detect_precision, read_records
+from flopyAdapter.flopymodel.flopymodelmanager import FlopyModelManager
+from flopyAdapter.flopymodel.prefixrestart import prefix_key, first_differing_period, restart_data
+from flopyAdapter.flopymodel.simulationstore import SimulationStore
+
+SAMPLE_FILE_WELL_WITH_SAME_POSITION = "tests/test_data/modflow_model_data.json"
+
+with open(SAMPLE_FILE_WELL_WITH_SAME_POSITION) as f:
+    modflowmodeldata = json.load(f)
+
+# Writes the simulation time of every stress period as heads of all cells
+FAKE_MODFLOW = """#!{python}
+import numpy as np
+lines = [line.split() for line in open("modflowtest.dis") if not line.startswith("#")]
+nlay, nrow, ncol, nper = map(int, lines[0][:4])
+header = np.dtype([("kstp", "<i4"), ("kper", "<i4"), ("pertim", "<f4"), ("totim", "<f4"),
+                   ("text", "S16"), ("ncol", "<i4"), ("nrow", "<i4"), ("ilay", "<i4")])
+totim = 0
+with open("modflowtest.hds", "wb") as f:
+    for kper, line in enumerate(lines[-nper:]):
+        totim += float(line[0])
+        for ilay in range(nlay):
+            f.write(np.array((1, kper + 1, float(line[0]), totim, b"            HEAD", ncol, nrow, ilay + 1),
+                             dtype=header).tobytes())
+            f.write(np.full((nrow, ncol), totim, dtype="<f4").tobytes())
+with open("{calls}", "a") as f:
+    f.write(str(nper) + chr(10))
+print(" Normal termination of simulation")
+"""
+
+
+def transient_data(wel_stress_period_data):
+    data = deepcopy(modflowmodeldata)
+    data["mf"]["dis"].update({"nper": 3, "perlen": [10, 10, 10], "nstp": [1, 1, 1], "tsmult": [1, 1, 1],
+                              "steady": [True, False, False]})
+    data["mf"]["oc"]["stress_period_data"] = [[[period, 0], ["save head"]] for period in range(3)]
+    data["mf"]["wel"]["stress_period_data"] = wel_stress_period_data
+    return data
+
+
+WELLS = [[0, 14, 39, -5000]]
+OTHER_WELLS = [[0, 20, 36, -5000]]
+
+
+def test_prefix_key_and_restart_data():
+    data = transient_data({"0": WELLS})
+    other_data = transient_data({"0": WELLS, "2": OTHER_WELLS})
+
+    # test for: stress periods are equal until the wells change
+    assert first_differing_period(prefix_key(data), prefix_key(other_data)) == 2
+
+    other_data["mf"]["ghb"]["stress_period_data"]["0"][0][3] = 451
+    assert first_differing_period(prefix_key(data), prefix_key(other_data)) == 0
+
+    other_data = transient_data({"0": WELLS, "2": OTHER_WELLS})
+    other_data["mf"]["oc"]["stress_period_data"] = [[[0, 0], ["save head"]], [[2, 0], ["save drawdown"]]]
+
+    restart = restart_data(other_data, 1, np.ones((1, 40, 75)))["mf"]
+
+    # test for: stress periods are reindexed with the data active in the first simulated stress period
+    assert restart["dis"]["nper"] == 2
+    assert restart["dis"]["steady"] == [False, False]
+    assert restart["wel"]["stress_period_data"] == {"0": WELLS, "1": OTHER_WELLS}
+    assert restart["ghb"]["stress_period_data"] == {"0": modflowmodeldata["mf"]["ghb"]["stress_period_data"]["0"]}
+    # test for: output control only applies to the listed time steps, so the earlier entries are dropped
+    assert restart["oc"]["stress_period_data"] == [[[1, 0], ["save drawdown"]]]
+    assert restart["bas"]["strt"] == np.ones((1, 40, 75)).tolist()
+
+
+def test_prefix_key_list_period_data():
+    # A list of wells is the data of the first stress period, which applies to all stress periods
+    data = transient_data([WELLS[0], OTHER_WELLS[0]])
+    other_data = transient_data([WELLS[0], [0, 20, 36, -3000]])
+
+    # test for: models whose list data differs share no stress periods
+    assert first_differing_period(prefix_key(data), prefix_key(other_data)) == 0
+    assert first_differing_period(prefix_key(data), prefix_key(transient_data([WELLS[0], OTHER_WELLS[0]]))) == 3
+
+    restart = restart_data(data, 1, np.ones((1, 40, 75)))["mf"]
+    assert restart["wel"]["stress_period_data"] == [WELLS[0], OTHER_WELLS[0]]
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="fake executable is a shell script")
+def test_flopymodelmanager_prefix_restart(tmp_path):
+    calls = tmp_path / "calls"
+    fake_executable = tmp_path / "fake_mf2005"
+    fake_executable.write_text(FAKE_MODFLOW.format(python=sys.executable, calls=calls))
+    fake_executable.chmod(0o755)
+
+    store = SimulationStore(tmp_path / "store")
+
+    def run(model_ws, wel_stress_period_data):
+        model = ModflowDataModel(transient_data(wel_stress_period_data))
+        model.data["mf"]["mf"]["exe_name"] = str(fake_executable)
+        model.model_ws = str(tmp_path / model_ws)
+
+        manager = FlopyModelManager(model, store=store, prefix_restart=True)
+        manager.build_flopymodel()
+        manager.run_model()
+
+        return manager
+
+    manager = run("first", {"0": WELLS})
+    prefix_hash = manager.run_report["mf"]["store"]["hash"]
+
+    manager = run("second", {"0": WELLS, "2": OTHER_WELLS})
+
+    # test for: only the last stress period is simulated
+    assert calls.read_text() == "3\n1\n"
+    assert manager.flopy_packages_success == {"mf": True}
+    assert manager.run_report["mf"]["restart"] == {"hash": prefix_hash, "stress_period": 2}
+
+    # test for: head file holds all stress periods
+    with open(tmp_path / "second" / "modflowtest.hds", "rb") as f:
+        records = [(int(header["kper"]), float(header["totim"]), float(data[0, 0]))
+                   for header, data, _ in read_records(f, 0, "head", detect_precision(f, "head"))]
+
+    assert records == [(1, 10.0, 10.0), (2, 20.0, 20.0), (3, 30.0, 10.0)]
+
+    # test for: the workspace holds the input files of the full model, so the fitness sees all stress periods
+    objective = {"type": "head", "summary_method": "max", "weight": 1, "penalty_value": 999,
+                 "location": {"type": "bbox", "ts": {"min": 0, "max": 2}, "lay": {"min": 0, "max": 0},
+                              "row": {"min": 20, "max": 20}, "col": {"min": 45, "max": 45}}}
+    fitness = FlopyFitnessAdapter.from_id({"objectives": [objective], "constraints": [], "objects": []},
+                                          "second", tmp_path)
+
+    assert fitness.get_fitness() == [20.0]
+    assert [path.name for path in (tmp_path / "second").iterdir() if path.name.startswith(".restart")] == []
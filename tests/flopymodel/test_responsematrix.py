@@ -0,0 +1,79 @@
+import json
+import sys
+import pytest
+from copy import deepcopy
+from flopyAdapter.datamodel.modflowdatamodel import ModflowDataModel
+from flopyAdapter.flopymodel.responsematrix import ResponseMatrixEngine, linearity_violation
+
+SAMPLE_FILE_WELL_WITH_SAME_POSITION = "tests/test_data/modflow_model_data.json"
+
+with open(SAMPLE_FILE_WELL_WITH_SAME_POSITION) as f:
+    modflowmodeldata = json.load(f)
+
+# Heads decrease linearly with the rates of the wells in the wel file
+FAKE_MODFLOW = """#!{python}
+import numpy as np
+lines = [line.split() for line in open("modflowtest.dis") if not line.startswith("#")]
+nlay, nrow, ncol = map(int, lines[0][:3])
+wells = [line.split() for line in open("modflowtest.wel") if not line.startswith("#")][2:]
+rows, cols = np.mgrid[0:nrow, 0:ncol]
+heads = np.full((nrow, ncol), 450.0)
+for lay, row, col, flux in wells:
+    heads += float(flux) * 0.001 / (1 + np.hypot(rows - int(row) + 1, cols - int(col) + 1))
+header = np.dtype([("kstp", "<i4"), ("kper", "<i4"), ("pertim", "<f4"), ("totim", "<f4"),
+                   ("text", "S16"), ("ncol", "<i4"), ("nrow", "<i4"), ("ilay", "<i4")])
+with open("modflowtest.hds", "wb") as f:
+    f.write(np.array((1, 1, 1.0, 1.0, b"            HEAD", ncol, nrow, 1), dtype=header).tobytes())
+    f.write(heads.astype("<f4").tobytes())
+print(" Normal termination of simulation")
+"""
+
+
+def well(id, row, col, flux):
+    return {"id": id, "type": "well", "position": {"lay": {"result": 0}, "row": {"result": row},
+                                                   "col": {"result": col}}, "flux": {"0": {"result": flux}}}
+
+
+def test_linearity_violation():
+    assert linearity_violation(modflowmodeldata) == "model has convertible layers (laytyp != 0)"
+
+    data = deepcopy(modflowmodeldata)
+    data["mf"]["lpf"]["laytyp"] = [0]
+    assert linearity_violation(data) is None
+
+    data["mf"]["packages"].append("riv")
+    assert linearity_violation(data) == "model has nonlinear or unsupported packages: riv"
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="fake executable is a shell script")
+def test_responsematrixengine(tmp_path):
+    fake_executable = tmp_path / "fake_mf2005"
+    fake_executable.write_text(FAKE_MODFLOW.format(python=sys.executable))
+    fake_executable.chmod(0o755)
+
+    data = deepcopy(modflowmodeldata)
+    data["mf"]["lpf"]["laytyp"] = [0]
+    data["mf"]["mf"]["exe_name"] = str(fake_executable)
+
+    engine = ResponseMatrixEngine(ModflowDataModel(data), tmp_path / "engine")
+
+    optimization_data = {
+        "objectives": [{"type": "head", "summary_method": "min", "weight": 1, "penalty_value": 999,
+                        "location": {"type": "bbox", "lay": {"min": 0, "max": 0},
+                                     "row": {"min": 18, "max": 22}, "col": {"min": 30, "max": 40}}}],
+        "constraints": [],
+        "objects": [well(0, 20, 32, -2000.0), well(1, 19, 38, -500.0)]
+    }
+
+    fitness = engine.get_fitness(optimization_data)
+
+    # test for: superposed heads equal the heads of a full run
+    assert engine.number_of_responses == 2
+    assert fitness == pytest.approx(engine.get_fitness_of_full_run(optimization_data), abs=1e-3)
+
+    # test for: responses are reused for other rates
+    optimization_data["objects"] = [well(0, 20, 32, -100.0)]
+    assert engine.get_fitness(optimization_data) == \
+        pytest.approx(engine.get_fitness_of_full_run(optimization_data), abs=1e-3)
+    assert engine.number_of_responses == 2
+    assert engine.full_runs == 2
@@ -0,0 +1,54 @@
+import json
+from copy import deepcopy
+from flopyAdapter.flopymodel.flopymodelworker import FlopyModelWorkerPool
+from flopyAdapter.flopymodel.runcostestimator import RunCostEstimator, model_features, default_runtime
+
+SAMPLE_FILE_WELL_WITH_SAME_POSITION = "tests/test_data/modflow_model_data.json"
+
+with open(SAMPLE_FILE_WELL_WITH_SAME_POSITION) as f:
+    modflowmodeldata = json.load(f)
+
+
+def model_with(nrow: int, nstp: int) -> dict:
+    data = deepcopy(modflowmodeldata)
+    data["mf"]["dis"]["nrow"] = nrow
+    data["mf"]["dis"]["nstp"] = [nstp]
+    return data
+
+
+def test_model_features():
+    assert model_features(modflowmodeldata) == {
+        "cells": 3000, "nstp": 1, "solver": "pcg", "ncomp": 0, "packages": 8
+    }
+
+
+def test_run_cost_estimator(tmp_path):
+    records_file = tmp_path / "records.jsonl"
+    estimator = RunCostEstimator(records_file)
+
+    # test for: default estimate scaled by the recorded runs
+    default = estimator.estimate(modflowmodeldata)["runtime"]
+    assert default == default_runtime(model_features(modflowmodeldata))
+
+    estimator.record(modflowmodeldata, runtime=0.3, peak_memory=None)
+    assert abs(estimator.estimate(modflowmodeldata)["runtime"] - 0.3) < 1e-9
+
+    # test for: runtime proportional to cells and time steps is learned
+    for nrow in [10, 20, 40, 80]:
+        for nstp in [1, 3, 10, 30, 100]:
+            estimator.record(model_with(nrow, nstp), runtime=1e-4 * nrow * 75 * nstp, peak_memory=nrow * 1e6)
+
+    estimate = estimator.estimate(model_with(160, 50))
+    assert abs(estimate["runtime"] - 1e-4 * 160 * 75 * 50) < 1e-3 * estimate["runtime"]
+    assert abs(estimate["peak_memory"] - 160e6) < 1e-3 * estimate["peak_memory"]
+
+    # test for: records are kept in the records file
+    assert len(RunCostEstimator(records_file).records) == 21
+
+
+def test_flopymodelworkerpool_shortest_job_first(tmp_path):
+    with FlopyModelWorkerPool(processes=1, estimator=RunCostEstimator()) as pool:
+        # The first job starts right away, the waiting ones by estimated runtime
+        job_ids = [pool.submit(data=model_with(40, nstp), model_ws=tmp_path) for nstp in [1000, 100, 1, 10]]
+
+        assert [result["job_id"] for result in pool.results()] == [job_ids[0], job_ids[2], job_ids[3], job_ids[1]]
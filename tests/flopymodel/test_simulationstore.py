@@ -0,0 +1,162 @@
+import json
+import os
+import sys
+import pytest
+from copy import deepcopy
+from flopyAdapter.datamodel.modflowdatamodel import ModflowDataModel
+from flopyAdapter.flopymodel.flopymodelmanager import FlopyModelManager
+from flopyAdapter.flopymodel.simulationstore import SimulationStore
+from flopyAdapter.flopy_adapter.flopy_fitnessadapter import FlopyFitnessAdapter
+from tests.flopy_adapter.test_flopy_fitnessadapter import SAMPLE_OPTIMIZATION_DATA
+
+SAMPLE_FILE_WELL_WITH_SAME_POSITION = "tests/test_data/modflow_model_data.json"
+
+with open(SAMPLE_FILE_WELL_WITH_SAME_POSITION) as f:
+    modflowmodeldata = json.load(f)
+
+
+def test_simulationstore_eviction(tmp_path):
+    model_ws = tmp_path / "model"
+    model_ws.mkdir()
+    (model_ws / "model.hds").write_bytes(b"0" * 100)
+
+    store = SimulationStore(tmp_path / "store", max_entries=2)
+
+    for hash in ["a", "b", "c"]:
+        store.put(hash, "mf", model_ws, ["model.hds"], True)
+
+    # test for: least recently used entry is evicted
+    assert sorted(store.hashes()) == ["b", "c"]
+
+    # test for: the order of use doesn't depend on the modification time of the entry folders
+    for hash in ["b", "c"]:
+        os.utime(tmp_path / "store" / hash, ns=(0, 0))
+
+    store.get("b")
+    store.put("d", "mf", model_ws, ["model.hds"], True)
+
+    assert sorted(store.hashes()) == ["b", "d"]
+
+    store = SimulationStore(tmp_path / "store", max_size=150)
+    store.put("e", "mf", model_ws, ["model.hds"], True)
+
+    assert store.hashes() == ["e"]
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="fake executable is a shell script")
+def test_flopymodelmanager_with_simulationstore(tmp_path):
+    fake_executable = tmp_path / "fake_mf2005"
+    fake_executable.write_text("#!/bin/sh\necho heads > modflowtest.hds\n"
+                               "echo \" Normal termination of simulation\"\n")
+    fake_executable.chmod(0o755)
+
+    store = SimulationStore(tmp_path / "store")
+
+    model = ModflowDataModel(deepcopy(modflowmodeldata))
+    model.data["mf"]["mf"]["exe_name"] = str(fake_executable)
+    model.model_ws = str(tmp_path / "first")
+
+    manager = FlopyModelManager(model, store=store)
+    manager.build_flopymodel()
+    manager.run_model()
+
+    model_hash = model.module_hash("mf")
+
+    assert manager.flopy_packages_success == {"mf": True}
+    assert manager.run_report["mf"]["store"] == {"hash": model_hash, "hit": False}
+    assert "modflowtest.hds" in store.get(model_hash)["files"]
+
+    # test for: same model in another workspace is restored instead of run
+    fake_executable.write_text("#!/bin/sh\nexit 1\n")
+
+    model = ModflowDataModel(deepcopy(modflowmodeldata))
+    model.data["mf"]["mf"]["exe_name"] = str(fake_executable)
+    model.model_ws = str(tmp_path / "second")
+
+    assert model.module_hash("mf") == model_hash
+
+    manager = FlopyModelManager(model, store=store)
+    manager.run_model()
+
+    assert manager.flopy_packages_success == {"mf": True}
+    assert manager.run_report["mf"]["store"] == {"hash": model_hash, "hit": True}
+
+    # test for: the input files are restored with the outputs, so the workspace can be loaded
+    assert "modflowtest.nam" in store.get(model_hash)["files"]
+    assert FlopyFitnessAdapter.from_id(SAMPLE_OPTIMIZATION_DATA, "second", tmp_path)
+
+    # test for: with a scratch workspace the outputs are restored into it and copied back to the workspace
+    model.model_ws = str(tmp_path / "third")
+
+    manager = FlopyModelManager(model, store=store, scratch=tmp_path / "scratch", keep_files=["*.hds"])
+    manager.build_flopymodel()
+    manager.run_model()
+
+    assert manager.run_report["mf"]["store"] == {"hash": model_hash, "hit": True}
+    assert manager.run_report["scratch"]["copied"] == ["modflowtest.hds"]
+    assert (tmp_path / "third" / "modflowtest.hds").read_text() == "heads\n"
+    assert (tmp_path / "second" / "modflowtest.hds").read_text() == "heads\n"
+
+    # test for: manager is rehydrated from the hash
+    manager = FlopyModelManager.from_hash(model_hash, store, str(tmp_path / "third"))
+
+    assert manager.flopy_packages["mf"].model_ws == str(tmp_path / "third")
+    assert manager.flopy_packages_success == {"mf": True}
+    assert (tmp_path / "third" / "modflowtest.hds").is_file()
+
+    with pytest.raises(KeyError):
+        FlopyModelManager.from_hash("unknown", store)
+
+
+@pytest.mark.skipif(sys.platform.startswith("win"), reason="fake executable is a shell script")
+def test_flopymodelmanager_reuses_flow_solution(tmp_path):
+    calls = tmp_path / "calls"
+    fake_mf = tmp_path / "fake_mf2005"
+    fake_mf.write_text(f"#!/bin/sh\necho mf >> {calls}\necho heads > modflowtest.hds\necho flows > mt3d_link.ftl\n"
+                       "echo \" Normal termination of simulation\"\n")
+    fake_mf.chmod(0o755)
+    fake_mt = tmp_path / "fake_mt3dms"
+    fake_mt.write_text(f"#!/bin/sh\necho mt >> {calls}\ncat mt3d_link.ftl > MT3D001.UCN\n"
+                       "echo \" Normal termination of simulation\"\n")
+    fake_mt.chmod(0o755)
+
+    store = SimulationStore(tmp_path / "store")
+
+    def transport_model(model_ws, source_concentration):
+        data = deepcopy(modflowmodeldata)
+        data["mf"]["mf"]["exe_name"] = str(fake_mf)
+        data["mf"]["packages"].append("lmt")
+        data["mf"]["lmt"] = {}
+        data["mt"] = {
+            "packages": ["mt", "btn", "adv", "gcg", "ssm"],
+            "mt": {"modelname": "mt3dtest", "exe_name": str(fake_mt)},
+            "btn": {"sconc": source_concentration},
+            "adv": {},
+            "gcg": {},
+            "ssm": {}
+        }
+
+        model = ModflowDataModel(data)
+        model.model_ws = str(tmp_path / model_ws)
+
+        manager = FlopyModelManager(model, store=store)
+        manager.build_flopymodel()
+        manager.run_model()
+
+        return manager
+
+    manager = transport_model("first", 0.0)
+
+    assert calls.read_text() == "mf\nmt\n"
+    assert "mt3d_link.ftl" in store.get(manager.run_report["mf"]["store"]["hash"])["files"]
+    assert "MT3D001.UCN" in store.get(manager.run_report["mt"]["store"]["hash"])["files"]
+
+    # test for: only mt is run when only transport data changed
+    manager = transport_model("second", 1.0)
+
+    assert calls.read_text() == "mf\nmt\nmt\n"
+    assert manager.flopy_packages_success == {"mf": True, "mt": True}
+    assert manager.run_report["mf"]["store"]["hit"] is True
+    assert manager.run_report["mt"]["store"]["hit"] is False
+    assert (tmp_path / "second" / "MT3D001.UCN").read_text() == "flows\n"
+    assert (tmp_path / "second" / "modflowtest.nam").is_file()
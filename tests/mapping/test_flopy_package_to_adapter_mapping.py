@@ -0,0 +1,36 @@
+import subprocess
+import sys
+from flopyAdapter.mapping.flopy_package_to_adapter_mapping import FLOPY_PACKAGE_TO_ADAPTER_MAPPER
+
+# Upper bound for the cold import of the model manager, which is what a cli or a worker imports on startup
+MAX_IMPORT_TIME = 2.0
+
+IMPORT_BENCHMARK = """
+import sys
+import time
+start = time.perf_counter()
+import flopyAdapter.flopymodel.flopymodelmanager
+print(time.perf_counter() - start)
+print(",".join(module for module in ("flopy", "scipy", "sklearn") if module in sys.modules))
+"""
+
+
+def test_flopy_package_to_adapter_mapping():
+    from flopyAdapter.modflow_package_adapter.weladapter import WelAdapter
+    from flopyAdapter.modflow_package_adapter.basadapter import BasAdapter
+
+    assert len(FLOPY_PACKAGE_TO_ADAPTER_MAPPER) == 36
+    assert FLOPY_PACKAGE_TO_ADAPTER_MAPPER["wel"] is WelAdapter
+    assert FLOPY_PACKAGE_TO_ADAPTER_MAPPER["bas6"] is FLOPY_PACKAGE_TO_ADAPTER_MAPPER["bas"] is BasAdapter
+    assert FLOPY_PACKAGE_TO_ADAPTER_MAPPER.get("nonsense_package") is None
+
+
+def test_import_time_of_flopymodelmanager():
+    output = subprocess.run([sys.executable, "-c", IMPORT_BENCHMARK],
+                            stdout=subprocess.PIPE, check=True, universal_newlines=True).stdout.splitlines()
+
+    import_time, heavy_modules = float(output[0]), output[1]
+
+    # test for: flopy, scipy and sklearn are only imported when a model is built/ hob statistics are calculated
+    assert heavy_modules == ""
+    assert import_time < MAX_IMPORT_TIME